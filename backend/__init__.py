@@ -1,4 +1,11 @@
-from .app import create_app
-
 __all__ = ["create_app"]
 
+
+def __getattr__(name):
+    # Importing a submodule (a CLI, the worker, a benchmark) should not pull
+    # in Flask and every blueprint; ``create_app`` loads them on first use.
+    if name == "create_app":
+        from .app import create_app  # pylint: disable=import-outside-toplevel
+
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,342 @@
+"""Department × period labour-cost rollups behind ``/api/analytics/department-costs``.
+
+Records of a closed (``PROCESSED`` or ``PAID``) period barely change, so
+their per-department totals are stored in ``period_department_rollups``
+and a report over years of periods reads a few rows per period instead of
+grouping every record. A period's rollup is written when it closes and
+rewritten whenever its records change through the ORM (an ``after_flush``
+listener, in the same transaction); archived periods are aggregated from
+their archive file. Each record counts towards the department its employee
+belonged to when the rollup was last written.
+
+``OPEN`` periods, and closed ones that have no rollup rows, are grouped
+live over ``payroll_records ⋈ employees``. Whole reports are kept in a
+small per-process LRU (``settings.analytics_cache_size``), already
+encoded, keyed by the filters and the versions of the tables read, so any
+write to records, periods or employees invalidates them without a scan.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import delete, event, exists, func, insert, inspect, or_, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import SessionLocal
+from .models import (
+    Department,
+    Employee,
+    PayrollPeriod,
+    PayrollRecord,
+    PeriodArchive,
+    PeriodDepartmentRollup,
+)
+from .money import to_cents
+
+CLOSED_STATUSES = ("PROCESSED", "PAID")
+_MONEY = {
+    "gross_cents": "gross_pay",
+    "tax_cents": "tax_amount",
+    "deduction_cents": "other_deductions",
+    "net_cents": "net_pay",
+}
+# Keeps ``IN`` lists well under every driver's bound-parameter limit.
+_KEY_BATCH = 500
+
+_cache: "OrderedDict[Tuple, bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _live_rollup_rows(connection: Connection, period_ids: List[int]) -> List[Dict]:
+    rows = connection.execute(
+        select(
+            PayrollRecord.payroll_period_id,
+            Employee.department_id,
+            func.count(PayrollRecord.id),
+            *(func.sum(getattr(PayrollRecord, attr)) for attr in _MONEY.values()),
+        )
+        .join(Employee, Employee.id == PayrollRecord.employee_id)
+        .where(PayrollRecord.payroll_period_id.in_(period_ids))
+        .group_by(PayrollRecord.payroll_period_id, Employee.department_id)
+    )
+    return [
+        {
+            "payroll_period_id": period_id,
+            "department_id": department_id,
+            "record_count": count,
+            **{column: to_cents(value) for column, value in zip(_MONEY, money)},
+        }
+        for period_id, department_id, count, *money in rows
+    ]
+
+
+def _archived_rollup_rows(connection: Connection, period_id: int, path: str) -> List[Dict]:
+    # pylint: disable=import-outside-toplevel
+    from .archive import archived_employee_totals
+
+    totals = archived_employee_totals(path)
+    employee_ids = [row["employee_id"] for row in totals]
+    departments = {}
+    for start in range(0, len(employee_ids), _KEY_BATCH):
+        departments.update(
+            connection.execute(
+                select(Employee.id, Employee.department_id).where(
+                    Employee.id.in_(employee_ids[start : start + _KEY_BATCH])
+                )
+            ).all()
+        )
+    grouped: Dict[int, Dict[str, int]] = defaultdict(
+        lambda: dict.fromkeys(("record_count", *_MONEY), 0)
+    )
+    for row in totals:
+        if row["employee_id"] not in departments:
+            continue  # the employee was deleted after the period was archived
+        entry = grouped[departments[row["employee_id"]]]
+        for column in entry:
+            entry[column] += row[column]
+    return [
+        {"payroll_period_id": period_id, "department_id": department_id, **entry}
+        for department_id, entry in grouped.items()
+    ]
+
+
+def refresh_rollups(connection: Connection, period_ids: Iterable[int]) -> None:
+    """Rewrite the rollup rows of ``period_ids`` from their records."""
+    period_ids = sorted(set(period_ids))
+    for start in range(0, len(period_ids), _KEY_BATCH):
+        batch = period_ids[start : start + _KEY_BATCH]
+        connection.execute(
+            delete(PeriodDepartmentRollup).where(
+                PeriodDepartmentRollup.payroll_period_id.in_(batch)
+            )
+        )
+        archives = dict(
+            connection.execute(
+                select(PeriodArchive.payroll_period_id, PeriodArchive.path).where(
+                    PeriodArchive.payroll_period_id.in_(batch), PeriodArchive.record_count > 0
+                )
+            ).all()
+        )
+        rows = _live_rollup_rows(connection, [p for p in batch if p not in archives])
+        for period_id, path in archives.items():
+            rows.extend(_archived_rollup_rows(connection, period_id, path))
+        if rows:
+            connection.execute(insert(PeriodDepartmentRollup), rows)
+
+
+def rebuild_rollups(connection: Connection) -> int:
+    """Rewrite the rollups of every closed period; return how many periods."""
+    period_ids = list(
+        connection.scalars(
+            select(PayrollPeriod.id).where(PayrollPeriod.status.in_(CLOSED_STATUSES))
+        )
+    )
+    refresh_rollups(connection, period_ids)
+    return len(period_ids)
+
+
+def _closed_periods(session: Session, period_ids: Iterable[int]) -> List[int]:
+    """The closed periods among ``period_ids``, preferring periods in the session."""
+    closed = []
+    missing = []
+    for period_id in set(period_ids):
+        period = session.identity_map.get(Session.identity_key(PayrollPeriod, period_id))
+        if period is None:
+            missing.append(period_id)
+        elif period.status in CLOSED_STATUSES:
+            closed.append(period_id)
+    if missing:
+        closed.extend(
+            session.connection().scalars(
+                select(PayrollPeriod.id).where(
+                    PayrollPeriod.id.in_(missing), PayrollPeriod.status.in_(CLOSED_STATUSES)
+                )
+            )
+        )
+    return closed
+
+
+@event.listens_for(SessionLocal.session_factory, "after_flush")
+def _refresh_flushed(session, _flush_context) -> None:
+    """Rewrite the rollups of periods that closed or whose closed records changed."""
+    closing, removed, touched = set(), set(), set()
+    for obj in session.new:
+        if isinstance(obj, PayrollPeriod) and obj.status in CLOSED_STATUSES:
+            closing.add(obj.id)
+        elif isinstance(obj, PayrollRecord):
+            touched.add(obj.payroll_period_id)
+    for obj in session.dirty:
+        if not session.is_modified(obj):
+            continue
+        if isinstance(obj, PayrollPeriod):
+            if obj.status in CLOSED_STATUSES and inspect(obj).attrs.status.history.deleted:
+                closing.add(obj.id)
+        elif isinstance(obj, PayrollRecord):
+            history = inspect(obj).attrs.payroll_period_id.history
+            touched.update([obj.payroll_period_id, *history.deleted])
+    for obj in session.deleted:
+        if isinstance(obj, PayrollPeriod):
+            removed.add(obj.id)
+        elif isinstance(obj, PayrollRecord):
+            touched.add(obj.payroll_period_id)
+
+    connection = session.connection()
+    if removed:
+        connection.execute(
+            delete(PeriodDepartmentRollup).where(
+                PeriodDepartmentRollup.payroll_period_id.in_(removed)
+            )
+        )
+    if touched - removed:
+        closing.update(_closed_periods(session, touched - removed))
+    if closing - removed:
+        refresh_rollups(connection, closing - removed)
+
+
+def _totals_dict(totals: Dict[str, int]) -> Dict:
+    return {
+        "record_count": totals["record_count"],
+        **{attr: totals[column] / 100 for column, attr in _MONEY.items()},
+    }
+
+
+def department_costs(
+    session,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    department_id: int | None = None,
+) -> Dict:
+    """Costs per department and period for periods ending within the range.
+
+    Returns the ``(period, department)`` rows newest period first, the
+    totals of each department over the range and the grand total.
+    """
+    in_range = []
+    if date_from is not None:
+        in_range.append(PayrollPeriod.end_date >= date_from)
+    if date_to is not None:
+        in_range.append(PayrollPeriod.end_date <= date_to)
+    periods = {
+        period_id: {
+            "period_id": period_id,
+            "period": label,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "status": status,
+        }
+        for period_id, label, start_date, end_date, status in session.execute(
+            select(
+                PayrollPeriod.id,
+                PayrollPeriod.label,
+                PayrollPeriod.start_date,
+                PayrollPeriod.end_date,
+                PayrollPeriod.status,
+            )
+            .where(*in_range)
+            .order_by(PayrollPeriod.start_date.desc(), PayrollPeriod.id.desc())
+        )
+    }
+    names = dict(session.execute(select(Department.id, Department.name)).all())
+
+    rollup = PeriodDepartmentRollup
+    stored = (
+        select(
+            rollup.payroll_period_id,
+            rollup.department_id,
+            rollup.record_count,
+            *(getattr(rollup, column) for column in _MONEY),
+        )
+        .join(PayrollPeriod, PayrollPeriod.id == rollup.payroll_period_id)
+        .where(*in_range)
+    )
+    # Selecting the periods first lets the database use the period index
+    # instead of joining every record to its period.
+    unrolled = select(PayrollPeriod.id).where(
+        *in_range,
+        or_(
+            PayrollPeriod.status == "OPEN",
+            ~exists().where(rollup.payroll_period_id == PayrollPeriod.id),
+        ),
+    )
+    live = (
+        select(
+            PayrollRecord.payroll_period_id,
+            Employee.department_id,
+            func.count(PayrollRecord.id),
+            *(func.sum(getattr(PayrollRecord, attr)) for attr in _MONEY.values()),
+        )
+        .join(Employee, Employee.id == PayrollRecord.employee_id)
+        .where(PayrollRecord.payroll_period_id.in_(unrolled))
+        .group_by(PayrollRecord.payroll_period_id, Employee.department_id)
+    )
+    if department_id is not None:
+        stored = stored.where(rollup.department_id == department_id)
+        live = live.where(Employee.department_id == department_id)
+
+    cells: Dict[int, List[Tuple]] = defaultdict(list)
+    for period_id, row_department, count, *cents in session.execute(stored):
+        cells[period_id].append((row_department, count, cents))
+    for period_id, row_department, count, *money in session.execute(live):
+        cells[period_id].append((row_department, count, [to_cents(value) for value in money]))
+
+    blank = dict.fromkeys(("record_count", *_MONEY), 0)
+    total = dict(blank)
+    departments: Dict[int, Dict] = {}
+    data = []
+    for period_id, period in periods.items():
+        for row_department, count, cents in sorted(
+            cells.get(period_id, ()), key=lambda cell: names.get(cell[0]) or ""
+        ):
+            data.append(
+                {
+                    **period,
+                    "department_id": row_department,
+                    "department": names.get(row_department),
+                    "record_count": count,
+                    **{attr: amount / 100 for attr, amount in zip(_MONEY.values(), cents)},
+                }
+            )
+            entry = departments.setdefault(row_department, dict(blank))
+            for target in (entry, total):
+                target["record_count"] += count
+                for column, amount in zip(_MONEY, cents):
+                    target[column] += amount
+    return {
+        "data": data,
+        "departments": [
+            {"department_id": key, "department": names.get(key), **_totals_dict(entry)}
+            for key, entry in sorted(departments.items(), key=lambda item: names.get(item[0]) or "")
+        ],
+        "totals": _totals_dict(total),
+    }
+
+
+def department_costs_json(session, versions: Tuple | None, **filters) -> bytes:
+    """``department_costs`` encoded as JSON, through the LRU.
+
+    ``versions`` are the table versions the report is read at; ``None``
+    bypasses the cache. The encoded body is cached because serialising a
+    few thousand rows costs more than building the report from rollups.
+    """
+    # ``responses`` imports Flask, which the archive CLI and the worker do not load.
+    from .responses import dumps  # pylint: disable=import-outside-toplevel
+
+    if versions is None:
+        return dumps(department_costs(session, **filters))
+    key = (tuple(sorted(filters.items())), versions)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    body = dumps(department_costs(session, **filters))
+    with _cache_lock:
+        _cache[key] = body
+        while len(_cache) > max(1, settings.analytics_cache_size):
+            _cache.popitem(last=False)
+    return body
@@ -1,25 +1,33 @@
-from pathlib import Path
-
-from dotenv import load_dotenv
 from flask import Flask, render_template
 from flask_cors import CORS
 
+from . import database
 from .config import settings
-from .database import SessionLocal, init_db
+from .database import ReadSessionLocal, SessionLocal, remember_write
+from .instrumentation import install as install_instrumentation
+from .migrations import check_schema, migrate
+from .responses import install as install_responses
+from .routes.analytics import analytics_bp
+from .routes.changes import changes_bp
 from .routes.departments import departments_bp
 from .routes.employees import employees_bp
+from .routes.jobs import jobs_bp
 from .routes.payroll import payroll_bp
+from .routes.payslips import payslips_bp
+from .routes.tax import tax_bp
 
 
 def create_app() -> Flask:
-    """Application factory for the payroll management system."""
-    load_dotenv(Path(__file__).resolve().parent.parent / ".env")
+    """Application factory for the payroll management system.
 
+    Startup reads the schema version with one query and never runs DDL unless
+    ``AUTO_MIGRATE`` is set; use ``python -m backend.migrate`` to upgrade.
+    """
     app = Flask(
         __name__, template_folder="templates", static_folder="static"
     )
     app.config["SECRET_KEY"] = settings.secret_key
-    app.config["JSON_SORT_KEYS"] = False
+    install_responses(app)
 
     CORS(app, resources={r"/api/*": {"origins": "*"}})
 
@@ -27,17 +35,28 @@ def create_app() -> Flask:
     app.register_blueprint(departments_bp)
     app.register_blueprint(employees_bp)
     app.register_blueprint(payroll_bp)
+    app.register_blueprint(changes_bp)
+    app.register_blueprint(payslips_bp)
+    app.register_blueprint(tax_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(analytics_bp)
 
     @app.route("/", methods=["GET"])
     def dashboard():
         return render_template("dashboard.html")
 
-    with app.app_context():
-        init_db()
+    if settings.auto_migrate:
+        migrate(database.engine)
+    else:
+        check_schema(database.engine)
+
+    app.after_request(remember_write)
+    install_instrumentation(app)
 
     @app.teardown_appcontext
     def remove_session(_):
         SessionLocal.remove()
+        ReadSessionLocal.remove()
 
     return app
 
@@ -0,0 +1,509 @@
+"""Cold-period archival into compressed columnar files.
+
+Once a period is ``PAID`` its records can be moved out of ``payroll_records``
+into one Arrow IPC file per period under ``settings.archive_dir``, written
+with zstd compression and sorted by ``(created_at, id)``. The move is one
+transaction: the records are deleted and a ``PeriodArchive`` row marks the
+period archived, so the hot table only holds periods still being worked on.
+Counters and YTD accumulators are left alone because the records still
+exist, only elsewhere; ``PeriodArchive`` carries the totals for
+``backend.counters`` to reconcile against.
+
+Archive files are opened through a memory map and their decompressed
+columns kept in a small per-process LRU (``settings.archive_cache_size``).
+Read paths merge them with live rows: ``archived_candidates`` and
+``merge_record_page`` for the record list, ``archived_record_batches`` for
+payslips and the register export. Needs the optional ``pyarrow`` package.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Connection, Row
+
+from .analytics import refresh_rollups
+from .config import settings
+from .database import session_scope
+from .models import Employee, PayrollPeriod, PayrollRecord, PeriodArchive
+from .pagination import keyset_cursor
+from .money import cents_to_decimal, to_cents
+from .serializers import (
+    Projection,
+    employee_dict,
+    employee_rows,
+    payroll_record_page,
+    period_dict,
+    period_rows,
+)
+from .versions import bump
+
+if TYPE_CHECKING:
+    import numpy as np
+
+log = logging.getLogger(__name__)
+
+_MONEY = {
+    "gross_cents": "gross_pay",
+    "tax_cents": "tax_amount",
+    "deduction_cents": "other_deductions",
+    "net_cents": "net_pay",
+}
+_EPOCH = datetime(1970, 1, 1)
+
+
+class ArchiveUnavailable(RuntimeError):
+    """Raised when archiving is needed but ``pyarrow`` is not installed."""
+
+
+class ArchiveError(ValueError):
+    """Raised when a period cannot be archived."""
+
+
+def _pyarrow():
+    # pylint: disable=import-outside-toplevel
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as exc:
+        raise ArchiveUnavailable("Archiving requires the pyarrow package") from exc
+    return pa
+
+
+def available() -> bool:
+    try:
+        _pyarrow()
+    except ArchiveUnavailable:
+        return False
+    return True
+
+
+def _schema(pa):
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("employee_id", pa.int64()),
+            ("hours_worked", pa.float64()),
+            ("gross_cents", pa.int64()),
+            ("tax_cents", pa.int64()),
+            ("deduction_cents", pa.int64()),
+            ("net_cents", pa.int64()),
+            ("notes", pa.string()),
+            ("created_at", pa.timestamp("us")),
+            ("updated_at", pa.timestamp("us")),
+        ]
+    )
+
+
+def archive_path(period_id: int) -> Path:
+    return Path(settings.archive_dir) / f"period-{period_id:08d}.arrow"
+
+
+def _micros(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _live_batches(period_id: int) -> Iterator[List[Row]]:
+    stmt = (
+        select(
+            PayrollRecord.id,
+            PayrollRecord.employee_id,
+            PayrollRecord.hours_worked,
+            PayrollRecord.gross_pay,
+            PayrollRecord.tax_amount,
+            PayrollRecord.other_deductions,
+            PayrollRecord.net_pay,
+            PayrollRecord.notes,
+            PayrollRecord.created_at,
+            PayrollRecord.updated_at,
+        )
+        .where(PayrollRecord.payroll_period_id == period_id)
+        .order_by(PayrollRecord.created_at, PayrollRecord.id)
+        .execution_options(stream_results=True, yield_per=settings.export_batch_size)
+    )
+    with session_scope() as session:
+        yield from session.execute(stmt).partitions()
+
+
+def archive_period(period_id: int) -> Dict:
+    """Move the records of a paid period into its archive file."""
+    pa = _pyarrow()
+    with session_scope() as session:
+        period = session.get(PayrollPeriod, period_id)
+        if period is None:
+            raise ArchiveError("Payroll period not found")
+        if period.status != "PAID":
+            raise ArchiveError(f"Payroll period is {period.status}, not PAID")
+        if session.get(PeriodArchive, period_id) is not None:
+            raise ArchiveError("Payroll period is already archived")
+
+    path = archive_path(period_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    schema = _schema(pa)
+    totals = dict.fromkeys(("record_count", *_MONEY), 0)
+    first = last = None
+    try:
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        with pa.OSFile(str(partial), "wb") as sink, pa.ipc.new_file(
+            sink, schema, options=options
+        ) as writer:
+            for rows in _live_batches(period_id):
+                columns = [list(values) for values in zip(*rows)]
+                for index, column in enumerate(_MONEY, 3):
+                    columns[index] = [to_cents(value or 0) for value in columns[index]]
+                    totals[column] += sum(columns[index])
+                totals["record_count"] += len(rows)
+                first = first or rows[0].created_at
+                last = rows[-1].created_at
+                writer.write_batch(
+                    pa.record_batch(
+                        [
+                            pa.array(values, type=field.type)
+                            for values, field in zip(columns, schema)
+                        ],
+                        schema=schema,
+                    )
+                )
+
+        with session_scope() as session:
+            connection = session.connection()
+            # Periods closed by a bulk statement have no rollup yet; after the
+            # delete it could only be rebuilt from the archive file.
+            refresh_rollups(connection, [period_id])
+            moved = connection.execute(
+                delete(PayrollRecord).where(PayrollRecord.payroll_period_id == period_id)
+            ).rowcount
+            if moved != totals["record_count"]:
+                raise ArchiveError("Records changed while archiving; try again")
+            os.replace(partial, path)
+            archive = PeriodArchive(
+                payroll_period_id=period_id,
+                path=str(path),
+                min_created_at=first,
+                max_created_at=last,
+                **totals,
+            )
+            session.add(archive)
+            session.flush()
+            bump(connection, [PayrollRecord.__tablename__])
+            result = archive.to_dict()
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+        raise
+    return result
+
+
+def archive_in_background(period_id: int) -> None:
+    """Thread target for archiving right after a period is marked paid."""
+    try:
+        archive_period(period_id)
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Archiving payroll period %s failed", period_id)
+
+
+@dataclass(frozen=True, slots=True)
+class ArchiveInfo:
+    period_id: int
+    path: str
+    # Bounds of ``created_at`` in microseconds since the epoch.
+    min_created: int
+    max_created: int
+
+
+@dataclass(slots=True)
+class _Columns:
+    table: object
+    created: np.ndarray
+    ids: np.ndarray
+    employees: np.ndarray
+
+
+@dataclass(slots=True)
+class ArchivedRecord:
+    """An archived record with the attributes ``payroll_record_rows`` exposes."""
+
+    id: int
+    employee_id: int
+    payroll_period_id: int
+    hours_worked: float
+    gross_pay: Decimal
+    tax_amount: Decimal
+    other_deductions: Decimal
+    net_pay: Decimal
+    notes: str | None
+    created_at: datetime
+
+
+_columns_cache: "OrderedDict[str, _Columns]" = OrderedDict()
+_columns_lock = threading.Lock()
+_index_cache: Dict = {"version": None, "archives": []}
+
+
+def _columns(path: str) -> _Columns:
+    with _columns_lock:
+        if path in _columns_cache:
+            _columns_cache.move_to_end(path)
+            return _columns_cache[path]
+    pa = _pyarrow()
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    columns = _Columns(
+        table=table,
+        created=table.column("created_at").to_numpy().astype(np.int64),
+        ids=table.column("id").to_numpy(),
+        employees=table.column("employee_id").to_numpy(),
+    )
+    with _columns_lock:
+        _columns_cache[path] = columns
+        while len(_columns_cache) > max(1, settings.archive_cache_size):
+            _columns_cache.popitem(last=False)
+    return columns
+
+
+def _index_statement():
+    return select(
+        PeriodArchive.payroll_period_id,
+        PeriodArchive.path,
+        PeriodArchive.min_created_at,
+        PeriodArchive.max_created_at,
+    ).where(PeriodArchive.record_count > 0)
+
+
+def _index_from(rows, version: int | None) -> List[ArchiveInfo]:
+    archives = [
+        ArchiveInfo(period_id, path, _micros(first), _micros(last))
+        for period_id, path, first, last in rows
+    ]
+    if version is not None:
+        _index_cache.update(version=version, archives=archives)
+    return archives
+
+
+def archive_index(session, version: int | None = None) -> List[ArchiveInfo]:
+    """List the non-empty archives, reusing the cached list while ``version``
+    (the ``period_archives`` table version) is unchanged."""
+    if version == 0:
+        return []  # nothing was ever archived
+    if version is not None and _index_cache["version"] == version:
+        return _index_cache["archives"]
+    return _index_from(session.execute(_index_statement()).all(), version)
+
+
+async def archive_index_async(session, version: int | None = None) -> List[ArchiveInfo]:
+    """``archive_index`` for an ``AsyncSession``."""
+    if version == 0:
+        return []
+    if version is not None and _index_cache["version"] == version:
+        return _index_cache["archives"]
+    result = await session.execute(_index_statement())
+    return _index_from(result.all(), version)
+
+
+def _records(period_id: int, table) -> List[ArchivedRecord]:
+    """Convert archived rows column by column; numpy turns ``timestamp[us]``
+    into ``datetime`` objects much faster than a per-row ``to_pylist``."""
+    money = [
+        [cents_to_decimal(cents) for cents in table.column(column).to_numpy().tolist()]
+        for column in _MONEY
+    ]
+    return [
+        ArchivedRecord(record_id, employee_id, period_id, hours, *amounts, notes, created_at)
+        for record_id, employee_id, hours, notes, created_at, *amounts in zip(
+            table.column("id").to_numpy().tolist(),
+            table.column("employee_id").to_numpy().tolist(),
+            table.column("hours_worked").to_numpy().tolist(),
+            table.column("notes").to_pylist(),
+            table.column("created_at").to_numpy().tolist(),
+            *money,
+        )
+    ]
+
+
+def archived_candidates(
+    archives: Sequence[ArchiveInfo],
+    limit: int,
+    before: Sequence | None = None,
+    employee_id: int | None = None,
+    period_id: int | None = None,
+) -> List[ArchivedRecord]:
+    """Return up to ``limit + 1`` archived records, newest first, that sort
+    after the keyset position ``before`` (``[created_at, id]``)."""
+    if period_id is not None:
+        archives = [archive for archive in archives if archive.period_id == period_id]
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    seek = (_micros(before[0]), before[1]) if before else None
+
+    found: List[Tuple[int, int, ArchiveInfo, int]] = []
+    for archive in sorted(archives, key=lambda item: item.max_created, reverse=True):
+        # Archives are visited newest first, so once the page is full an
+        # archive that ends before its last row cannot contribute.
+        if len(found) > limit and archive.max_created < found[limit][0]:
+            break
+        if seek is not None and archive.min_created > seek[0]:
+            continue
+        columns = _columns(archive.path)
+        mask = np.ones(len(columns.ids), dtype=bool)
+        if employee_id is not None:
+            mask &= columns.employees == employee_id
+        if seek is not None:
+            mask &= (columns.created < seek[0]) | (
+                (columns.created == seek[0]) & (columns.ids < seek[1])
+            )
+        positions = np.flatnonzero(mask)[-(limit + 1) :][::-1]
+        found.extend(
+            (int(columns.created[p]), int(columns.ids[p]), archive, int(p)) for p in positions
+        )
+        found.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        del found[limit + 1 :]
+
+    by_archive: Dict[ArchiveInfo, List[int]] = defaultdict(list)
+    for _, _, archive, position in found:
+        by_archive[archive].append(position)
+    loaded = {}
+    for archive, positions in by_archive.items():
+        rows = _columns(archive.path).table.take(positions)
+        loaded.update(
+            ((archive, position), record)
+            for position, record in zip(positions, _records(archive.period_id, rows))
+        )
+    return [loaded[(archive, position)] for _, _, archive, position in found]
+
+
+def merge_record_page(live: Sequence, archived: Sequence[ArchivedRecord], limit: int):
+    """Merge live rows and archived records fetched for the same page.
+
+    Both inputs hold ``limit + 1`` rows at most, ordered newest first; the
+    result and cursor match what ``keyset_result`` gives for live rows alone.
+    """
+    merged = sorted([*live, *archived], key=lambda row: (row.created_at, row.id), reverse=True)
+    if len(merged) <= limit:
+        return merged, None
+    merged = merged[:limit]
+    return merged, keyset_cursor([merged[-1].created_at, merged[-1].id])
+
+
+def lookup_statements(items: Sequence):
+    """Statements for the employees and periods of the archived ``items``."""
+    archived = [item for item in items if isinstance(item, ArchivedRecord)]
+    if not archived:
+        return None
+    return (
+        employee_rows().where(Employee.id.in_({item.employee_id for item in archived})),
+        period_rows().where(PayrollPeriod.id.in_({item.payroll_period_id for item in archived})),
+    )
+
+
+def known_entities(employees: Sequence[Row] = (), periods: Sequence[Row] = ()) -> Dict:
+    """The ``known`` argument of ``payroll_record_page`` for looked-up rows."""
+    return {
+        "employee": {row.id: employee_dict(row) for row in employees},
+        "period": {row.id: period_dict(row) for row in periods},
+    }
+
+
+def record_dicts(
+    items: Sequence, employees: Sequence[Row] = (), periods: Sequence[Row] = ()
+) -> List[Dict]:
+    """Serialize a merged page like ``payroll_record_dict``.
+
+    Employees deleted after archiving keep their archived records, with a
+    ``null`` employee.
+    """
+    data, _ = payroll_record_page(items, known=known_entities(employees, periods))
+    return data
+
+
+def record_page(session, items: Sequence, projection: Projection = Projection()):
+    """``payroll_record_page`` for a merged page, looking up archived entities."""
+    statements = lookup_statements(items)
+    if statements is None:
+        return payroll_record_page(items, projection)
+    employees, periods = (session.execute(stmt).all() for stmt in statements)
+    return payroll_record_page(items, projection, known_entities(employees, periods))
+
+
+def archived_record_batches(period_id: int, batch_size: int) -> Iterator[Tuple[List, List, List]]:
+    """Yield ``(records, employee rows, period rows)`` for the archived records
+    of a period, in file order.
+
+    Records of employees deleted since archiving are skipped, as the join in
+    the live queries would skip them.
+    """
+    with session_scope() as session:
+        archive = session.get(PeriodArchive, period_id)
+        path = archive.path if archive is not None and archive.record_count else None
+    if path is None:
+        return
+    table = _columns(path).table
+    for start in range(0, table.num_rows, batch_size):
+        records = _records(period_id, table.slice(start, batch_size))
+        with session_scope() as session:
+            employees, periods = (
+                session.execute(stmt).all() for stmt in lookup_statements(records)
+            )
+        known = {row.id for row in employees}
+        records = [record for record in records if record.employee_id in known]
+        if records:
+            yield records, employees, periods
+
+
+def archived_employee_totals(path: str) -> List[Dict[str, int]]:
+    """Record count and money totals (cents) per employee of one archive file."""
+    grouped = (
+        _columns(path)
+        .table.group_by("employee_id")
+        .aggregate(
+            [
+                ("id", "count"),
+                ("gross_cents", "sum"),
+                ("tax_cents", "sum"),
+                ("deduction_cents", "sum"),
+                ("net_cents", "sum"),
+            ]
+        )
+        .to_pylist()
+    )
+    return [
+        {
+            "employee_id": row["employee_id"],
+            "record_count": row["id_count"],
+            **{column: row[f"{column}_sum"] for column in _MONEY},
+        }
+        for row in grouped
+    ]
+
+
+def archived_ytd(connection: Connection) -> Dict[Tuple[int, int], Dict[str, int]]:
+    """Per-employee, per-tax-year totals of every archived record."""
+    totals: Dict[Tuple[int, int], Dict[str, int]] = {}
+    rows = connection.execute(
+        select(PeriodArchive.path, PayrollPeriod.end_date)
+        .join(PayrollPeriod, PayrollPeriod.id == PeriodArchive.payroll_period_id)
+        .where(PeriodArchive.record_count > 0)
+    )
+    for path, end_date in rows:
+        for row in archived_employee_totals(path):
+            key = (row["employee_id"], end_date.year)
+            entry = totals.setdefault(
+                key, dict.fromkeys(("record_count", "gross_cents", "tax_cents", "net_cents"), 0)
+            )
+            entry["record_count"] += row["record_count"]
+            for column in ("gross_cents", "tax_cents", "net_cents"):
+                entry[column] += row[column]
+    return totals
@@ -0,0 +1,49 @@
+"""Archive paid payroll periods into compressed columnar files.
+
+Usage::
+
+    python -m backend.archive_periods              # every paid, unarchived period
+    python -m backend.archive_periods --period 12  # one period
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import select
+
+from backend.archive import ArchiveError, ArchiveUnavailable, archive_period
+from backend.database import session_scope
+from backend.models import PayrollPeriod, PeriodArchive
+
+
+def pending_periods() -> list:
+    with session_scope() as session:
+        return list(
+            session.scalars(
+                select(PayrollPeriod.id)
+                .outerjoin(PeriodArchive, PeriodArchive.payroll_period_id == PayrollPeriod.id)
+                .where(PayrollPeriod.status == "PAID", PeriodArchive.payroll_period_id.is_(None))
+                .order_by(PayrollPeriod.end_date)
+            )
+        )
+
+
+def main(period_ids: list) -> bool:
+    """Archive ``period_ids``; return ``False`` if any of them failed."""
+    ok = True
+    for period_id in period_ids:
+        try:
+            archived = archive_period(period_id)
+        except (ArchiveError, ArchiveUnavailable) as exc:
+            print(f"period {period_id}: {exc}")
+            ok = False
+            continue
+        print(f"period {period_id}: archived {archived['record_count']} records")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive paid payroll periods.")
+    parser.add_argument("--period", type=int, action="append", help="period id (repeatable)")
+    args = parser.parse_args()
+    sys.exit(0 if main(args.period or pending_periods()) else 1)
@@ -0,0 +1,316 @@
+"""ASGI entry point: async read endpoints in front of the Flask app.
+
+Run with::
+
+    uvicorn backend.asgi:app --port 8000
+
+The GET endpoints the dashboard polls (departments, employees, payroll
+records and periods, period totals, payroll runs and the summary) are served
+by async handlers on an ``AsyncSession``, so a slow query waits on the event
+loop instead of holding a worker thread. They build the same statements
+(``backend.serializers``, ``backend.search``), cursors and ETags as the Flask
+views, so clients can switch between the two servers freely. Every other
+route (writes, imports, exports, payslips, the dashboard page) is served by
+the unchanged ``create_app()`` application mounted underneath. Responses
+are encoded and compressed as ``backend.responses`` does for Flask.
+"""
+
+from contextlib import asynccontextmanager
+from functools import wraps
+from typing import Any
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse as StarletteJSONResponse
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.http import http_date, parse_accept_header, parse_date, parse_etags, quote_etag
+
+from . import archive, responses
+from .app import create_app
+from .async_database import async_read_session, dispose_engines
+from .config import settings
+from .counters import SUMMARY_ID
+from .database import LAST_WRITE_COOKIE
+from .models import (
+    Department,
+    Employee,
+    PayrollPeriod,
+    PayrollRecord,
+    PayrollRun,
+    PeriodArchive,
+    PeriodTotal,
+    SummaryCounter,
+)
+from .pagination import (
+    InvalidCursor,
+    cursor_keys,
+    int_param,
+    keyset_page_async,
+    keyset_result,
+    keyset_statement,
+    offset_page_async,
+    page_limit,
+    page_response,
+)
+from .search import apply_search
+from .serializers import (
+    DEPARTMENT_FIELDS,
+    EMPLOYEE_FIELDS,
+    PERIOD_FIELDS,
+    RECORD_FIELDS,
+    InvalidProjection,
+    apply_projection,
+    department_dict,
+    department_rows,
+    employee_dict,
+    employee_rows,
+    parse_projection,
+    payroll_record_page,
+    payroll_record_rows,
+    period_dict,
+    period_rows,
+    record_nested,
+)
+from .versions import etag_for, is_not_modified, validator_from_rows, versions_statement
+
+
+class JSONResponse(StarletteJSONResponse):
+    """JSON response encoded with ``backend.responses.dumps``."""
+
+    def render(self, content: Any) -> bytes:
+        return responses.dumps(content)
+
+
+def _session(request: Request):
+    return async_read_session(request.method, request.cookies.get(LAST_WRITE_COOKIE))
+
+
+def _error(message: str, status_code: int) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+def _projection(request: Request, available):
+    params = request.query_params
+    return parse_projection(params.get("fields"), params.get("format"), available)
+
+
+def _compress(request: Request, response: Response) -> bool:
+    """Gzip a JSON response in place, as ``backend.responses.compress`` does."""
+    response.headers.add_vary_header("Accept-Encoding")
+    accepted = parse_accept_header(request.headers.get("accept-encoding"))
+    body = responses.gzip(response.body) if accepted["gzip"] else None
+    if body is None:
+        return False
+    response.body = body
+    response.headers["Content-Length"] = str(len(body))
+    response.headers["Content-Encoding"] = "gzip"
+    return True
+
+
+def conditional(*tables: str):
+    """Async counterpart of ``backend.versions.conditional``.
+
+    The wrapped handler receives the request and the open session, which is
+    the same one used to read the table versions; the versions themselves are
+    left on ``request.state.table_versions``.
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        async def endpoint(request: Request) -> Response:
+            async with _session(request) as session:
+                result = await session.execute(versions_statement(tables))
+                rows = result.all()
+                request.state.table_versions = {name: version for name, version, _ in rows}
+                validator, last_modified = validator_from_rows(rows)
+                etag = etag_for(validator, f"{request.url.path}?{request.url.query}")
+                if is_not_modified(
+                    etag,
+                    last_modified,
+                    parse_etags(request.headers.get("if-none-match")),
+                    parse_date(request.headers.get("if-modified-since")),
+                ):
+                    response = Response(status_code=304)
+                else:
+                    try:
+                        response = await handler(request, session)
+                    except (InvalidCursor, InvalidProjection) as exc:
+                        return _error(str(exc), 400)
+                    if response.status_code != 200:
+                        return response
+
+            # A compressed body gets a weak tag, which If-None-Match still matches.
+            compressed = response.status_code == 200 and settings.compress_responses
+            compressed = compressed and _compress(request, response)
+            response.headers["ETag"] = quote_etag(etag, weak=compressed)
+            if last_modified is not None:
+                response.headers["Last-Modified"] = http_date(last_modified)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        return endpoint
+
+    return decorator
+
+
+@conditional("departments", "employees")
+async def list_departments(request: Request, session) -> Response:
+    limit = page_limit(request.query_params.get("limit"))
+    projection = _projection(request, DEPARTMENT_FIELDS)
+    departments, next_cursor = await keyset_page_async(
+        session,
+        department_rows(),
+        [(Department.name, False), (Department.id, False)],
+        request.query_params.get("cursor"),
+        limit,
+    )
+    data = [department_dict(row) for row in departments]
+    return JSONResponse(
+        page_response(apply_projection(data, projection, DEPARTMENT_FIELDS), limit, next_cursor)
+    )
+
+
+@conditional("employees", "departments")
+async def list_employees(request: Request, session) -> Response:
+    params = request.query_params
+    dept_filter = int_param(params.get("department_id"))
+    cursor = params.get("cursor")
+    limit = page_limit(params.get("limit"))
+    projection = _projection(request, EMPLOYEE_FIELDS)
+
+    search_stmt = apply_search(
+        employee_rows(), session.get_bind().dialect.name, params.get("q", "")
+    )
+    stmt = search_stmt if search_stmt is not None else employee_rows()
+    if dept_filter:
+        stmt = stmt.where(Employee.department_id == dept_filter)
+
+    if search_stmt is not None:
+        employees, next_cursor = await offset_page_async(session, stmt, cursor, limit)
+    else:
+        employees, next_cursor = await keyset_page_async(
+            session,
+            stmt,
+            [(Employee.last_name, False), (Employee.id, False)],
+            cursor,
+            limit,
+        )
+    data = [employee_dict(row) for row in employees]
+    return JSONResponse(
+        page_response(apply_projection(data, projection, EMPLOYEE_FIELDS), limit, next_cursor)
+    )
+
+
+@conditional("payroll_records", "employees", "departments", "payroll_periods", "period_archives")
+async def list_payroll_records(request: Request, session) -> Response:
+    params = request.query_params
+    limit = page_limit(params.get("limit"))
+    cursor = params.get("cursor")
+    keys = [(PayrollRecord.created_at, True), (PayrollRecord.id, True)]
+    projection = _projection(request, RECORD_FIELDS)
+    employee_id = int_param(params.get("employee_id"))
+    period_id = int_param(params.get("period_id"))
+    stmt = payroll_record_rows(record_nested(projection))
+    if employee_id:
+        stmt = stmt.where(PayrollRecord.employee_id == employee_id)
+    if period_id:
+        stmt = stmt.where(PayrollRecord.payroll_period_id == period_id)
+    result = await session.execute(keyset_statement(stmt, keys, cursor, limit))
+    rows = result.all()
+
+    archives = await archive.archive_index_async(
+        session, request.state.table_versions.get(PeriodArchive.__tablename__)
+    )
+    if not archives:
+        records, next_cursor = keyset_result(rows, keys, limit)
+        data, included = payroll_record_page(records, projection)
+        return JSONResponse(page_response(data, limit, next_cursor, **included))
+
+    archived = archive.archived_candidates(
+        archives, limit, cursor_keys(cursor, keys), employee_id, period_id
+    )
+    records, next_cursor = archive.merge_record_page(rows, archived, limit)
+    lookups = []
+    for lookup in archive.lookup_statements(records) or ():
+        lookups.append((await session.execute(lookup)).all())
+    data, included = payroll_record_page(records, projection, archive.known_entities(*lookups))
+    return JSONResponse(page_response(data, limit, next_cursor, **included))
+
+
+@conditional("payroll_periods")
+async def list_periods(request: Request, session) -> Response:
+    limit = page_limit(request.query_params.get("limit"))
+    projection = _projection(request, PERIOD_FIELDS)
+    periods, next_cursor = await keyset_page_async(
+        session,
+        period_rows(),
+        [(PayrollPeriod.start_date, True), (PayrollPeriod.id, True)],
+        request.query_params.get("cursor"),
+        limit,
+    )
+    data = [period_dict(row) for row in periods]
+    return JSONResponse(
+        page_response(apply_projection(data, projection, PERIOD_FIELDS), limit, next_cursor)
+    )
+
+
+@conditional("payroll_records", "payroll_periods")
+async def period_totals(request: Request, session) -> Response:
+    totals = await session.get(PeriodTotal, request.path_params["period_id"])
+    if not totals:
+        return _error("Payroll period not found", 404)
+    return JSONResponse({"data": totals.to_dict()})
+
+
+@conditional("payroll_records", "employees", "departments", "payroll_periods")
+async def payroll_summary(_request: Request, session) -> Response:
+    counters = await session.get(SummaryCounter, SUMMARY_ID)
+    return JSONResponse(
+        {
+            "totalEmployees": counters.total_employees,
+            "totalDepartments": counters.total_departments,
+            "totalNetPay": counters.net_cents / 100,
+            "periods": counters.total_periods,
+        }
+    )
+
+
+async def get_payroll_run(request: Request) -> Response:
+    async with _session(request) as session:
+        run = await session.get(PayrollRun, request.path_params["run_id"])
+        if not run:
+            return _error("Payroll run not found", 404)
+        return JSONResponse({"data": run.to_dict()})
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    yield
+    await dispose_engines()
+
+
+def create_asgi_app() -> Starlette:
+    """Build the ASGI application around a fresh ``create_app()``."""
+    return Starlette(
+        routes=[
+            Route("/api/departments", list_departments, methods=["GET"]),
+            Route("/api/employees", list_employees, methods=["GET"]),
+            Route("/api/payroll-records", list_payroll_records, methods=["GET"]),
+            Route("/api/payroll-periods", list_periods, methods=["GET"]),
+            Route("/api/payroll-periods/{period_id:int}/totals", period_totals, methods=["GET"]),
+            Route("/api/payroll-runs/{run_id:int}", get_payroll_run, methods=["GET"]),
+            Route("/api/summary", payroll_summary, methods=["GET"]),
+            Mount("/", app=WSGIMiddleware(create_app())),
+        ],
+        middleware=[
+            Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+        ],
+        lifespan=lifespan,
+    )
+
+
+app = create_asgi_app()
@@ -0,0 +1,101 @@
+"""Async engines and sessions for the ASGI entry point (``backend.asgi``).
+
+The URLs are derived from ``DATABASE_URL`` / ``READ_DATABASE_URL`` by
+swapping in an async driver (aiosqlite for SQLite, aiomysql for MySQL), or
+taken from ``ASYNC_DATABASE_URL`` when set. SQLite connections get the same
+pragmas as the sync engine in ``backend.database``.
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .config import settings
+from .database import _apply_sqlite_pragmas, within_write_window
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+    "mariadb": "mariadb+aiomysql",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Return ``url`` with the async driver for its backend."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """Async counterpart of ``database.create_db_engine``."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return create_async_engine(
+            url,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+
+    in_memory = parsed.database in (None, "", ":memory:")
+    options = {} if in_memory else {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+    engine = create_async_engine(
+        url, connect_args={"timeout": settings.sqlite_busy_timeout_ms / 1000}, **options
+    )
+    if not in_memory:
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+async_engine = create_async_db_engine(
+    settings.async_database_url or to_async_url(settings.database_url)
+)
+async_read_engine = (
+    create_async_db_engine(to_async_url(settings.read_database_url))
+    if settings.read_database_url
+    else None
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+AsyncReadSessionLocal = (
+    async_sessionmaker(async_read_engine, expire_on_commit=False)
+    if async_read_engine is not None
+    else AsyncSessionLocal
+)
+
+
+@asynccontextmanager
+async def async_read_session(method: str, last_write: str | None) -> AsyncGenerator[AsyncSession, None]:
+    """Provide a read-only session, on the replica unless the client just wrote."""
+    factory = (
+        AsyncSessionLocal
+        if async_read_engine is None or within_write_window(method, last_write)
+        else AsyncReadSessionLocal
+    )
+    async with factory() as session:
+        yield session
+
+
+async def dispose_engines() -> None:
+    await async_engine.dispose()
+    if async_read_engine is not None:
+        await async_read_engine.dispose()
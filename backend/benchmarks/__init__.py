@@ -0,0 +1 @@
+"""Performance benchmarks, runnable with ``python -m backend.benchmarks.<name>``."""
@@ -0,0 +1,132 @@
+"""Shared helpers for the benchmark scripts."""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Generator, Iterator
+
+from sqlalchemy import create_engine, event, insert
+
+from backend import counters, database
+from backend.models import Department, Employee, PayrollPeriod, PayrollRecord
+
+
+def use_temporary_database(tuned: bool = True) -> str:
+    """Point the shared engine and session factory at a fresh SQLite file.
+
+    ``tuned=False`` uses a bare ``create_engine`` without the pool settings
+    and pragmas of ``database.create_db_engine``.
+    """
+    path = Path(tempfile.mkdtemp(prefix="payroll-bench-")) / "bench.db"
+    url = f"sqlite:///{path}"
+    database.SessionLocal.remove()
+    database.engine.dispose()
+    database.engine = (
+        database.create_db_engine(url) if tuned else create_engine(url, echo=False, future=True)
+    )
+    database.SessionLocal.configure(bind=database.engine)
+    database.init_db()
+    return url
+
+
+def seed_employees(count: int, departments: int = 10) -> None:
+    """Bulk insert ``count`` employees spread across ``departments``."""
+    with database.session_scope() as session:
+        session.execute(
+            insert(Department),
+            [{"name": f"Department {i}"} for i in range(departments)],
+        )
+        rows = (
+            {
+                "first_name": f"First{i}",
+                "last_name": f"Last{i:07d}",
+                "email": f"employee{i}@example.com",
+                "base_rate": 250 + i % 300,
+                "department_id": 1 + i % departments,
+                "employment_type": "FULL_TIME",
+                "hire_date": date(2020, 1, 1),
+            }
+            for i in range(count)
+        )
+        for batch in _batched(rows, 5000):
+            session.execute(insert(Employee), batch)
+        counters.rebuild(session.connection())
+
+
+def seed_period_records(label: str, records: int) -> int:
+    """Create a period holding ``records`` records, one per employee."""
+    with database.session_scope() as session:
+        period = PayrollPeriod(label=label, start_date=date(2024, 1, 1), end_date=date(2024, 1, 15))
+        session.add(period)
+        session.flush()
+        now = datetime.utcnow()
+        for start in range(1, records + 1, 5000):
+            session.execute(
+                insert(PayrollRecord),
+                [
+                    {
+                        "employee_id": employee_id,
+                        "payroll_period_id": period.id,
+                        "hours_worked": 80,
+                        "gross_pay": 20000,
+                        "tax_amount": 2000,
+                        "other_deductions": 0,
+                        "net_pay": 18000,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for employee_id in range(start, min(start + 5000, records + 1))
+                ],
+            )
+        return period.id
+
+
+def _batched(rows: Iterator, size: int) -> Generator[list, None, None]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@contextmanager
+def timed(label: str) -> Generator[dict, None, None]:
+    """Time the enclosed block and print the elapsed wall-clock seconds."""
+    result: dict = {}
+    start = time.perf_counter()
+    yield result
+    result["seconds"] = time.perf_counter() - start
+    print(f"{label:<40} {result['seconds']:10.3f}s")
+
+
+def percentiles(values: list, points=(50, 95, 99)) -> dict:
+    """Return ``{point: value}`` using nearest-rank percentiles."""
+    ordered = sorted(values)
+    if not ordered:
+        return {point: 0.0 for point in points}
+    return {
+        point: ordered[min(len(ordered) - 1, max(0, round(point / 100 * len(ordered)) - 1))]
+        for point in points
+    }
+
+
+@contextmanager
+def count_queries() -> Generator[list, None, None]:
+    """Collect every SQL statement executed on the shared engine."""
+    statements: list = []
+
+    def _record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(database.engine, "before_cursor_execute", _record)
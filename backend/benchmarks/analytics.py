@@ -0,0 +1,114 @@
+"""Measure ``/api/analytics/department-costs`` against a live GROUP BY.
+
+Usage::
+
+    python -m backend.benchmarks.analytics --employees 2000 --periods 130
+
+Generates ``--periods`` biweekly periods (130 is five years) with
+``backend.synthetic``, all paid but the newest, and times the grouped
+aggregate over every record next to the rollup-backed report: uncached
+(``department_costs`` alone), through the endpoint with an empty cache and
+with a warm one, and the first request after a record of the open period
+changed. The report totals must match the live aggregate; the script exits
+non-zero if they do not.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from sqlalchemy import func, select
+
+from backend import analytics, create_app
+from backend.benchmarks._harness import count_queries, percentiles, timed, use_temporary_database
+from backend.database import session_scope
+from backend.models import Employee, PayrollPeriod, PayrollRecord
+from backend.money import to_cents
+from backend.synthetic import generate
+
+URL = "/api/analytics/department-costs"
+
+
+def _naive_statement():
+    return (
+        select(
+            PayrollPeriod.id,
+            Employee.department_id,
+            func.count(PayrollRecord.id),
+            func.sum(PayrollRecord.gross_pay),
+            func.sum(PayrollRecord.net_pay),
+        )
+        .join(PayrollPeriod, PayrollPeriod.id == PayrollRecord.payroll_period_id)
+        .join(Employee, Employee.id == PayrollRecord.employee_id)
+        .group_by(PayrollPeriod.id, Employee.department_id)
+    )
+
+
+def _p50(call, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)[50]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--departments", type=int, default=16)
+    parser.add_argument("--employees", type=int, default=2_000)
+    parser.add_argument("--periods", type=int, default=130)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    use_temporary_database()
+    client = create_app().test_client()
+    with timed("generate"):
+        report = generate(args.departments, args.employees, args.periods)
+    print(f"{report.records} records in {report.periods} periods")
+
+    with session_scope() as session:
+        naive_rows = session.execute(_naive_statement()).all()
+        naive = _p50(lambda: session.execute(_naive_statement()).all(), max(1, args.repeat // 4))
+        rollup = _p50(lambda: analytics.department_costs(session), args.repeat)
+    expected = (
+        sum(row[2] for row in naive_rows),
+        sum(to_cents(row[3]) for row in naive_rows),
+        sum(to_cents(row[4]) for row in naive_rows),
+    )
+
+    def cold():
+        analytics._cache.clear()  # pylint: disable=protected-access
+        return client.get(URL)
+
+    cold_endpoint = _p50(cold, args.repeat)
+    warm_endpoint = _p50(lambda: client.get(URL), args.repeat)
+    with count_queries() as executed:
+        totals = client.get(URL).get_json()["totals"]
+    print(f"{'live GROUP BY over every record':<40} {naive * 1000:9.2f} ms")
+    print(f"{'department_costs (rollups + open period)':<40} {rollup * 1000:9.2f} ms")
+    print(f"{'endpoint, empty cache':<40} {cold_endpoint * 1000:9.2f} ms")
+    print(f"{'endpoint, cached':<40} {warm_endpoint * 1000:9.2f} ms ({len(executed)} statements)")
+
+    with session_scope() as session:
+        open_record = session.scalar(
+            select(PayrollRecord)
+            .join(PayrollPeriod, PayrollPeriod.id == PayrollRecord.payroll_period_id)
+            .where(PayrollPeriod.status == "OPEN")
+            .limit(1)
+        )
+        open_record.notes = "benchmark"
+    start = time.perf_counter()
+    client.get(URL)
+    print(f"{'endpoint after an open-period write':<40} {(time.perf_counter() - start) * 1000:9.2f} ms")
+
+    got = (totals["record_count"], to_cents(totals["gross_pay"]), to_cents(totals["net_pay"]))
+    if got != expected:
+        print(f"report totals {got} differ from the live aggregate {expected}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Measure the hot table and read latency before and after archiving.
+
+Usage::
+
+    python -m backend.benchmarks.archive --employees 20000 --periods 12
+
+Seeds ``--periods`` periods of one record per employee, marks all but the
+newest one paid and times the record list (first page, a filtered page of
+the oldest period and an employee's history) and the register export of the
+oldest period. Every paid period is then archived and the same requests are
+timed again, cold (first read of each archive file) and warm. The responses
+must match the ones served before archiving; the script exits non-zero if
+they do not.
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import func, select, update
+
+from backend import archive, create_app
+from backend.benchmarks._harness import (
+    percentiles,
+    seed_employees,
+    seed_period_records,
+    timed,
+    use_temporary_database,
+)
+from backend.config import settings
+from backend.database import session_scope
+from backend.models import PayrollPeriod, PayrollRecord
+
+
+def _urls(oldest: int, employee_id: int) -> dict:
+    return {
+        "first page": "/api/payroll-records?limit=50",
+        "oldest period": f"/api/payroll-records?limit=50&period_id={oldest}",
+        "employee history": f"/api/payroll-records?limit=50&employee_id={employee_id}",
+        "oldest register": f"/api/payroll-periods/{oldest}/register.csv",
+    }
+
+
+def _measure(client, urls: dict, repeat: int) -> dict:
+    results = {}
+    for name, url in urls.items():
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = client.get(url)
+            body = response.get_data()
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, body[:200]
+        results[name] = (percentiles(latencies)[50], body)
+    return results
+
+
+def _report(label: str, results: dict) -> None:
+    for name, (median, _) in results.items():
+        print(f"  {label:<8} {name:<20} p50 {median * 1000:8.2f} ms")
+
+
+def _live_records() -> int:
+    with session_scope() as session:
+        return session.scalar(select(func.count(PayrollRecord.id)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=20_000)
+    parser.add_argument("--periods", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    use_temporary_database()
+    settings.archive_dir = tempfile.mkdtemp(prefix="payroll-archive-")
+    settings.archive_on_paid = False
+    seed_employees(args.employees)
+    period_ids = [seed_period_records(f"P{n}", args.employees) for n in range(args.periods)]
+    paid = period_ids[:-1]
+    with session_scope() as session:
+        session.execute(
+            update(PayrollPeriod).where(PayrollPeriod.id.in_(paid)).values(status="PAID")
+        )
+
+    client = create_app().test_client()
+    urls = _urls(paid[0], args.employees // 2)
+    print(f"payroll_records before: {_live_records()} rows")
+    before = _measure(client, urls, args.repeat)
+    _report("live", before)
+
+    with timed(f"archive {len(paid)} periods"):
+        for period_id in paid:
+            archive.archive_period(period_id)
+    size = sum(path.stat().st_size for path in Path(settings.archive_dir).iterdir())
+    print(f"payroll_records after: {_live_records()} rows, archives {size / 2**20:.1f} MiB")
+
+    archive._columns_cache.clear()  # pylint: disable=protected-access
+    cold = _measure(client, urls, 1)
+    _report("cold", cold)
+    warm = _measure(client, urls, args.repeat)
+    _report("warm", warm)
+
+    mismatched = [name for name in urls if before[name][1] != warm[name][1]]
+    for name in mismatched:
+        print(f"response changed after archiving: {name}")
+    shutil.rmtree(settings.archive_dir, ignore_errors=True)
+    sys.exit(1 if mismatched else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Compare mixed reader/writer throughput with and without the engine tuning.
+
+Usage::
+
+    python -m backend.benchmarks.concurrency --readers 8 --writers 2 --seconds 5
+
+Each mode gets a fresh SQLite file seeded with the same employees. Reader
+threads fetch a page of employees plus the dashboard summary; writer threads
+update one employee per transaction through the ORM, so the counter and
+version listeners run as they do in the app. ``baseline`` is a bare
+``create_engine``; ``tuned`` is ``database.create_db_engine`` (WAL,
+``synchronous=NORMAL``, mmap, cache size, busy timeout, sized pool).
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from backend import database
+from backend.benchmarks._harness import seed_employees, use_temporary_database
+from backend.counters import SUMMARY_ID
+from backend.models import Employee, SummaryCounter
+from backend.serializers import employee_rows
+
+
+def _reader(stop: threading.Event, employees: int, stats: dict) -> None:
+    rng = random.Random()
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with database.session_scope() as session:
+                offset = rng.randrange(max(employees - 50, 1))
+                session.execute(
+                    employee_rows().order_by(Employee.last_name, Employee.id).where(
+                        Employee.id > offset
+                    ).limit(50)
+                ).all()
+                session.get(SummaryCounter, SUMMARY_ID)
+        except OperationalError:
+            stats["read_errors"] += 1
+            continue
+        stats["read_latency"].append(time.perf_counter() - start)
+
+
+def _writer(stop: threading.Event, employees: int, stats: dict) -> None:
+    rng = random.Random()
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with database.session_scope() as session:
+                employee = session.get(Employee, rng.randrange(1, employees + 1))
+                employee.base_rate = rng.randrange(250, 600)
+        except OperationalError:
+            stats["write_errors"] += 1
+            continue
+        stats["write_latency"].append(time.perf_counter() - start)
+
+
+def run(mode: str, args) -> None:
+    use_temporary_database(tuned=mode == "tuned")
+    seed_employees(args.employees)
+    database.SessionLocal.remove()
+    with database.engine.connect() as connection:
+        journal = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+
+    stats = {"read_latency": [], "write_latency": [], "read_errors": 0, "write_errors": 0}
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=_reader, args=(stop, args.employees, stats))
+        for _ in range(args.readers)
+    ] + [
+        threading.Thread(target=_writer, args=(stop, args.employees, stats))
+        for _ in range(args.writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    database.SessionLocal.remove()
+
+    def p95(values):
+        return statistics.quantiles(values, n=20)[-1] * 1000 if len(values) > 1 else 0.0
+
+    print(
+        f"{mode:<9} journal={journal:<7}"
+        f" reads/s={len(stats['read_latency']) / args.seconds:8.0f}"
+        f" (p95 {p95(stats['read_latency']):6.1f} ms, errors {stats['read_errors']})"
+        f" writes/s={len(stats['write_latency']) / args.seconds:7.0f}"
+        f" (p95 {p95(stats['write_latency']):6.1f} ms, errors {stats['write_errors']})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--employees", type=int, default=10_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--mode", choices=["baseline", "tuned", "both"], default="both")
+    args = parser.parse_args()
+
+    for mode in ("baseline", "tuned") if args.mode == "both" else (args.mode,):
+        run(mode, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Measure the in-memory employee directory behind ``/api/employees/suggest``.
+
+Usage::
+
+    python -m backend.benchmarks.directory --employees 100000
+
+Reports the load time and the memory the directory holds (``tracemalloc``),
+the latency of ``EmployeeDirectory.suggest`` alone and through the endpoint,
+next to the ranked ``/api/employees?q=`` search, the cost of applying a
+committed update to the index and of catching up after a bulk update of
+30% of the employees, as the importer makes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import update
+
+from backend import create_app, versions
+from backend.benchmarks._harness import (
+    percentiles,
+    seed_employees,
+    timed,
+    use_temporary_database,
+)
+from backend.database import session_scope
+from backend.directory import directory
+from backend.models import Employee
+
+QUERIES = ["last00012", "first4", "employee99", "first1 last0001", "nomatch"]
+
+
+def _latencies(call, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    use_temporary_database()
+    seed_employees(args.employees)
+    client = create_app().test_client()
+
+    tracemalloc.start()
+    with timed(f"load {args.employees} employees"):
+        directory.load()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{'directory memory':<40} {held / 2**20:9.1f} MiB")
+    print(f"{'per 100k employees':<40} {held / 2**20 * 100_000 / args.employees:9.1f} MiB")
+
+    print(f"{'query':<18} {'suggest p50/p99':>18} {'endpoint p50':>14} {'?q= p50':>10}")
+    for term in QUERIES:
+        direct = _latencies(lambda: directory.suggest(term), args.repeat)
+        endpoint = _latencies(
+            lambda: client.get("/api/employees/suggest", query_string={"q": term}),
+            args.repeat // 10,
+        )
+        search = _latencies(
+            lambda: client.get("/api/employees", query_string={"q": term}), args.repeat // 10
+        )
+        print(
+            f"{term:<18} {direct[50] * 1e6:7.1f}/{direct[99] * 1e6:6.1f} us "
+            f"{endpoint[50] * 1000:11.2f}ms {search[50] * 1000:8.2f}ms"
+        )
+
+    response = client.put("/api/employees/1", json={"last_name": "Renamed"})
+    assert response.status_code == 200, response.get_json()
+    assert directory.suggest("renamed")[0].id == 1, "update was not applied"
+    entry = directory.suggest("renamed")[0]
+    applied = _latencies(lambda: directory.apply({1: entry}), args.repeat)
+    print(f"{'apply one update p50':<40} {applied[50] * 1e6:9.1f} us")
+
+    with session_scope() as session:
+        session.execute(
+            update(Employee)
+            .where(Employee.id % 10 < 3)
+            .values(last_name=Employee.last_name + "b", updated_at=datetime.utcnow())
+        )
+        versions.bump(session.connection(), [Employee.__tablename__])
+    directory._checked_at = 0.0  # pylint: disable=protected-access
+    with timed("catch up after a bulk update of 30%"):
+        directory.suggest("last")
+    with timed(f"reload {args.employees} employees"):
+        directory.load()
+
+
+if __name__ == "__main__":
+    main()
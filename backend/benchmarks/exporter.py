@@ -0,0 +1,62 @@
+"""Check that streaming the payroll register uses constant memory.
+
+Usage::
+
+    python -m backend.benchmarks.exporter --sizes 1000 100000 --format csv
+
+For each size a period with that many records is created and its register is
+streamed through the Flask test client, consuming the body chunk by chunk.
+Peak traced Python allocations should stay flat as the size grows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+
+from sqlalchemy import func, select
+
+from backend.app import create_app
+from backend.benchmarks._harness import (
+    seed_employees,
+    seed_period_records,
+    timed,
+    use_temporary_database,
+)
+from backend.database import session_scope
+from backend.models import Employee
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--format", choices=["csv", "ndjson", "parquet"], default="csv")
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+
+    print(f"database: {use_temporary_database()}")
+    app = create_app()
+    seed_employees(max(args.sizes))
+    with session_scope() as session:
+        assert session.scalar(select(func.count(Employee.id))) >= max(args.sizes)
+
+    client = app.test_client()
+    headers = {"Accept-Encoding": "gzip"} if args.gzip else {}
+    for size in args.sizes:
+        period_id = seed_period_records(f"Bench {size}", size)
+        tracemalloc.start()
+        with timed(f"export {size} records ({args.format})"):
+            response = client.get(
+                f"/api/payroll-periods/{period_id}/register.{args.format}",
+                headers=headers,
+                buffered=False,
+            )
+            body = sum(len(chunk) for chunk in response.response)
+            response.close()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{'':<40} {body / 1e6:9.1f} MB body, {peak / 1e6:6.1f} MB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Measure streaming employee import throughput and peak memory.
+
+Usage::
+
+    python -m backend.benchmarks.importer --rows 1000000 --format csv
+
+The input file is generated on disk first, so reading it is part of the
+measurement but generating it is not.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import resource
+import tempfile
+
+from backend.benchmarks._harness import timed, use_temporary_database
+from backend.database import session_scope
+from backend.importer import import_employees
+from backend.models import Department
+
+DEPARTMENTS = [f"Department {i}" for i in range(20)]
+FIELDS = ["first_name", "last_name", "email", "base_rate", "department", "employment_type", "hire_date"]
+
+
+def write_file(path: str, rows: int, fmt: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, FIELDS) if fmt == "csv" else None
+        if writer:
+            writer.writeheader()
+        for i in range(rows):
+            row = {
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "email": f"user{i}@example.com",
+                "base_rate": f"{250 + i % 500}.50",
+                "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+                "employment_type": "FULL_TIME",
+                "hire_date": "2024-01-15",
+            }
+            if writer:
+                writer.writerow(row)
+            else:
+                handle.write(json.dumps(row) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--batch-size", type=int)
+    args = parser.parse_args()
+
+    use_temporary_database()
+    with session_scope() as session:
+        session.add_all(Department(name=name) for name in DEPARTMENTS)
+
+    path = os.path.join(tempfile.mkdtemp(), f"employees.{args.format}")
+    write_file(path, args.rows, args.format)
+    print(f"input file: {os.path.getsize(path) / 1e6:.1f} MB")
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for label in ("insert", "re-import (upsert)"):
+        with open(path, "rb") as handle, timed(f"{label} x{args.rows}") as result:
+            report = import_employees(handle, args.format, args.batch_size)
+        assert report.error_count == 0, report.errors[:5]
+        print(f"{'rows/s':<40} {args.rows / result['seconds']:10.0f}")
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{'peak RSS growth (MB)':<40} {(rss_after - rss_before) / 1024:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Measure the per-request cost of ``backend.instrumentation``.
+
+Usage::
+
+    python -m backend.benchmarks.instrumentation --requests 2000
+
+The same endpoints are called through the Flask test client on an app built
+with ``METRICS_ENABLED`` off and then on an app built with it on. The
+disabled app must match an uninstrumented build, since ``install`` registers
+nothing; the enabled app pays for the engine events, the request hooks and
+the histogram updates.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from backend import create_app
+from backend.benchmarks._harness import percentiles, seed_employees, use_temporary_database
+from backend.config import settings
+
+URLS = ("/api/employees?limit=50", "/api/departments", "/api/summary")
+
+
+def _measure(client, requests: int) -> dict:
+    latencies = []
+    for index in range(requests):
+        start = time.perf_counter()
+        response = client.get(URLS[index % len(URLS)])
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_json()
+    return percentiles(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--employees", type=int, default=5_000)
+    args = parser.parse_args()
+
+    use_temporary_database()
+    seed_employees(args.employees)
+
+    results = {}
+    # Disabled first: enabling attaches engine listeners for the process.
+    for enabled in (False, True):
+        settings.metrics_enabled = enabled
+        client = create_app().test_client()
+        _measure(client, 100)  # warm up
+        results[enabled] = _measure(client, args.requests)
+        label = "enabled" if enabled else "disabled"
+        points = results[enabled]
+        print(
+            f"{label:<10} p50 {points[50] * 1000:6.2f} ms  p95 {points[95] * 1000:6.2f} ms  "
+            f"p99 {points[99] * 1000:6.2f} ms"
+        )
+
+    overhead = results[True][50] / results[False][50] - 1
+    print(f"median overhead when enabled: {overhead:+.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Compare the sync (Flask/WSGI) and async (ASGI) servers under load.
+
+Usage::
+
+    python -m backend.benchmarks.load_test --clients 500 --seconds 10
+
+A temporary database is seeded, then each server is started in a subprocess
+on it in turn: the threaded Werkzeug server around ``create_app()`` and
+uvicorn serving ``backend.asgi:app``. ``--clients`` concurrent asyncio
+clients each request the dashboard's read endpoints in a loop, one
+connection per request, and throughput, latency percentiles and failed
+requests are reported per server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from backend.benchmarks._harness import (
+    percentiles,
+    seed_employees,
+    seed_period_records,
+    use_temporary_database,
+)
+
+PATHS = [
+    "/api/summary",
+    "/api/departments",
+    "/api/employees?limit=50",
+    "/api/employees?q=first12&limit=20",
+    "/api/payroll-records?limit=50",
+    "/api/payroll-periods",
+]
+SERVERS = {
+    "sync": [
+        sys.executable,
+        "-c",
+        "import sys; from werkzeug.serving import run_simple; from backend.app import create_app;"
+        " run_simple('127.0.0.1', int(sys.argv[1]), create_app(), threaded=True)",
+    ],
+    "async": [sys.executable, "-m", "uvicorn", "backend.asgi:app", "--log-level", "warning", "--port"],
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+async def _get(port: int, path: str) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def _client(index: int, port: int, stop_at: float, stats: dict) -> None:
+    n = index
+    while time.monotonic() < stop_at:
+        path = PATHS[n % len(PATHS)]
+        n += 1
+        start = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(_get(port, path), timeout=30)
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            stats["errors"] += 1
+            continue
+        if status != 200:
+            stats["errors"] += 1
+            continue
+        stats["latency"].append(time.perf_counter() - start)
+
+
+async def _load(port: int, clients: int, seconds: float) -> dict:
+    stats = {"latency": [], "errors": 0}
+    stop_at = time.monotonic() + seconds
+    await asyncio.gather(*(_client(i, port, stop_at, stats) for i in range(clients)))
+    return stats
+
+
+def run(name: str, database_url: str, args) -> None:
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": database_url, "FLASK_ENV": "production"}
+    server = subprocess.Popen(
+        SERVERS[name] + [str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_until_up(port)
+        stats = asyncio.run(_load(port, args.clients, args.seconds))
+    finally:
+        server.terminate()
+        server.wait()
+
+    latency = percentiles(stats["latency"])
+    print(
+        f"{name:<6} {args.clients} clients: {len(stats['latency']) / args.seconds:8.0f} req/s"
+        f"  p50 {latency[50] * 1000:7.1f} ms  p95 {latency[95] * 1000:7.1f} ms"
+        f"  p99 {latency[99] * 1000:7.1f} ms  errors {stats['errors']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--employees", type=int, default=5_000)
+    parser.add_argument("--server", choices=["sync", "async", "both"], default="both")
+    args = parser.parse_args()
+
+    database_url = use_temporary_database()
+    seed_employees(args.employees)
+    seed_period_records("Load test", args.employees)
+    print(f"database: {database_url}")
+
+    for name in ("sync", "async") if args.server == "both" else (args.server,):
+        run(name, database_url, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark and property-check the integer-cents pay kernel.
+
+Usage::
+
+    python -m backend.benchmarks.pay_calc --rows 1000000 --verify 5000000
+
+``--verify`` compares the kernel with a ``decimal.Decimal`` reference over
+random fixed-point inputs and exits non-zero on the first mismatch.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from decimal import ROUND_HALF_EVEN, Decimal
+
+import numpy as np
+
+from backend.benchmarks._harness import timed
+from backend.pay_calc import (
+    CENTS,
+    HOURS_SCALE,
+    TAX_RATE_SCALE,
+    compute_pay,
+    compute_pay_fixed,
+)
+
+CENT = Decimal("0.01")
+
+
+def decimal_reference(hours_centi, rate_cents, tax_micro, deduction_cents):
+    """Reference implementation of the kernel using ``Decimal``."""
+    hours = Decimal(hours_centi) / HOURS_SCALE
+    rate = Decimal(rate_cents) / CENTS
+    gross = (hours * rate).quantize(CENT, rounding=ROUND_HALF_EVEN)
+    tax = (gross * Decimal(tax_micro) / TAX_RATE_SCALE).quantize(
+        CENT, rounding=ROUND_HALF_EVEN
+    )
+    deductions = Decimal(deduction_cents) / CENTS
+    return gross, tax, gross - tax - deductions
+
+
+def verify(total: int, batch: int = 200_000, seed: int = 7) -> bool:
+    rng = np.random.default_rng(seed)
+    checked = 0
+    while checked < total:
+        size = min(batch, total - checked)
+        hours = rng.integers(0, 200 * HOURS_SCALE, size)
+        rates = rng.integers(0, 5_000 * CENTS, size)
+        taxes = rng.integers(0, TAX_RATE_SCALE + 1, size)
+        deductions = rng.integers(0, 10_000 * CENTS, size)
+        result = compute_pay_fixed(hours, rates, taxes, deductions)
+        for i in range(size):
+            gross, tax, net = decimal_reference(
+                int(hours[i]), int(rates[i]), int(taxes[i]), int(deductions[i])
+            )
+            actual = (
+                Decimal(int(result.gross_cents[i])) / CENTS,
+                Decimal(int(result.tax_cents[i])) / CENTS,
+                Decimal(int(result.net_cents[i])) / CENTS,
+            )
+            if actual != (gross, tax, net):
+                print(
+                    "mismatch for",
+                    (int(hours[i]), int(rates[i]), int(taxes[i]), int(deductions[i])),
+                    actual,
+                    (gross, tax, net),
+                )
+                return False
+        checked += size
+        print(f"verified {checked} rows", end="\r")
+    print(f"verified {checked} rows against Decimal: OK")
+    return True
+
+
+def benchmark(rows: int) -> None:
+    rng = np.random.default_rng(1)
+    hours = rng.uniform(1, 80, rows).round(2)
+    rates = rng.uniform(100, 1000, rows).round(2)
+    deductions = rng.uniform(0, 1000, rows).round(2)
+
+    with timed(f"scalar float loop x{rows}"):
+        for h, r, d in zip(hours.tolist(), rates.tolist(), deductions.tolist()):
+            gross = h * r
+            tax = gross * 0.12
+            gross - tax - d  # noqa: B018
+
+    with timed(f"scalar Decimal loop x{rows}"):
+        rate_tax = Decimal("0.12")
+        for h, r, d in zip(hours.tolist(), rates.tolist(), deductions.tolist()):
+            gross = (Decimal(str(h)) * Decimal(str(r))).quantize(CENT, ROUND_HALF_EVEN)
+            tax = (gross * rate_tax).quantize(CENT, ROUND_HALF_EVEN)
+            gross - tax - Decimal(str(d))  # noqa: B018
+
+    with timed(f"vectorized int64 cents x{rows}"):
+        compute_pay(hours, rates, 0.12, deductions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--verify", type=int, default=0, metavar="N")
+    args = parser.parse_args()
+    if args.rows:
+        benchmark(args.rows)
+    if args.verify and not verify(args.verify):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare a bulk payroll run with the per-record endpoint.
+
+Usage::
+
+    python -m backend.benchmarks.payroll_runs --employees 10000 100000
+
+The per-record path is measured on at most ``--per-record-sample`` requests
+and extrapolated to the full headcount, since posting 100k records one by one
+takes long enough to dominate the benchmark.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from backend import create_app
+from backend.benchmarks._harness import seed_employees, timed, use_temporary_database
+
+
+def run(employees: int, per_record_sample: int) -> None:
+    use_temporary_database()
+    seed_employees(employees)
+    client = create_app().test_client()
+    print(f"--- {employees} employees ---")
+
+    sample = min(employees, per_record_sample)
+    with timed(f"per-record POST x{sample}") as per_record:
+        for employee_id in range(1, sample + 1):
+            response = client.post(
+                "/api/payroll-records",
+                json={
+                    "employee_id": employee_id,
+                    "period_label": "Per-record period",
+                    "period_start": "2025-01-01",
+                    "period_end": "2025-01-07",
+                    "hours_worked": 40,
+                    "tax_rate": 0.12,
+                },
+            )
+            assert response.status_code == 201, response.get_json()
+    projected = per_record["seconds"] / sample * employees
+    print(f"{'per-record projected':<40} {projected:10.3f}s")
+
+    with timed("payroll run (bulk)") as bulk:
+        response = client.post(
+            "/api/payroll-runs",
+            json={
+                "period_label": "Bulk period",
+                "period_start": "2025-01-08",
+                "period_end": "2025-01-14",
+                "tax_rate": 0.12,
+                "default_hours": 40,
+            },
+        )
+        assert response.status_code == 201, response.get_json()
+    created = response.get_json()["data"]["records_created"]
+    print(f"{'records created':<40} {created:10d}")
+    print(f"{'speedup vs per-record':<40} {projected / bulk['seconds']:10.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--per-record-sample", type=int, default=2_000)
+    args = parser.parse_args()
+    for count in args.employees:
+        run(count, args.per_record_sample)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Measure payslip rendering throughput from one worker up to N.
+
+Usage::
+
+    python -m backend.benchmarks.payslips --records 5000 --workers 1 2 4 8
+
+The same period is rendered once per worker count into a temporary directory
+and the payslips per second and speedup over the first run are printed.
+Scaling is bounded by the CPU cores of the machine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+
+from backend.benchmarks._harness import (
+    seed_employees,
+    seed_period_records,
+    timed,
+    use_temporary_database,
+)
+from backend.config import settings
+from backend.payslips import render_payslips, start_batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=5_000)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1})
+    )
+    parser.add_argument("--format", choices=["html", "pdf", "both"], default="both")
+    parser.add_argument("--batch-size", type=int, default=settings.payslip_batch_size)
+    args = parser.parse_args()
+
+    print(f"database: {use_temporary_database()}  cpus: {os.cpu_count()}")
+    settings.payslip_dir = tempfile.mkdtemp(prefix="payslips-bench-")
+    seed_employees(args.records)
+    period_id = seed_period_records("Bench", args.records)
+
+    baseline = None
+    for workers in args.workers:
+        batch = start_batch(period_id, args.format, "directory")
+        with timed(f"{workers} worker(s), {args.records} payslips") as result:
+            state = render_payslips(batch["id"], workers=workers, batch_size=args.batch_size)
+        assert state["rendered"] == args.records, state
+        rate = args.records / result["seconds"]
+        baseline = baseline or rate
+        print(f"{'':<40} {rate:10.0f} payslips/s  x{rate / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
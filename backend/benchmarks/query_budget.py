@@ -0,0 +1,65 @@
+"""Check that list endpoints stay within a fixed SQL statement budget.
+
+Usage::
+
+    python -m backend.benchmarks.query_budget --employees 5000
+
+Each endpoint is called with a large page size against a seeded database and
+the number of statements it executes is compared with ``BUDGETS``. The
+script exits non-zero when any endpoint exceeds its budget, which catches
+N+1 regressions in the serializers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from backend import create_app
+from backend.benchmarks._harness import count_queries, seed_employees, use_temporary_database
+
+# One statement reads the table versions for the ETag, one builds the page.
+BUDGETS = {
+    "/api/departments?limit=200": 2,
+    "/api/employees?limit=200": 2,
+    "/api/employees?q=first1&limit=200": 2,
+    "/api/payroll-records?limit=200": 2,
+    "/api/payroll-periods?limit=200": 2,
+    "/api/summary": 2,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=5_000)
+    args = parser.parse_args()
+
+    use_temporary_database()
+    seed_employees(args.employees)
+    client = create_app().test_client()
+    response = client.post(
+        "/api/payroll-runs",
+        json={
+            "period_label": "Budget period",
+            "period_start": "2025-01-01",
+            "period_end": "2025-01-07",
+            "tax_rate": 0.12,
+            "default_hours": 40,
+        },
+    )
+    assert response.status_code == 201, response.get_json()
+
+    failed = False
+    for url, budget in BUDGETS.items():
+        with count_queries() as statements:
+            response = client.get(url)
+        assert response.status_code == 200, (url, response.get_json())
+        status = "ok" if len(statements) <= budget else "OVER BUDGET"
+        failed |= len(statements) > budget
+        print(f"{url:<40} {len(statements):4d} / {budget:<4d} {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
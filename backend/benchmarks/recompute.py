@@ -0,0 +1,105 @@
+"""Time the open-period recompute that follows base rate changes.
+
+Usage::
+
+    python -m backend.benchmarks.recompute --employees 20000 --periods 12
+
+Generates ``employees * periods`` records with ``backend.synthetic`` (only
+the last period is ``OPEN``), then changes one employee's rate through
+``PUT /api/employees/<id>`` and every employee's rate in one ORM session
+flushed in chunks. Prints the time, statements and records rewritten for
+each, and exits non-zero when an open record does not match its new rate,
+a closed period was touched or the counters drift.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from sqlalchemy import func, select
+
+from backend import create_app
+from backend.benchmarks._harness import count_queries, timed, use_temporary_database
+from backend.counters import find_drift
+from backend.database import session_scope
+from backend.models import Employee, PayrollPeriod, PayrollRecord
+from backend.money import to_cents
+from backend.pay_calc import compute_pay
+from backend.recompute import recompute_pending
+from backend.synthetic import generate
+
+
+def _closed_gross(session) -> int:
+    return session.scalar(
+        select(func.sum(PayrollRecord.gross_pay))
+        .join(PayrollPeriod, PayrollPeriod.id == PayrollRecord.payroll_period_id)
+        .where(PayrollPeriod.status != "OPEN")
+    )
+
+
+def _mismatches(session) -> int:
+    """Open records whose gross differs from ``compute_pay`` at the current rate."""
+    rows = session.execute(
+        select(PayrollRecord.hours_worked, PayrollRecord.gross_pay, Employee.base_rate)
+        .join(Employee, Employee.id == PayrollRecord.employee_id)
+        .join(PayrollPeriod, PayrollPeriod.id == PayrollRecord.payroll_period_id)
+        .where(PayrollPeriod.status == "OPEN")
+    ).all()
+    expected = compute_pay(
+        [row.hours_worked for row in rows], [float(row.base_rate) for row in rows], 0
+    ).gross_cents.tolist()
+    return sum(to_cents(row.gross_pay) != cents for row, cents in zip(rows, expected))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--departments", type=int, default=16)
+    parser.add_argument("--employees", type=int, default=20_000)
+    parser.add_argument("--periods", type=int, default=12)
+    parser.add_argument("--flush-every", type=int, default=1_000)
+    args = parser.parse_args()
+
+    use_temporary_database()
+    client = create_app().test_client()
+    with timed("generate"):
+        report = generate(args.departments, args.employees, args.periods)
+    print(f"{report.records} records")
+    with session_scope() as session:
+        closed = _closed_gross(session)
+
+    with count_queries() as statements:
+        with timed("PUT one employee's base_rate"):
+            response = client.put("/api/employees/1", json={"base_rate": 777.5})
+    assert response.status_code == 200, response.get_json()
+    print(
+        f"{'':<4}{response.get_json()['recomputed_records']} records rewritten,"
+        f" {len(statements)} statements"
+    )
+
+    with count_queries() as statements:
+        with timed("every employee's base_rate, one commit"):
+            with session_scope() as session:
+                employees = session.scalars(select(Employee).order_by(Employee.id)).all()
+                for index, employee in enumerate(employees, start=1):
+                    employee.base_rate = float(employee.base_rate) + 1.25
+                    if index % args.flush_every == 0:
+                        session.flush()
+                rewritten = recompute_pending(session)
+    print(f"{'':<4}{rewritten} records rewritten, {len(statements)} statements")
+
+    with session_scope() as session:
+        mismatches = _mismatches(session)
+        untouched = _closed_gross(session) == closed
+        drift = find_drift(session.connection())
+    if mismatches:
+        print(f"{mismatches} open records do not match their employee's rate")
+    if not untouched:
+        print("closed periods changed")
+    for problem in drift:
+        print(problem)
+    sys.exit(0 if not mismatches and untouched and not drift else 1)
+
+
+if __name__ == "__main__":
+    main()
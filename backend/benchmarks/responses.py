@@ -0,0 +1,140 @@
+"""Compare the size and cost of listing payroll records in each response shape.
+
+Usage::
+
+    python -m backend.benchmarks.responses --employees 2000 --periods 25
+
+Generates ``employees * periods`` records with ``backend.synthetic`` and
+reads all of them in pages of ``--limit``, querying and encoding each page
+the way ``GET /api/payroll-records`` did before (``payroll_record_dict`` per
+row, standard library JSON) and the way it does now for full rows, a
+``fields=`` projection, ``format=columns`` and gzip. Prints bytes on the
+wire and the CPU seconds spent querying and encoding for each, and exits
+non-zero if the default response differs from the old one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from backend import create_app, responses
+from backend.benchmarks._harness import timed, use_temporary_database
+from backend.database import session_scope
+from backend.models import PayrollRecord
+from backend.pagination import keyset_result, keyset_statement, page_response
+from backend.serializers import (
+    RECORD_FIELDS,
+    parse_projection,
+    payroll_record_dict,
+    payroll_record_page,
+    payroll_record_rows,
+    record_nested,
+)
+from backend.synthetic import generate
+
+KEYS = [(PayrollRecord.created_at, True), (PayrollRecord.id, True)]
+MODES = {
+    "rows": ("", None, False),
+    "fields=id,employee_id,net_pay,employee.full_name": (
+        "id,employee_id,net_pay,employee.full_name",
+        None,
+        False,
+    ),
+    "format=columns": (None, "columns", False),
+    "format=columns + gzip": (None, "columns", True),
+    "fields=id,employee_id,net_pay&format=columns + gzip": (
+        "id,employee_id,net_pay",
+        "columns",
+        True,
+    ),
+}
+
+
+def _pages(session, stmt, limit: int, clock: Dict[str, float]):
+    """Yield every page of ``stmt``, adding query CPU time to ``clock``."""
+    cursor = None
+    while True:
+        start = time.process_time()
+        rows = session.execute(keyset_statement(stmt, KEYS, cursor, limit)).all()
+        clock["query"] += time.process_time() - start
+        page, next_cursor = keyset_result(rows, KEYS, limit)
+        yield page, next_cursor
+        if next_cursor is None:
+            return
+        cursor = next_cursor
+
+
+def _before(limit: int) -> Tuple[List[Dict], int, Dict[str, float]]:
+    """Query and encode every page the way the list endpoint did before."""
+    data, size, clock = [], 0, {"query": 0.0, "encode": 0.0}
+    with session_scope() as session:
+        for rows, next_cursor in _pages(session, payroll_record_rows(), limit, clock):
+            start = time.process_time()
+            page = [payroll_record_dict(row) for row in rows]
+            size += len(json.dumps(page_response(page, limit, next_cursor)).encode())
+            clock["encode"] += time.process_time() - start
+            data += page
+    return data, size, clock
+
+
+def _after(limit: int, fields, response_format, compressed: bool):
+    """Query, encode and optionally gzip every page as the endpoint does now."""
+    projection = parse_projection(fields, response_format, RECORD_FIELDS)
+    data, size, clock = [], 0, {"query": 0.0, "encode": 0.0}
+    with session_scope() as session:
+        stmt = payroll_record_rows(record_nested(projection))
+        for rows, next_cursor in _pages(session, stmt, limit, clock):
+            start = time.process_time()
+            page, included = payroll_record_page(rows, projection)
+            body = responses.dumps(page_response(page, limit, next_cursor, **included))
+            size += len(responses.gzip(body) or body) if compressed else len(body)
+            clock["encode"] += time.process_time() - start
+            data.append(page)
+    return data, size, clock
+
+
+def _line(label: str, size: int, clock: Dict[str, float]) -> str:
+    return (
+        f"{label:<54} {size / 1e6:7.2f} MB"
+        f"  query {clock['query']:5.2f} s  encode {clock['encode']:5.2f} s CPU"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--departments", type=int, default=16)
+    parser.add_argument("--employees", type=int, default=2_000)
+    parser.add_argument("--periods", type=int, default=25)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    use_temporary_database()
+    client = create_app().test_client()
+    with timed("generate"):
+        report = generate(args.departments, args.employees, args.periods)
+    print(f"{report.records} records, orjson {'on' if responses.orjson else 'off'}")
+
+    expected, base_size, base_clock = _before(args.limit)
+    print(_line("before: dicts + json", base_size, base_clock))
+    for label, (fields, response_format, compressed) in MODES.items():
+        pages, size, clock = _after(args.limit, fields, response_format, compressed)
+        print(
+            _line(label, size, clock) + f"  {base_size / size:5.1f}x smaller,"
+            f" {base_clock['encode'] / clock['encode']:5.1f}x less encode CPU"
+        )
+        if label == "rows" and [row for page in pages for row in page] != expected:
+            print("default pages differ from payroll_record_dict")
+            sys.exit(1)
+
+    first = client.get(f"/api/payroll-records?limit={args.limit}").get_json()["data"]
+    if first != expected[: args.limit]:
+        print("GET /api/payroll-records differs from payroll_record_dict")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare indexed employee search with the old load-and-filter approach.
+
+Usage::
+
+    python -m backend.benchmarks.search --employees 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from sqlalchemy import select
+
+from backend import create_app
+from backend.benchmarks._harness import seed_employees, use_temporary_database
+from backend.database import session_scope
+from backend.models import Employee
+
+QUERIES = ["last00012", "first4", "employee99", "first1 last0001", "nomatch"]
+
+
+def python_filter(term: str) -> int:
+    """The pre-index implementation: load every employee and filter in Python."""
+    with session_scope() as session:
+        employees = session.scalars(select(Employee).order_by(Employee.last_name)).all()
+        return len(
+            [
+                emp
+                for emp in employees
+                if term in emp.full_name.lower() or term in emp.email.lower()
+            ]
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    use_temporary_database()
+    seed_employees(args.employees)
+    client = create_app().test_client()
+
+    print(f"{'query':<20} {'python filter':>14} {'indexed':>10}")
+    for term in QUERIES:
+        start = time.perf_counter()
+        python_filter(term)
+        filtered = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            response = client.get("/api/employees", query_string={"q": term})
+            assert response.status_code == 200
+        indexed = (time.perf_counter() - start) / args.repeat
+        print(f"{term:<20} {filtered * 1000:12.1f}ms {indexed * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
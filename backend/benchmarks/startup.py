@@ -0,0 +1,112 @@
+"""Time a cold start: imports, ``create_app`` and the first request.
+
+Usage::
+
+    python -m backend.benchmarks.startup --runs 10 --target-ms 150
+
+Each run is a fresh interpreter against an already migrated SQLite file, as
+a new worker process would be. The child times ``import backend.app``,
+``create_app()`` and a first ``GET /api/summary`` through the test client;
+interpreter start-up itself is not counted. The script prints the median of
+each phase, the slowest imports of one extra run (``python -X importtime``),
+and exits non-zero when the median time to the first response exceeds
+``--target-ms``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from backend.migrations import migrate
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import backend.app
+imported = time.perf_counter()
+app = backend.app.create_app()
+created = time.perf_counter()
+response = app.test_client().get("/api/summary")
+assert response.status_code == 200, response.status_code
+served = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "create_app": created - imported,
+    "first request": served - created,
+    "total": served - start,
+}))
+"""
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _environment(url: str) -> dict:
+    return {
+        **os.environ,
+        "DATABASE_URL": url,
+        "AUTO_MIGRATE": "false",
+        "PYTHONPATH": str(REPO_ROOT),
+    }
+
+
+def _slowest_imports(env: dict, count: int = 10) -> list:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.app"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    totals: dict = {}
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            name = parts[2].strip()
+            # Group by third-party package; backend modules are listed one by one.
+            key = name if name.startswith("backend.") else name.split(".")[0]
+            totals[key] = max(totals.get(key, 0), int(parts[1]))
+    totals.pop("backend", None)
+    totals.pop("backend.app", None)
+    return sorted(((micros, name) for name, micros in totals.items()), reverse=True)[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target-ms", type=float, default=150)
+    args = parser.parse_args()
+
+    url = f"sqlite:///{Path(tempfile.mkdtemp(prefix='payroll-startup-')) / 'startup.db'}"
+    migrate(create_engine(url))
+    env = _environment(url)
+
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.splitlines()[-1]))
+
+    for phase in samples[0]:
+        median = statistics.median(sample[phase] for sample in samples)
+        print(f"{phase:<16} median {median * 1000:8.1f} ms")
+    print("slowest imports (cumulative):")
+    for micros, name in _slowest_imports(env):
+        print(f"  {name:<40} {micros / 1000:8.1f} ms")
+
+    total = statistics.median(sample["total"] for sample in samples) * 1000
+    verdict = "within" if total <= args.target_ms else "over"
+    print(f"time to first response {total:.1f} ms, {verdict} the {args.target_ms:.0f} ms target")
+    sys.exit(0 if total <= args.target_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
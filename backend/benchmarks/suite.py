@@ -0,0 +1,326 @@
+"""Endpoint and serializer benchmark suite with stored baselines.
+
+Usage::
+
+    python -m backend.benchmarks.suite                       # compare with baseline
+    python -m backend.benchmarks.suite --scale medium
+    python -m backend.benchmarks.suite --save-baseline       # record a new baseline
+
+A temporary database is filled by ``backend.synthetic.generate`` at the
+chosen scale, then every blueprint route is driven through the Flask test
+client and the row serializers are timed directly. Each scenario reports
+p50/p95/p99 latency, SQL statements per request and peak traced memory
+(measured on one extra, separately traced call).
+
+Baselines live in ``baselines.json`` next to this file, keyed by scale. A
+run fails when a scenario issues more statements than its baseline, or when
+its p95 latency or peak memory grows past ``--tolerance`` times the
+baseline (with small absolute floors so timer noise does not trip it).
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from sqlalchemy import select
+
+from backend import create_app, jobs
+from backend.benchmarks._harness import count_queries, percentiles, use_temporary_database
+from backend.database import session_scope
+from backend.models import Employee, PayrollPeriod, PayslipBatch
+from backend.serializers import (
+    employee_dict,
+    employee_rows,
+    payroll_record_dict,
+    payroll_record_rows,
+)
+from backend.synthetic import generate
+
+BASELINE_PATH = Path(__file__).with_name("baselines.json")
+SCALES = {
+    "small": {"departments": 10, "employees": 2_000, "periods": 6},
+    "medium": {"departments": 40, "employees": 50_000, "periods": 26},
+    "large": {"departments": 100, "employees": 200_000, "periods": 26},
+}
+# Absolute floors below which p95 and memory growth are treated as noise.
+LATENCY_FLOOR_MS = 2.0
+MEMORY_FLOOR_KB = 256
+
+
+class Scenario:
+    """One named operation timed over ``iterations`` calls."""
+
+    def __init__(self, name: str, call: Callable[[int], object], iterations: int = 30) -> None:
+        self.name = name
+        self.call = call
+        self.iterations = iterations
+
+    def run(self) -> Dict:
+        latencies: List[float] = []
+        statements = 0
+        for index in range(self.iterations):
+            with count_queries() as executed:
+                start = time.perf_counter()
+                self.call(index)
+                latencies.append(time.perf_counter() - start)
+            statements += len(executed)
+
+        tracemalloc.start()
+        self.call(self.iterations)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        points = percentiles(latencies)
+        return {
+            "p50_ms": round(points[50] * 1000, 3),
+            "p95_ms": round(points[95] * 1000, 3),
+            "p99_ms": round(points[99] * 1000, 3),
+            "queries": round(statements / self.iterations, 2),
+            "peak_kb": round(peak / 1024, 1),
+        }
+
+
+def _ok(response, *codes: int):
+    status = response.status_code
+    if status not in (codes or (200,)):
+        raise AssertionError(f"{response.request.path}: {status} {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+def build_scenarios(client) -> List[Scenario]:
+    with session_scope() as session:
+        period_id = session.scalar(select(PayrollPeriod.id).order_by(PayrollPeriod.id))
+        department_id = session.scalar(select(Employee.department_id).order_by(Employee.id))
+        employee_ids = list(session.scalars(select(Employee.id).order_by(Employee.id).limit(200)))
+        record_rows = session.execute(payroll_record_rows().limit(1000)).all()
+        employee_list = session.execute(employee_rows().limit(1000)).all()
+
+        # A small period of its own keeps payslip rendering cheap.
+        run = _ok(
+            client.post(
+                "/api/payroll-runs",
+                json={
+                    "period_label": "Suite payslips",
+                    "period_start": "2030-01-01",
+                    "period_end": "2030-01-14",
+                    "tax_rate": 0.12,
+                    "entries": [
+                        {"employee_id": employee_id, "hours_worked": 80}
+                        for employee_id in employee_ids[:20]
+                    ],
+                },
+            ),
+            201,
+        ).get_json()["data"]
+
+    changes_cursor = _ok(client.get("/api/changes")).get_json()["next_cursor"]
+    first_page = _ok(client.get("/api/employees?limit=50")).get_json()["next_cursor"]
+
+    def create_employee(index: int):
+        return _ok(
+            client.post(
+                "/api/employees",
+                json={
+                    "first_name": "Suite",
+                    "last_name": f"Employee{index}",
+                    "email": f"suite.{index}.{time.monotonic_ns()}@example.com",
+                    "base_rate": 400,
+                    "department_id": department_id,
+                    "employment_type": "FULL_TIME",
+                    "hire_date": "2024-01-02",
+                },
+            ),
+            201,
+        ).get_json()["data"]["id"]
+
+    def delete_employee(index: int):
+        _ok(client.delete(f"/api/employees/{create_employee(index)}"))
+
+    def import_employees(index: int):
+        body = "first_name,last_name,email,base_rate,department_id,employment_type,hire_date\n" + "".join(
+            f"Import,Row{row},import.{index}.{row}.{time.monotonic_ns()}@example.com,350,"
+            f"{department_id},PART_TIME,2024-02-01\n"
+            for row in range(50)
+        )
+        _ok(
+            client.post(
+                "/api/employees/import",
+                data={"file": (io.BytesIO(body.encode()), "employees.csv")},
+                content_type="multipart/form-data",
+            )
+        )
+
+    def create_record(index: int):
+        employee_id = employee_ids[index % len(employee_ids)]
+        _ok(
+            client.post(
+                "/api/payroll-records",
+                json={
+                    "employee_id": employee_id,
+                    "period_label": f"Suite record {index}",
+                    "period_start": "2031-01-01",
+                    "period_end": "2031-01-14",
+                    "hours_worked": 80,
+                    "tax_rate": 0.12,
+                },
+            ),
+            201,
+        )
+
+    def payroll_run(index: int):
+        _ok(
+            client.post(
+                "/api/payroll-runs",
+                json={
+                    "period_label": f"Suite run {index}",
+                    "period_start": "2032-01-01",
+                    "period_end": "2032-01-14",
+                    "tax_rate": 0.12,
+                    "entries": [
+                        {"employee_id": employee_id, "hours_worked": 80}
+                        for employee_id in employee_ids
+                    ],
+                },
+            ),
+            201,
+        )
+
+    def export_register(_index: int):
+        response = _ok(client.get(f"/api/payroll-periods/{period_id}/register.csv"))
+        response.close()
+
+    def render_payslips(_index: int):
+        batch = _ok(
+            client.post(
+                f"/api/payroll-periods/{run['payroll_period_id']}/payslips",
+                json={"format": "html", "output": "directory"},
+            ),
+            202,
+        ).get_json()["data"]
+        # Stand in for ``python -m backend.worker`` until the batch's job has run.
+        while True:
+            job_id = jobs.claim("suite")
+            if job_id is not None:
+                jobs.run(job_id, "suite")
+            with session_scope() as session:
+                if session.get(PayslipBatch, batch["id"]).status != "RUNNING":
+                    return
+            time.sleep(0.01)
+
+    def model_dicts(_index: int):
+        # Lazy relationship loads included: this is the N+1 cost the
+        # projection serializers avoid.
+        with session_scope() as session:
+            return [employee.to_dict() for employee in session.scalars(select(Employee).limit(200))]
+
+    def get(url: str, *codes: int):
+        return lambda _index: _ok(client.get(url), *codes)
+
+    return [
+        Scenario("GET /", get("/"), 10),
+        Scenario("GET /api/departments", get("/api/departments?limit=200")),
+        Scenario("POST /api/departments", lambda i: _ok(
+            client.post("/api/departments", json={"name": f"Suite {i} {time.monotonic_ns()}"}), 201
+        )),
+        Scenario("GET /api/employees", get("/api/employees?limit=50")),
+        Scenario("GET /api/employees (page 2)", get(f"/api/employees?limit=50&cursor={first_page}")),
+        Scenario("GET /api/employees?q=", get("/api/employees?q=ava lo&limit=50")),
+        Scenario("GET /api/employees?department_id=", get(
+            f"/api/employees?department_id={department_id}&limit=50"
+        )),
+        Scenario("POST /api/employees", create_employee),
+        Scenario("PUT /api/employees/<id>", lambda i: _ok(client.put(
+            f"/api/employees/{employee_ids[i % len(employee_ids)]}", json={"base_rate": 400 + i}
+        ))),
+        Scenario("DELETE /api/employees/<id>", delete_employee, 15),
+        Scenario("POST /api/employees/import", import_employees, 10),
+        Scenario("GET /api/payroll-records", get("/api/payroll-records?limit=50")),
+        Scenario("GET /api/payroll-records?period_id=", get(
+            f"/api/payroll-records?period_id={period_id}&limit=50"
+        )),
+        Scenario("GET /api/payroll-periods", get("/api/payroll-periods")),
+        Scenario("POST /api/payroll-records", create_record),
+        Scenario("POST /api/payroll-runs", payroll_run, 10),
+        Scenario("GET /api/payroll-runs/<id>", get(f"/api/payroll-runs/{run['id']}")),
+        Scenario("GET /api/payroll-periods/<id>/totals", get(f"/api/payroll-periods/{period_id}/totals")),
+        Scenario("GET /api/payroll-periods/<id>/register.csv", export_register, 5),
+        Scenario("POST /api/payroll-periods/<id>/payslips", render_payslips, 3),
+        Scenario("GET /api/summary", get("/api/summary")),
+        Scenario("GET /api/analytics/department-costs", get("/api/analytics/department-costs")),
+        Scenario("GET /api/changes", get(f"/api/changes?since={changes_cursor}")),
+        Scenario("serialize employee_dict x1000", lambda _i: [employee_dict(r) for r in employee_list]),
+        Scenario("serialize payroll_record_dict x1000", lambda _i: [
+            payroll_record_dict(r) for r in record_rows
+        ]),
+        Scenario("serialize Employee.to_dict x200", model_dicts, 10),
+    ]
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    problems = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["queries"] > expected["queries"]:
+            problems.append(f"{name}: {result['queries']} queries (baseline {expected['queries']})")
+        if result["p95_ms"] > max(expected["p95_ms"] * tolerance, expected["p95_ms"] + LATENCY_FLOOR_MS):
+            problems.append(f"{name}: p95 {result['p95_ms']} ms (baseline {expected['p95_ms']})")
+        if result["peak_kb"] > max(expected["peak_kb"] * tolerance, expected["peak_kb"] + MEMORY_FLOOR_KB):
+            problems.append(f"{name}: peak {result['peak_kb']} KB (baseline {expected['peak_kb']})")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--only", help="run scenarios whose name contains this text")
+    args = parser.parse_args()
+
+    use_temporary_database()
+    app = create_app()
+    report = generate(**SCALES[args.scale], seed=args.seed)
+    print(
+        f"scale {args.scale}: {report.employees} employees, {report.records} records "
+        f"(generated in {report.seconds:.1f}s)"
+    )
+
+    client = app.test_client()
+    results = {}
+    print(f"{'scenario':<48}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'peak KB':>10}")
+    for scenario in build_scenarios(client):
+        if args.only and args.only not in scenario.name:
+            continue
+        result = results[scenario.name] = scenario.run()
+        print(
+            f"{scenario.name:<48}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+            f"{result['p99_ms']:>9.2f}{result['queries']:>9.1f}{result['peak_kb']:>10.1f}"
+        )
+
+    baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    if args.save_baseline:
+        baselines[args.scale] = results
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline for '{args.scale}' written to {BASELINE_PATH}")
+        return
+
+    problems = compare(results, baselines.get(args.scale, {}), args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    if args.scale not in baselines:
+        print(f"No baseline for '{args.scale}'; run with --save-baseline to record one.")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Check bracket boundaries and time progressive withholding for a large run.
+
+Usage::
+
+    python -m backend.benchmarks.tax --employees 50000
+
+The first part compares ``CompiledSchedule.tax_on`` and ``tax_on_array``
+with a straightforward ``Decimal`` reference one cent below, on and above
+every bracket bound, checks that cumulative withholding over a year adds up
+to the tax on the year's total, and exits non-zero on any mismatch. The
+second part runs two payroll runs for ``--employees`` employees on a bracket
+schedule and reports the time and SQL statements of each; the second run
+reads the year-to-date pay written by the first from ``ytd_accumulators``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from decimal import ROUND_HALF_EVEN, Decimal
+
+import numpy as np
+
+from backend import create_app
+from backend.benchmarks._harness import (
+    count_queries,
+    seed_employees,
+    timed,
+    use_temporary_database,
+)
+from backend.counters import find_drift
+from backend.database import session_scope
+from backend.tax import compile_schedule
+
+BRACKETS = [
+    (Decimal("0"), Decimal("0")),
+    (Decimal("250000"), Decimal("0.15")),
+    (Decimal("400000"), Decimal("0.20")),
+    (Decimal("800000"), Decimal("0.25")),
+    (Decimal("2000000"), Decimal("0.30")),
+    (Decimal("8000000"), Decimal("0.35")),
+]
+
+
+def reference_tax(income_cents: int) -> int:
+    income = Decimal(income_cents) / 100
+    tax = Decimal(0)
+    for index, (lower, rate) in enumerate(BRACKETS):
+        upper = BRACKETS[index + 1][0] if index + 1 < len(BRACKETS) else None
+        if income <= lower:
+            break
+        tax += ((min(income, upper) if upper is not None else income) - lower) * rate
+    return int((tax * 100).quantize(Decimal(1), ROUND_HALF_EVEN))
+
+
+def check_boundaries() -> list[str]:
+    schedule = compile_schedule(1, "check", None, BRACKETS)
+    problems = []
+    incomes = [0, 1, 2]
+    for lower, _ in BRACKETS[1:]:
+        cents = int(lower * 100)
+        incomes += [cents - 1, cents, cents + 1]
+    incomes += [10**11, 12_345_678]
+    vector = schedule.tax_on_array(np.array(incomes)).tolist()
+    for income, from_array in zip(incomes, vector):
+        expected = reference_tax(income)
+        if schedule.tax_on(income) != expected or from_array != expected:
+            problems.append(
+                f"tax_on({income}): scalar {schedule.tax_on(income)}, "
+                f"array {from_array}, expected {expected}"
+            )
+
+    rng = random.Random(7)
+    for _ in range(1000):
+        ytd = 0
+        withheld = 0
+        for _ in range(26):
+            gross = rng.randrange(0, 20_000_000)
+            withheld += schedule.withholding(ytd, gross)
+            ytd += gross
+        if withheld != schedule.tax_on(ytd):
+            problems.append(f"withheld {withheld} in a year, tax on {ytd} is {schedule.tax_on(ytd)}")
+    return problems
+
+
+def time_runs(employees: int) -> list[str]:
+    use_temporary_database()
+    seed_employees(employees)
+    client = create_app().test_client()
+    response = client.post(
+        "/api/tax-schedules",
+        json={
+            "name": "standard",
+            "effective_from": "2025-01-01",
+            "brackets": [{"lower_bound": str(b), "rate": str(r)} for b, r in BRACKETS],
+        },
+    )
+    assert response.status_code == 201, response.get_json()
+
+    for number in (1, 2):
+        with count_queries() as statements, timed(f"run {number} ({employees} employees)"):
+            response = client.post(
+                "/api/payroll-runs",
+                json={
+                    "period_label": f"2025 P{number}",
+                    "period_start": f"2025-0{number}-01",
+                    "period_end": f"2025-0{number}-14",
+                    "tax_schedule": "standard",
+                    "default_hours": 480,
+                },
+            )
+        assert response.status_code == 201, response.get_json()
+        total_tax = response.get_json()["data"]["total_tax"]
+        print(f"  {len(statements)} statements, total tax {total_tax}")
+
+    with session_scope() as session:
+        return find_drift(session.connection())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=50_000)
+    args = parser.parse_args()
+
+    problems = check_boundaries()
+    print(f"bracket boundary checks: {'ok' if not problems else 'FAILED'}")
+    problems += time_runs(args.employees)
+    for problem in problems[:20]:
+        print(problem)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Time a timesheet feed through the batch upsert endpoint and its replays.
+
+Usage::
+
+    python -m backend.benchmarks.upserts --rows 20000 --changed 0.01
+
+The feed of ``--rows`` entries is submitted once (every row inserted), then
+replayed with the same idempotency key (stored summary), under a new key
+(every row compared, none written) and with a ``--changed`` fraction of the
+hours edited (only those rows written). The script exits non-zero when a
+step writes a different number of rows than expected or the counters drift.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from backend import create_app
+from backend.benchmarks._harness import count_queries, seed_employees, timed, use_temporary_database
+from backend.counters import find_drift
+from backend.database import session_scope
+
+PERIOD = {"period_label": "Feed period", "period_start": "2025-01-01", "period_end": "2025-01-14"}
+
+
+def _submit(client, label: str, entries: list, key: str) -> dict:
+    with count_queries() as statements:
+        with timed(label):
+            response = client.post(
+                "/api/payroll-records/batch",
+                json={**PERIOD, "tax_rate": 0.12, "entries": entries},
+                headers={"Idempotency-Key": key},
+            )
+    assert response.status_code == 200, response.get_json()
+    summary = response.get_json()["data"]
+    print(
+        f"{'':<4}inserted {summary['records_inserted']}, updated {summary['records_updated']}, "
+        f"unchanged {summary['records_unchanged']}, {len(statements)} statements"
+    )
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--changed", type=float, default=0.01)
+    args = parser.parse_args()
+
+    use_temporary_database()
+    seed_employees(args.rows)
+    client = create_app().test_client()
+    entries = [
+        {"employee_id": employee_id, "hours_worked": 40 + employee_id % 5}
+        for employee_id in range(1, args.rows + 1)
+    ]
+    step = max(1, round(1 / args.changed)) if args.changed else 0
+    edited = [
+        {**entry, "hours_worked": entry["hours_worked"] + 1}
+        if step and index % step == 0
+        else entry
+        for index, entry in enumerate(entries)
+    ]
+    changed = sum(a is not b for a, b in zip(entries, edited))
+
+    results = [
+        (_submit(client, "first submission", entries, "feed-1"), (args.rows, 0)),
+        (_submit(client, "replay, same key", entries, "feed-1"), (args.rows, 0)),
+        (_submit(client, "replay, new key", entries, "feed-2"), (0, 0)),
+        (_submit(client, f"{changed} rows edited", edited, "feed-3"), (0, changed)),
+    ]
+    ok = all(
+        (summary["records_inserted"], summary["records_updated"]) == expected
+        for summary, expected in results
+    )
+    with session_scope() as session:
+        drift = find_drift(session.connection())
+    for problem in drift:
+        print(problem)
+    sys.exit(0 if ok and not drift else 1)
+
+
+if __name__ == "__main__":
+    main()
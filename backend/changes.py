@@ -0,0 +1,107 @@
+"""Delta sync: everything created, updated or deleted since a cursor.
+
+Inserts and updates are found through the indexed ``updated_at`` column of
+each table. Hard deletes leave a row in ``tombstones``, written by an
+``after_flush`` listener in the same transaction as the delete; they are kept
+for ``settings.tombstone_retention_days`` and older cursors get ``reset``.
+
+A cursor records the server time of the previous sync. The next sync looks
+back ``settings.sync_overlap_seconds`` before it, because ``updated_at`` is
+stamped at flush time and a transaction may commit a little later; rows seen
+twice are harmless since clients apply changes as upserts.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import delete, event, func, insert, select
+
+from .config import settings
+from .database import SessionLocal
+from .models import Department, Employee, PayrollPeriod, PayrollRecord, Tombstone
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+from .serializers import (
+    department_dict,
+    department_rows,
+    employee_dict,
+    employee_rows,
+    payroll_record_dict,
+    payroll_record_rows,
+    period_dict,
+    period_rows,
+)
+from .versions import TRACKED_TABLES
+
+_FEEDS = {
+    "employees": (Employee, employee_rows, employee_dict),
+    "payroll_periods": (PayrollPeriod, period_rows, period_dict),
+    "payroll_records": (PayrollRecord, payroll_record_rows, payroll_record_dict),
+}
+
+
+@event.listens_for(SessionLocal.session_factory, "after_flush")
+def _record_tombstones(session, _flush_context) -> None:
+    rows = [
+        {"table_name": obj.__tablename__, "row_id": obj.id}
+        for obj in session.deleted
+        if getattr(obj, "__tablename__", None) in TRACKED_TABLES
+    ]
+    if rows:
+        # Deletes are rare, so expired tombstones are pruned alongside them.
+        cutoff = datetime.utcnow() - timedelta(days=settings.tombstone_retention_days)
+        connection = session.connection()
+        connection.execute(delete(Tombstone).where(Tombstone.deleted_at < cutoff))
+        connection.execute(insert(Tombstone), rows)
+
+
+def changes_since(session, cursor: str | None) -> Dict:
+    """Build the change set for ``cursor``; ``reset`` asks for a full reload."""
+    now = datetime.utcnow()
+    response = {
+        "next_cursor": encode_cursor({"t": now.isoformat()}),
+        "reset": False,
+        "changes": {},
+        "deleted": {},
+    }
+
+    payload = decode_cursor(cursor)
+    if payload is None:
+        # First contact: the client loads full lists and syncs from here on.
+        return response
+    try:
+        since = datetime.fromisoformat(payload["t"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+    if since < now - timedelta(days=settings.tombstone_retention_days):
+        response["reset"] = True
+        return response
+    since -= timedelta(seconds=settings.sync_overlap_seconds)
+
+    for name, (model, rows, to_dict) in _FEEDS.items():
+        stmt = rows().where(model.updated_at > since).order_by(model.id)
+        changed = session.execute(stmt.limit(settings.sync_max_rows + 1)).all()
+        if len(changed) > settings.sync_max_rows:
+            response["reset"] = True
+            return response
+        response["changes"][name] = [to_dict(row) for row in changed]
+
+    # Departments carry derived employee counts, so any department or employee
+    # change resends the (small) department list.
+    if response["changes"]["employees"] or session.scalar(
+        select(func.count(Department.id)).where(Department.updated_at > since)
+    ):
+        response["changes"]["departments"] = [
+            department_dict(row)
+            for row in session.execute(department_rows().order_by(Department.name))
+        ]
+    else:
+        response["changes"]["departments"] = []
+
+    for table_name, row_id in session.execute(
+        select(Tombstone.table_name, Tombstone.row_id).where(Tombstone.deleted_at > since)
+    ):
+        response["deleted"].setdefault(table_name, []).append(row_id)
+    return response
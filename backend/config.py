@@ -2,6 +2,14 @@ import os
 from dataclasses import dataclass
 from pathlib import Path
 
+ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
+if ENV_FILE.exists():
+    # Loaded before Settings reads the environment; python-dotenv is only
+    # imported when there is a file to load.
+    from dotenv import load_dotenv
+
+    load_dotenv(ENV_FILE)
+
 
 @dataclass(slots=True)
 class Settings:
@@ -11,9 +19,53 @@ class Settings:
         "DATABASE_URL",
         f"sqlite:///{Path(__file__).resolve().parent / 'payroll.db'}",
     )
+    async_database_url: str | None = os.getenv("ASYNC_DATABASE_URL") or None
+    read_database_url: str | None = os.getenv("READ_DATABASE_URL") or None
+    read_your_writes_seconds: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
     secret_key: str = os.getenv("SECRET_KEY", "payroll-dev-secret")
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    sqlite_journal_mode: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_cache_size: int = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+    slow_query_ms: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    auto_migrate: bool = os.getenv("AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
     page_size: int = int(os.getenv("PAGE_SIZE", "10"))
+    compress_responses: bool = os.getenv("COMPRESS_RESPONSES", "true").lower() in ("1", "true", "yes")
+    compress_min_bytes: int = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+    compress_level: int = int(os.getenv("COMPRESS_LEVEL", "6"))
     flask_env: str = os.getenv("FLASK_ENV", "development")
+    payroll_run_chunk_size: int = int(os.getenv("PAYROLL_RUN_CHUNK_SIZE", "1000"))
+    import_batch_size: int = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+    import_max_errors: int = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+    directory_refresh_seconds: float = float(os.getenv("DIRECTORY_REFRESH_SECONDS", "5"))
+    sync_overlap_seconds: int = int(os.getenv("SYNC_OVERLAP_SECONDS", "5"))
+    sync_max_rows: int = int(os.getenv("SYNC_MAX_ROWS", "1000"))
+    tombstone_retention_days: int = int(os.getenv("TOMBSTONE_RETENTION_DAYS", "30"))
+    export_batch_size: int = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+    payslip_dir: str = os.getenv(
+        "PAYSLIP_DIR", str(Path(__file__).resolve().parent.parent / "payslips")
+    )
+    archive_dir: str = os.getenv(
+        "ARCHIVE_DIR", str(Path(__file__).resolve().parent.parent / "archive")
+    )
+    archive_on_paid: bool = os.getenv("ARCHIVE_ON_PAID", "true").lower() in ("1", "true", "yes")
+    archive_cache_size: int = int(os.getenv("ARCHIVE_CACHE_SIZE", "32"))
+    analytics_cache_size: int = int(os.getenv("ANALYTICS_CACHE_SIZE", "64"))
+    job_max_attempts: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    job_backoff_seconds: float = float(os.getenv("JOB_BACKOFF_SECONDS", "5"))
+    job_backoff_max_seconds: float = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "300"))
+    job_lease_seconds: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    worker_threads: int = int(os.getenv("WORKER_THREADS", "2"))
+    worker_poll_seconds: float = float(os.getenv("WORKER_POLL_SECONDS", "1"))
+    payslip_workers: int = int(os.getenv("PAYSLIP_WORKERS", str(os.cpu_count() or 1)))
+    payslip_batch_size: int = int(os.getenv("PAYSLIP_BATCH_SIZE", "200"))
 
 
 settings = Settings()
@@ -0,0 +1,517 @@
+"""Incrementally maintained dashboard counters.
+
+``summary_counters`` (a single row), ``department_totals``,
+``period_totals`` and the per-employee ``ytd_accumulators`` are updated in
+the same transaction as the writes that change them, so ``/api/summary`` is
+a primary-key read instead of four aggregate queries and tax withholding
+reads year-to-date earnings without summing ``payroll_records``. ORM writes
+are picked up by an ``after_flush`` listener; bulk statements that bypass
+the ORM apply a ``CounterDelta`` themselves.
+
+Run ``python -m backend.reconcile`` to check the counters for drift against
+the source tables and ``python -m backend.reconcile --fix`` to rebuild them.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import bindparam, delete, event, func, insert, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .models import (
+    Department,
+    DepartmentTotal,
+    Employee,
+    PayrollPeriod,
+    PayrollRecord,
+    PeriodArchive,
+    PeriodTotal,
+    SummaryCounter,
+    YtdAccumulator,
+)
+from .money import to_cents
+
+SUMMARY_ID = 1
+_MONEY = ("gross_cents", "tax_cents", "deduction_cents", "net_cents")
+_RECORD_MONEY = {
+    "gross_cents": "gross_pay",
+    "tax_cents": "tax_amount",
+    "deduction_cents": "other_deductions",
+    "net_cents": "net_pay",
+}
+_YTD_MONEY = ("gross_cents", "tax_cents", "net_cents")
+_YTD_COLUMNS = ("record_count", *_YTD_MONEY)
+# Keeps ``IN`` lists well under every driver's bound-parameter limit.
+_KEY_BATCH = 500
+_YTD_UPDATE = (
+    update(YtdAccumulator.__table__)
+    .where(
+        YtdAccumulator.employee_id == bindparam("key_employee_id"),
+        YtdAccumulator.tax_year == bindparam("key_tax_year"),
+    )
+    .values(
+        {
+            column: getattr(YtdAccumulator, column) + bindparam(f"add_{column}")
+            for column in _YTD_COLUMNS
+        }
+    )
+)
+
+
+class CounterDelta:
+    """Accumulates counter changes and applies them with a few UPDATEs."""
+
+    def __init__(self) -> None:
+        self.summary: Dict[str, int] = defaultdict(int)
+        self.departments: Dict[int, int] = defaultdict(int)
+        self.periods: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.new_departments: List[int] = []
+        self.new_periods: List[int] = []
+        self.removed_departments: List[int] = []
+        self.removed_periods: List[int] = []
+        self.ytd: Dict[Tuple[int, int], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def department_created(self, department_id: int) -> None:
+        self.summary["total_departments"] += 1
+        self.new_departments.append(department_id)
+
+    def department_removed(self, department_id: int) -> None:
+        self.summary["total_departments"] -= 1
+        self.removed_departments.append(department_id)
+
+    def period_created(self, period_id: int) -> None:
+        self.summary["total_periods"] += 1
+        self.new_periods.append(period_id)
+
+    def period_removed(self, period_id: int) -> None:
+        self.summary["total_periods"] -= 1
+        self.removed_periods.append(period_id)
+
+    def employees(self, department_id: int, count: int) -> None:
+        self.summary["total_employees"] += count
+        self.departments[department_id] += count
+
+    def records(self, period_id: int, count: int, **cents: int) -> None:
+        """Add ``count`` records and their money totals (in cents) to a period."""
+        self.summary["total_records"] += count
+        self.periods[period_id]["record_count"] += count
+        for column in _MONEY:
+            amount = cents.get(column, 0)
+            self.summary[column] += amount
+            self.periods[period_id][column] += amount
+
+    def year_to_date(self, employee_id: int, tax_year: int, count: int, **cents: int) -> None:
+        """Add ``count`` records and their money totals to an employee's tax year."""
+        totals = self.ytd[(employee_id, tax_year)]
+        totals["record_count"] += count
+        for column in _YTD_MONEY:
+            totals[column] += cents.get(column, 0)
+
+    def apply(self, connection: Connection) -> None:
+        if self.new_departments:
+            connection.execute(
+                insert(DepartmentTotal),
+                [{"department_id": d, "employee_count": 0} for d in self.new_departments],
+            )
+        if self.new_periods:
+            connection.execute(
+                insert(PeriodTotal),
+                [
+                    {"payroll_period_id": p, "record_count": 0, **dict.fromkeys(_MONEY, 0)}
+                    for p in self.new_periods
+                ],
+            )
+
+        for department_id, count in self.departments.items():
+            if count:
+                connection.execute(
+                    update(DepartmentTotal)
+                    .where(DepartmentTotal.department_id == department_id)
+                    .values(employee_count=DepartmentTotal.employee_count + count)
+                )
+        for period_id, changes in self.periods.items():
+            values = {
+                column: getattr(PeriodTotal, column) + amount
+                for column, amount in changes.items()
+                if amount
+            }
+            if values:
+                connection.execute(
+                    update(PeriodTotal)
+                    .where(PeriodTotal.payroll_period_id == period_id)
+                    .values(**values)
+                )
+
+        if self.removed_departments:
+            connection.execute(
+                delete(DepartmentTotal).where(
+                    DepartmentTotal.department_id.in_(self.removed_departments)
+                )
+            )
+        if self.removed_periods:
+            connection.execute(
+                delete(PeriodTotal).where(
+                    PeriodTotal.payroll_period_id.in_(self.removed_periods)
+                )
+            )
+
+        values = {
+            column: getattr(SummaryCounter, column) + amount
+            for column, amount in self.summary.items()
+            if amount
+        }
+        if values:
+            connection.execute(
+                update(SummaryCounter).where(SummaryCounter.id == SUMMARY_ID).values(**values)
+            )
+        if self.ytd:
+            _apply_ytd(connection, self.ytd)
+
+
+def _apply_ytd(connection: Connection, changes: Dict[Tuple[int, int], Dict[str, int]]) -> None:
+    """Upsert accumulator rows portably: UPDATE the keys that exist, INSERT the rest."""
+    changes = {key: totals for key, totals in changes.items() if any(totals.values())}
+    by_year: Dict[int, List[int]] = defaultdict(list)
+    for employee_id, tax_year in changes:
+        by_year[tax_year].append(employee_id)
+
+    existing = set()
+    for tax_year, employee_ids in by_year.items():
+        for start in range(0, len(employee_ids), _KEY_BATCH):
+            existing.update(
+                (employee_id, tax_year)
+                for employee_id in connection.scalars(
+                    select(YtdAccumulator.employee_id).where(
+                        YtdAccumulator.tax_year == tax_year,
+                        YtdAccumulator.employee_id.in_(employee_ids[start : start + _KEY_BATCH]),
+                    )
+                )
+            )
+
+    updates = [
+        {
+            "key_employee_id": employee_id,
+            "key_tax_year": tax_year,
+            **{f"add_{column}": totals[column] for column in _YTD_COLUMNS},
+        }
+        for (employee_id, tax_year), totals in changes.items()
+        if (employee_id, tax_year) in existing
+    ]
+    inserts = [
+        {"employee_id": employee_id, "tax_year": tax_year, **{c: totals[c] for c in _YTD_COLUMNS}}
+        for (employee_id, tax_year), totals in changes.items()
+        if (employee_id, tax_year) not in existing
+    ]
+    if updates:
+        connection.execute(_YTD_UPDATE, updates)
+    if inserts:
+        connection.execute(insert(YtdAccumulator), inserts)
+    if any(totals["record_count"] < 0 for totals in changes.values()):
+        connection.execute(delete(YtdAccumulator).where(YtdAccumulator.record_count <= 0))
+
+
+def _record_cents(record: PayrollRecord, sign: int = 1) -> Dict[str, int]:
+    return {column: sign * to_cents(getattr(record, attr)) for column, attr in _RECORD_MONEY.items()}
+
+
+def _record_ytd_cents(record: PayrollRecord, sign: int = 1) -> Dict[str, int]:
+    cents = _record_cents(record, sign)
+    return {column: cents[column] for column in _YTD_MONEY}
+
+
+def _tax_years(session: Session, period_ids: Iterable[int]) -> Dict[int, int]:
+    """Map period ids to tax years, preferring periods already in the session.
+
+    Periods deleted in this flush are gone from the database but still in
+    the identity map, so records removed along with them resolve too.
+    """
+    years = {}
+    missing = []
+    for period_id in set(period_ids):
+        period = session.identity_map.get(Session.identity_key(PayrollPeriod, period_id))
+        if period is not None:
+            years[period_id] = period.end_date.year
+        else:
+            missing.append(period_id)
+    if missing:
+        years.update(
+            (period_id, end_date.year)
+            for period_id, end_date in session.connection().execute(
+                select(PayrollPeriod.id, PayrollPeriod.end_date).where(
+                    PayrollPeriod.id.in_(missing)
+                )
+            )
+        )
+    return years
+
+
+def _previous(obj, attr: str):
+    history = inspect(obj).attrs[attr].history
+    return history.deleted[0] if history.deleted else getattr(obj, attr)
+
+
+def _previous_department_id(employee: Employee) -> int:
+    history = inspect(employee).attrs.department_id.history
+    if history.deleted:
+        return history.deleted[0]
+    relationship_history = inspect(employee).attrs.department.history
+    if relationship_history.deleted and relationship_history.deleted[0] is not None:
+        return relationship_history.deleted[0].id
+    return employee.department_id
+
+
+@event.listens_for(SessionLocal.session_factory, "after_flush")
+def _track_flush(session, _flush_context) -> None:
+    """Translate the ORM changes of a flush into counter updates."""
+    delta = CounterDelta()
+    records = [
+        obj
+        for obj in (*session.new, *session.deleted, *session.dirty)
+        if isinstance(obj, PayrollRecord)
+    ]
+    years = (
+        _tax_years(
+            session,
+            [
+                period_id
+                for record in records
+                for period_id in (record.payroll_period_id, _previous(record, "payroll_period_id"))
+            ],
+        )
+        if records
+        else {}
+    )
+
+    for obj in session.new:
+        if isinstance(obj, Department):
+            delta.department_created(obj.id)
+        elif isinstance(obj, Employee):
+            delta.employees(obj.department_id, 1)
+        elif isinstance(obj, PayrollPeriod):
+            delta.period_created(obj.id)
+        elif isinstance(obj, PayrollRecord):
+            delta.records(obj.payroll_period_id, 1, **_record_cents(obj))
+            delta.year_to_date(
+                obj.employee_id, years[obj.payroll_period_id], 1, **_record_ytd_cents(obj)
+            )
+
+    for obj in session.deleted:
+        if isinstance(obj, Department):
+            delta.department_removed(obj.id)
+        elif isinstance(obj, Employee):
+            delta.employees(obj.department_id, -1)
+        elif isinstance(obj, PayrollPeriod):
+            delta.period_removed(obj.id)
+        elif isinstance(obj, PayrollRecord):
+            delta.records(obj.payroll_period_id, -1, **_record_cents(obj, -1))
+            delta.year_to_date(
+                obj.employee_id, years[obj.payroll_period_id], -1, **_record_ytd_cents(obj, -1)
+            )
+
+    for obj in session.dirty:
+        if isinstance(obj, Employee):
+            previous = _previous_department_id(obj)
+            if previous != obj.department_id:
+                delta.employees(previous, -1)
+                delta.employees(obj.department_id, 1)
+        elif isinstance(obj, PayrollRecord) and session.is_modified(obj):
+            old_cents = {
+                column: -to_cents(_previous(obj, attr)) for column, attr in _RECORD_MONEY.items()
+            }
+            previous_period = _previous(obj, "payroll_period_id")
+            delta.records(previous_period, -1, **old_cents)
+            delta.records(obj.payroll_period_id, 1, **_record_cents(obj))
+            delta.year_to_date(
+                _previous(obj, "employee_id"),
+                years[previous_period],
+                -1,
+                **{column: old_cents[column] for column in _YTD_MONEY},
+            )
+            delta.year_to_date(
+                obj.employee_id, years[obj.payroll_period_id], 1, **_record_ytd_cents(obj)
+            )
+
+    delta.apply(session.connection())
+
+
+def _expected(connection: Connection) -> Dict:
+    """Compute every counter from scratch with aggregate queries."""
+    record_totals = select(
+        func.count(PayrollRecord.id),
+        *(func.coalesce(func.sum(getattr(PayrollRecord, attr)), 0) for attr in _RECORD_MONEY.values()),
+    )
+    count, *money = connection.execute(record_totals).one()
+    summary = {
+        "total_employees": connection.scalar(select(func.count(Employee.id))),
+        "total_departments": connection.scalar(select(func.count(Department.id))),
+        "total_periods": connection.scalar(select(func.count(PayrollPeriod.id))),
+        "total_records": count,
+        **{column: to_cents(value) for column, value in zip(_MONEY, money)},
+    }
+
+    departments = dict(
+        connection.execute(
+            select(Department.id, func.count(Employee.id))
+            .outerjoin(Employee, Employee.department_id == Department.id)
+            .group_by(Department.id)
+        ).all()
+    )
+
+    periods = {}
+    rows = connection.execute(
+        select(
+            PayrollPeriod.id,
+            func.count(PayrollRecord.id),
+            *(
+                func.coalesce(func.sum(getattr(PayrollRecord, attr)), 0)
+                for attr in _RECORD_MONEY.values()
+            ),
+        )
+        .outerjoin(PayrollRecord, PayrollRecord.payroll_period_id == PayrollPeriod.id)
+        .group_by(PayrollPeriod.id)
+    )
+    for period_id, record_count, *money in rows:
+        periods[period_id] = {
+            "record_count": record_count,
+            **{column: to_cents(value) for column, value in zip(_MONEY, money)},
+        }
+
+    # Archived records left payroll_records but still count (backend.archive).
+    archived = connection.execute(
+        select(
+            PeriodArchive.payroll_period_id,
+            PeriodArchive.record_count,
+            *(getattr(PeriodArchive, column) for column in _MONEY),
+        )
+    )
+    for period_id, record_count, *money in archived:
+        summary["total_records"] += record_count
+        periods[period_id]["record_count"] += record_count
+        for column, cents in zip(_MONEY, money):
+            summary[column] += cents
+            periods[period_id][column] += cents
+    return {
+        "summary": summary,
+        "departments": departments,
+        "periods": periods,
+        "ytd": _expected_ytd(connection),
+    }
+
+
+def _expected_ytd(connection: Connection) -> Dict[Tuple[int, int], Dict[str, int]]:
+    tax_year = func.extract("year", PayrollPeriod.end_date)
+    rows = connection.execute(
+        select(
+            PayrollRecord.employee_id,
+            tax_year,
+            func.count(PayrollRecord.id),
+            *(func.sum(getattr(PayrollRecord, _RECORD_MONEY[column])) for column in _YTD_MONEY),
+        )
+        .join(PayrollPeriod, PayrollPeriod.id == PayrollRecord.payroll_period_id)
+        .group_by(PayrollRecord.employee_id, tax_year)
+    )
+    expected = {
+        (employee_id, int(year)): {
+            "record_count": record_count,
+            **{column: to_cents(value) for column, value in zip(_YTD_MONEY, money)},
+        }
+        for employee_id, year, record_count, *money in rows
+    }
+    if connection.scalar(select(PeriodArchive.payroll_period_id).limit(1)) is not None:
+        from .archive import archived_ytd  # pylint: disable=import-outside-toplevel
+
+        for key, totals in archived_ytd(connection).items():
+            entry = expected.setdefault(key, dict.fromkeys(_YTD_COLUMNS, 0))
+            for column, value in totals.items():
+                entry[column] += value
+    return expected
+
+
+def _rebuild_ytd(connection: Connection, expected: Dict[Tuple[int, int], Dict[str, int]]) -> None:
+    connection.execute(delete(YtdAccumulator))
+    rows = [
+        {"employee_id": employee_id, "tax_year": tax_year, **totals}
+        for (employee_id, tax_year), totals in expected.items()
+    ]
+    for start in range(0, len(rows), 10_000):
+        connection.execute(insert(YtdAccumulator), rows[start : start + 10_000])
+
+
+def rebuild(connection: Connection) -> None:
+    """Replace every counter with values recomputed from the source tables."""
+    expected = _expected(connection)
+    connection.execute(delete(SummaryCounter))
+    connection.execute(delete(DepartmentTotal))
+    connection.execute(delete(PeriodTotal))
+    connection.execute(insert(SummaryCounter).values(id=SUMMARY_ID, **expected["summary"]))
+    if expected["departments"]:
+        connection.execute(
+            insert(DepartmentTotal),
+            [
+                {"department_id": d, "employee_count": count}
+                for d, count in expected["departments"].items()
+            ],
+        )
+    if expected["periods"]:
+        connection.execute(
+            insert(PeriodTotal),
+            [{"payroll_period_id": p, **values} for p, values in expected["periods"].items()],
+        )
+    _rebuild_ytd(connection, expected["ytd"])
+
+
+def find_drift(connection: Connection) -> List[str]:
+    """Describe every counter that differs from a from-scratch recomputation."""
+    expected = _expected(connection)
+    problems = []
+
+    row = connection.execute(
+        select(SummaryCounter).where(SummaryCounter.id == SUMMARY_ID)
+    ).mappings().first()
+    if row is None:
+        problems.append("summary_counters row is missing")
+    else:
+        for column, value in expected["summary"].items():
+            if row[column] != value:
+                problems.append(f"summary.{column}: stored {row[column]}, expected {value}")
+
+    stored = dict(
+        connection.execute(select(DepartmentTotal.department_id, DepartmentTotal.employee_count))
+        .all()
+    )
+    for department_id in stored.keys() | expected["departments"].keys():
+        have, want = stored.get(department_id), expected["departments"].get(department_id)
+        if have != want:
+            problems.append(f"department {department_id}.employee_count: stored {have}, expected {want}")
+
+    stored_periods = {
+        row["payroll_period_id"]: row
+        for row in connection.execute(select(PeriodTotal)).mappings()
+    }
+    for period_id in stored_periods.keys() | expected["periods"].keys():
+        have, want = stored_periods.get(period_id), expected["periods"].get(period_id)
+        if have is None or want is None:
+            problems.append(f"period {period_id}: stored {have is not None}, expected {want is not None}")
+            continue
+        for column, value in want.items():
+            if have[column] != value:
+                problems.append(f"period {period_id}.{column}: stored {have[column]}, expected {value}")
+
+    stored_ytd = {
+        (row["employee_id"], row["tax_year"]): row
+        for row in connection.execute(select(YtdAccumulator)).mappings()
+    }
+    for key in stored_ytd.keys() | expected["ytd"].keys():
+        have, want = stored_ytd.get(key), expected["ytd"].get(key)
+        label = f"ytd employee {key[0]} year {key[1]}"
+        if have is None or want is None:
+            problems.append(f"{label}: stored {have is not None}, expected {want is not None}")
+            continue
+        for column, value in want.items():
+            if have[column] != value:
+                problems.append(f"{label}.{column}: stored {have[column]}, expected {value}")
+    return problems
@@ -1,24 +1,84 @@
+import time
 from contextlib import contextmanager
 from typing import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
 
 from .config import settings
 
-engine = create_engine(settings.database_url, echo=False, future=True)
+
+def _apply_sqlite_pragmas(dbapi_connection, _record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.close()
+
+
+def create_db_engine(url: str) -> Engine:
+    """Create an engine with the pool and driver settings from ``settings``.
+
+    File-backed SQLite databases switch to WAL so readers keep working while
+    a writer commits; in-memory databases keep SQLAlchemy's default pool.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            echo=False,
+            future=True,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+
+    in_memory = parsed.database in (None, "", ":memory:")
+    options = {} if in_memory else {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+    sqlite_engine = create_engine(
+        url,
+        echo=False,
+        future=True,
+        connect_args={"timeout": settings.sqlite_busy_timeout_ms / 1000},
+        **options,
+    )
+    if not in_memory:
+        event.listen(sqlite_engine, "connect", _apply_sqlite_pragmas)
+    return sqlite_engine
+
+
+engine = create_db_engine(settings.database_url)
 SessionLocal = scoped_session(
     sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 )
 
+# Optional read replica; GET handlers read through ``read_session_scope``.
+read_engine = (
+    create_db_engine(settings.read_database_url) if settings.read_database_url else None
+)
+ReadSessionLocal = scoped_session(
+    sessionmaker(bind=read_engine, autoflush=False, autocommit=False, future=True)
+)
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+LAST_WRITE_COOKIE = "payroll_last_write"
+
 Base = declarative_base()
 
 
 def init_db() -> None:
-    """Create database tables based on the SQLAlchemy models."""
-    import backend.models  # noqa: F401  # pylint: disable=import-outside-toplevel
+    """Create or upgrade the database schema (see ``backend.migrations``)."""
+    from backend.migrations import migrate  # pylint: disable=import-outside-toplevel
 
-    Base.metadata.create_all(bind=engine)
+    migrate(engine)
 
 
 def get_session():
@@ -26,6 +86,67 @@ def get_session():
     return SessionLocal()
 
 
+def within_write_window(method: str, last_write: str | None) -> bool:
+    """Whether a request must read from the primary: it is a write, or the
+    client wrote within ``settings.read_your_writes_seconds``."""
+    if method not in READ_METHODS:
+        return True
+    try:
+        return time.time() - float(last_write or "") < settings.read_your_writes_seconds
+    except ValueError:
+        return False
+
+
+def _reads_from_primary() -> bool:
+    if read_engine is None:
+        return True
+    # Only the web app has requests; CLIs and the worker do not load Flask.
+    from flask import has_request_context, request  # pylint: disable=import-outside-toplevel
+
+    if not has_request_context():
+        return True
+    return within_write_window(request.method, request.cookies.get(LAST_WRITE_COOKIE))
+
+
+def read_bind() -> Engine:
+    """Return the engine the current request should read from."""
+    return engine if _reads_from_primary() else read_engine
+
+
+def remember_write(response):
+    """Pin the client to the primary for a while after a successful write."""
+    from flask import request  # pylint: disable=import-outside-toplevel
+
+    if (
+        read_engine is not None
+        and request.method not in READ_METHODS
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            f"{time.time():.3f}",
+            max_age=max(1, int(settings.read_your_writes_seconds)),
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+@contextmanager
+def read_session_scope() -> Generator:
+    """Provide a read-only session on the replica, or the primary when required."""
+    if _reads_from_primary():
+        with session_scope() as session:
+            yield session
+        return
+    session = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
 @contextmanager
 def session_scope() -> Generator:
     """Provide a transactional scope around a series of operations."""
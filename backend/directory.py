@@ -0,0 +1,273 @@
+"""Process-local employee directory for typeahead suggestions.
+
+Employees are held as ``DirectoryEntry`` objects (``__slots__``, no ORM
+state, one string for the whole name) and indexed by three lower-cased keys
+each: "first last", the last name and the email. The keys live in one sorted
+list with the employee ids in a parallel ``array``, so a prefix lookup is a
+``bisect`` followed by a short forward scan and costs microseconds without
+touching the database. 100k employees take about 46 MiB.
+
+The directory is loaded with one query on the first suggestion. Afterwards
+ORM writes committed by this process are applied right after the commit
+(changes are collected in ``after_flush`` and applied in ``after_commit``).
+Writes from other processes or bulk statements (the importer) are picked
+up by comparing the ``employees`` table version at most every
+``DIRECTORY_REFRESH_SECONDS`` and, when it moved, reading the rows updated
+and the tombstones written since the last sync.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+from sqlalchemy import event, select
+
+from .config import settings
+from .database import SessionLocal, session_scope
+from .models import Employee, TableVersion, Tombstone
+
+_PENDING = "directory_changes"
+_MERGE_THRESHOLD = 100
+
+
+@dataclass(slots=True)
+class DirectoryEntry:
+    id: int
+    full_name: str
+    last_name_at: int  # offset of the last name in full_name
+    email: str
+    department_id: int
+
+    @classmethod
+    def from_row(cls, row) -> "DirectoryEntry":
+        employee_id, first_name, last_name, email, department_id = row
+        return cls(
+            employee_id, f"{first_name} {last_name}", len(first_name) + 1, email, department_id
+        )
+
+    def keys(self) -> tuple[str, str, str]:
+        name = self.full_name.lower()
+        email = self.email.lower()
+        # Stored emails are normally lower case already; share the string.
+        return (name, name[self.last_name_at :], self.email if email == self.email else email)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "full_name": self.full_name,
+            "email": self.email,
+            "department_id": self.department_id,
+        }
+
+
+def _entry_rows():
+    return select(
+        Employee.id,
+        Employee.first_name,
+        Employee.last_name,
+        Employee.email,
+        Employee.department_id,
+    )
+
+
+def _employees_version(session) -> int | None:
+    return session.scalar(
+        select(TableVersion.version).where(TableVersion.table_name == Employee.__tablename__)
+    )
+
+
+class EmployeeDirectory:
+    """Sorted prefix index over the names and emails of every employee."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._entries: Dict[int, DirectoryEntry] = {}
+        self._keys: List[str] = []
+        self._ids = array("q")
+        self.loaded = False
+        self._version: int | None = None
+        self._synced_at = datetime.min
+        self._checked_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self) -> None:
+        """Read every employee and rebuild the index from scratch."""
+        with session_scope() as session:
+            started = datetime.utcnow()
+            version = _employees_version(session)
+            entries = [DirectoryEntry.from_row(row) for row in session.execute(_entry_rows())]
+        pairs = sorted((key, entry.id) for entry in entries for key in entry.keys())
+        with self._lock:
+            self._entries = {entry.id: entry for entry in entries}
+            self._keys = [key for key, _ in pairs]
+            self._ids = array("q", (employee_id for _, employee_id in pairs))
+            self._version = version
+            self._synced_at = started
+            self._checked_at = time.monotonic()
+            self.loaded = True
+
+    def clear(self) -> None:
+        """Drop the index; the next suggestion loads it again."""
+        with self._lock:
+            self._entries, self._keys, self._ids = {}, [], array("q")
+            self.loaded = False
+
+    def _insert(self, entry: DirectoryEntry) -> None:
+        for key in entry.keys():
+            position = bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._ids.insert(position, entry.id)
+
+    def _remove(self, employee_id: int) -> None:
+        entry = self._entries.pop(employee_id, None)
+        if entry is None:
+            return
+        for key in entry.keys():
+            position = bisect_left(self._keys, key)
+            while self._ids[position] != employee_id:
+                position += 1
+            del self._keys[position]
+            del self._ids[position]
+
+    def _merge(self, changes: Dict[int, DirectoryEntry | None]) -> None:
+        """Apply ``changes`` by rebuilding the key list in one pass."""
+        pairs = [
+            (key, employee_id)
+            for key, employee_id in zip(self._keys, self._ids)
+            if employee_id not in changes
+        ]
+        for employee_id, entry in changes.items():
+            if entry is None:
+                self._entries.pop(employee_id, None)
+            else:
+                self._entries[employee_id] = entry
+                pairs.extend((key, employee_id) for key in entry.keys())
+        # Timsort finds the sorted run of kept keys, so this is a merge.
+        pairs.sort()
+        self._keys = [key for key, _ in pairs]
+        self._ids = array("q", (employee_id for _, employee_id in pairs))
+
+    def apply(self, changes: Dict[int, DirectoryEntry | None]) -> None:
+        """Upsert entries, removing the ids mapped to ``None``."""
+        with self._lock:
+            if not self.loaded:
+                return
+            # Each insert or removal shifts half the key list; past about a
+            # hundred changes (a catch-up after an import) one pass is cheaper.
+            if len(changes) > _MERGE_THRESHOLD:
+                self._merge(changes)
+                return
+            for employee_id, entry in changes.items():
+                self._remove(employee_id)
+                if entry is not None:
+                    self._entries[employee_id] = entry
+                    self._insert(entry)
+
+    def _catch_up(self) -> None:
+        """Apply writes made elsewhere once the table version has moved."""
+        with session_scope() as session:
+            started = datetime.utcnow()
+            version = _employees_version(session)
+            if version == self._version:
+                return
+            # Same overlap as delta sync, for rows committed out of order.
+            since = self._synced_at - timedelta(seconds=settings.sync_overlap_seconds)
+            changes: Dict[int, DirectoryEntry | None] = {
+                row_id: None
+                for row_id in session.scalars(
+                    select(Tombstone.row_id).where(
+                        Tombstone.table_name == Employee.__tablename__,
+                        Tombstone.deleted_at > since,
+                    )
+                )
+            }
+            for row in session.execute(_entry_rows().where(Employee.updated_at > since)):
+                changes[row.id] = DirectoryEntry.from_row(row)
+        self.apply(changes)
+        with self._lock:
+            self._version = version
+            self._synced_at = started
+
+    def _ensure_fresh(self) -> None:
+        with self._lock:
+            if not self.loaded:
+                self.load()
+                return
+            if time.monotonic() - self._checked_at < settings.directory_refresh_seconds:
+                return
+            self._checked_at = time.monotonic()
+            self._catch_up()
+
+    def suggest(
+        self, prefix: str, limit: int = 10, department_id: int | None = None
+    ) -> List[DirectoryEntry]:
+        """Employees with a name or email starting with ``prefix``, in key order."""
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        self._ensure_fresh()
+        found: List[DirectoryEntry] = []
+        seen = set()
+        with self._lock:
+            keys, ids = self._keys, self._ids
+            position = bisect_left(keys, prefix)
+            while position < len(keys) and keys[position].startswith(prefix):
+                employee_id = ids[position]
+                position += 1
+                if employee_id in seen:
+                    continue
+                seen.add(employee_id)
+                entry = self._entries[employee_id]
+                if department_id is None or entry.department_id == department_id:
+                    found.append(entry)
+                    if len(found) >= limit:
+                        break
+        return found
+
+
+directory = EmployeeDirectory()
+
+
+def _snapshot(employees: Iterable) -> Dict[int, DirectoryEntry]:
+    return {
+        employee.id: DirectoryEntry.from_row(
+            (
+                employee.id,
+                employee.first_name,
+                employee.last_name,
+                employee.email,
+                employee.department_id,
+            )
+        )
+        for employee in employees
+        if isinstance(employee, Employee)
+    }
+
+
+@event.listens_for(SessionLocal.session_factory, "after_flush")
+def _collect_changes(session, _flush_context) -> None:
+    if not directory.loaded:
+        return
+    pending = session.info.setdefault(_PENDING, {})
+    pending.update(_snapshot([*session.new, *session.dirty]))
+    pending.update(dict.fromkeys(_snapshot(session.deleted), None))
+
+
+@event.listens_for(SessionLocal.session_factory, "after_commit")
+def _apply_changes(session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        directory.apply(pending)
+
+
+@event.listens_for(SessionLocal.session_factory, "after_soft_rollback")
+def _discard_changes(session, _previous_transaction) -> None:
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,211 @@
+"""Constant-memory payroll register export.
+
+The register of a period is read with ``yield_per`` so rows arrive from the
+database cursor in batches of ``settings.export_batch_size``, and each batch
+is serialized and yielded as bytes before the next one is fetched. Flask
+streams the generator with chunked transfer encoding, so peak memory depends
+on the batch size rather than on the number of records in the period.
+Archived periods are read from their archive file in batches of the same
+size.
+
+Parquet output needs the optional ``pyarrow`` package; each batch becomes one
+row group.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator, List
+
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+
+from .archive import archived_record_batches
+from .config import settings
+from .database import read_session_scope
+from .models import Department, Employee, PayrollRecord, PeriodArchive
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+COLUMNS = [
+    "record_id",
+    "employee_id",
+    "employee_name",
+    "email",
+    "department",
+    "hours_worked",
+    "gross_pay",
+    "tax_amount",
+    "other_deductions",
+    "net_pay",
+    "notes",
+    "created_at",
+]
+
+
+class ExportUnavailable(RuntimeError):
+    """Raised when a format needs an optional dependency that is missing."""
+
+
+def _register_statement(period_id: int):
+    return (
+        select(
+            PayrollRecord.id.label("record_id"),
+            PayrollRecord.employee_id,
+            (Employee.first_name + " " + Employee.last_name).label("employee_name"),
+            Employee.email,
+            Department.name.label("department"),
+            PayrollRecord.hours_worked,
+            PayrollRecord.gross_pay,
+            PayrollRecord.tax_amount,
+            PayrollRecord.other_deductions,
+            PayrollRecord.net_pay,
+            PayrollRecord.notes,
+            PayrollRecord.created_at,
+        )
+        .join(Employee, PayrollRecord.employee_id == Employee.id)
+        .outerjoin(Department, Employee.department_id == Department.id)
+        .where(PayrollRecord.payroll_period_id == period_id)
+        .order_by(PayrollRecord.created_at, PayrollRecord.id)
+        .execution_options(stream_results=True, yield_per=settings.export_batch_size)
+    )
+
+
+def _batches(period_id: int) -> Iterator[List[Row]]:
+    with read_session_scope() as session:
+        if session.get(PeriodArchive, period_id) is None:
+            yield from session.execute(_register_statement(period_id)).partitions()
+            return
+    for records, employees, _ in archived_record_batches(period_id, settings.export_batch_size):
+        by_id = {row.id: row for row in employees}
+        yield [_register_row(record, by_id[record.employee_id]) for record in records]
+
+
+def _register_row(record, employee: Row) -> tuple:
+    """An archived record in the column order of ``_register_statement``."""
+    return (
+        record.id,
+        record.employee_id,
+        f"{employee.first_name} {employee.last_name}",
+        employee.email,
+        employee.department,
+        record.hours_worked,
+        record.gross_pay,
+        record.tax_amount,
+        record.other_deductions,
+        record.net_pay,
+        record.notes,
+        record.created_at,
+    )
+
+
+def _csv_chunks(batches: Iterable[List[Row]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _ndjson_chunks(batches: Iterable[List[Row]]) -> Iterator[bytes]:
+    for batch in batches:
+        lines = []
+        for row in batch:
+            record = dict(zip(COLUMNS, row))
+            for name in ("gross_pay", "tax_amount", "other_deductions", "net_pay"):
+                record[name] = float(record[name] or 0)
+            record["created_at"] = record["created_at"].isoformat()
+            lines.append(json.dumps(record))
+        yield ("\n".join(lines) + "\n").encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.pending: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.pending.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data, self.pending = b"".join(self.pending), []
+        return data
+
+
+def _parquet_chunks(batches: Iterable[List[Row]]) -> Iterator[bytes]:
+    # pylint: disable=import-outside-toplevel
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    money = pa.decimal128(12, 2)
+    schema = pa.schema(
+        [
+            ("record_id", pa.int64()),
+            ("employee_id", pa.int64()),
+            ("employee_name", pa.string()),
+            ("email", pa.string()),
+            ("department", pa.string()),
+            ("hours_worked", pa.float64()),
+            ("gross_pay", money),
+            ("tax_amount", money),
+            ("other_deductions", money),
+            ("net_pay", money),
+            ("notes", pa.string()),
+            ("created_at", pa.timestamp("us")),
+        ]
+    )
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="snappy") as writer:
+        for batch in batches:
+            columns = list(zip(*batch)) if batch else [[] for _ in COLUMNS]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Gzip-compress a byte stream incrementally."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_register(period_id: int, fmt: str) -> Iterator[bytes]:
+    """Return a byte generator for the register of ``period_id`` in ``fmt``."""
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401  # pylint: disable=import-outside-toplevel,unused-import
+        except ImportError as exc:
+            raise ExportUnavailable("Parquet export requires the pyarrow package") from exc
+        return _parquet_chunks(_batches(period_id))
+    if fmt == "ndjson":
+        return _ndjson_chunks(_batches(period_id))
+    return _csv_chunks(_batches(period_id))
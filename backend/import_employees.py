@@ -0,0 +1,32 @@
+"""Import employees from a CSV or NDJSON file.
+
+Usage::
+
+    python -m backend.import_employees employees.csv
+    python -m backend.import_employees employees.ndjson --batch-size 5000
+
+CSV files need a header row with ``first_name``, ``last_name``, ``email``,
+``base_rate``, ``employment_type``, ``hire_date`` and either ``department``
+(name) or ``department_id``. Existing employees are matched on email and
+updated in place.
+"""
+
+import argparse
+import json
+import sys
+
+from backend.importer import FORMATS, detect_format, import_employees
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import employees.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--batch-size", type=int)
+    args = parser.parse_args()
+
+    with open(args.path, "rb") as handle:
+        report = import_employees(
+            handle, args.format or detect_format(args.path, None), args.batch_size
+        )
+    print(json.dumps(report.to_dict(), indent=2))
+    sys.exit(1 if report.error_count else 0)
@@ -0,0 +1,262 @@
+"""Streaming bulk employee import from CSV or NDJSON.
+
+Rows are read incrementally from a binary stream and handled in batches of
+``settings.import_batch_size``: each batch is validated, departments are
+resolved from a name/id map loaded once per import, and the batch is written
+with one dialect-native upsert keyed on ``email`` (``ON CONFLICT`` on SQLite
+and PostgreSQL, ``ON DUPLICATE KEY UPDATE`` on MySQL) and committed. Memory
+use is bounded by the batch size and the capped error report, not the file.
+Employees whose ``base_rate`` changed have their open-period records
+recomputed when the batch commits (``backend.recompute``).
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+
+from sqlalchemy import select
+
+from .config import settings
+from .counters import CounterDelta
+from .database import session_scope
+from .models import EMPLOYMENT_TYPES, Department, Employee
+from .money import to_cents
+from .recompute import mark_rate_changed
+from .versions import bump
+
+FORMATS = ("csv", "ndjson")
+_UPDATABLE = (
+    "first_name",
+    "last_name",
+    "base_rate",
+    "department_id",
+    "employment_type",
+    "hire_date",
+    "updated_at",
+)
+# Largest value Employee.base_rate (Numeric(10, 2)) can hold.
+MAX_BASE_RATE = Decimal("99999999.99")
+
+
+class ImportFormatError(ValueError):
+    """Raised when the upload format is unknown or unreadable."""
+
+
+@dataclass(slots=True)
+class ImportReport:
+    """Outcome of an import; ``errors`` is capped at ``settings.import_max_errors``."""
+
+    rows_read: int = 0
+    inserted: int = 0
+    updated: int = 0
+    error_count: int = 0
+    errors: List[Dict] = field(default_factory=list)
+
+    def reject(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < settings.import_max_errors:
+            self.errors.append({"row": line, "error": message})
+
+    def to_dict(self) -> Dict:
+        return {
+            "rows_read": self.rows_read,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors),
+        }
+
+
+def detect_format(filename: str | None, content_type: str | None) -> str:
+    if filename:
+        suffix = filename.rsplit(".", 1)[-1].lower()
+        if suffix in ("ndjson", "jsonl"):
+            return "ndjson"
+        if suffix == "csv":
+            return "csv"
+    if content_type and ("ndjson" in content_type or "jsonl" in content_type):
+        return "ndjson"
+    return "csv"
+
+
+def iter_rows(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, Dict | None]]:
+    """Yield ``(line_number, row)`` pairs; ``row`` is ``None`` if unparseable."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "ndjson":
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None
+                continue
+            yield line_number, row if isinstance(row, dict) else None
+    else:
+        raise ImportFormatError(f"Unsupported format: {fmt}")
+
+
+def _load_departments(session) -> Tuple[Dict[str, int], set]:
+    rows = session.execute(select(Department.id, Department.name)).all()
+    return {name.strip().lower(): dept_id for dept_id, name in rows}, {r[0] for r in rows}
+
+
+def parse_employment_type(value) -> str:
+    """Normalise an ``employment_type`` or raise ``ValueError`` if it is unknown."""
+    employment_type = str(value).strip().upper()
+    if employment_type not in EMPLOYMENT_TYPES:
+        raise ValueError(f"employment_type must be one of {', '.join(EMPLOYMENT_TYPES)}")
+    return employment_type
+
+
+def parse_base_rate(value) -> Decimal:
+    """Return ``value`` as a ``Decimal`` that ``Employee.base_rate`` can hold.
+
+    Raises ``ValueError`` for non-numbers, non-finite, negative and oversized rates.
+    """
+    try:
+        base_rate = Decimal(str(value).strip())
+    except InvalidOperation as exc:
+        raise ValueError("base_rate must be a number") from exc
+    if not base_rate.is_finite():
+        raise ValueError("base_rate must be a number")
+    if base_rate < 0:
+        raise ValueError("base_rate must not be negative")
+    if base_rate > MAX_BASE_RATE:
+        raise ValueError(f"base_rate must not exceed {MAX_BASE_RATE}")
+    return base_rate
+
+
+def _validate(raw: Dict, by_name: Dict[str, int], ids: set) -> Dict:
+    """Return insertable column values for ``raw`` or raise ``ValueError``."""
+    missing = [
+        name
+        for name in ("first_name", "last_name", "email", "base_rate", "employment_type", "hire_date")
+        if not str(raw.get(name) or "").strip()
+    ]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+    if raw.get("department_id"):
+        department_id = int(raw["department_id"])
+        if department_id not in ids:
+            raise ValueError("Department not found")
+    else:
+        department_id = by_name.get(str(raw.get("department") or "").strip().lower())
+        if department_id is None:
+            raise ValueError("Department not found")
+
+    employment_type = parse_employment_type(raw["employment_type"])
+    base_rate = parse_base_rate(raw["base_rate"])
+
+    try:
+        hire_date = date.fromisoformat(str(raw["hire_date"]).strip())
+    except ValueError as exc:
+        raise ValueError("Invalid hire_date format, use YYYY-MM-DD") from exc
+
+    email = str(raw["email"]).strip().lower()
+    if "@" not in email:
+        raise ValueError("Invalid email")
+
+    return {
+        "first_name": str(raw["first_name"]).strip(),
+        "last_name": str(raw["last_name"]).strip(),
+        "email": email,
+        "base_rate": base_rate,
+        "department_id": department_id,
+        "employment_type": employment_type,
+        "hire_date": hire_date,
+    }
+
+
+def _upsert_statement(dialect_name: str):
+    table = Employee.__table__
+    if dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert  # pylint: disable=import-outside-toplevel
+
+        stmt = insert(table)
+        return stmt.on_duplicate_key_update({name: stmt.inserted[name] for name in _UPDATABLE})
+    if dialect_name in ("sqlite", "postgresql"):
+        module = __import__(f"sqlalchemy.dialects.{dialect_name}", fromlist=["insert"])
+        stmt = module.insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=["email"],
+            set_={name: stmt.excluded[name] for name in _UPDATABLE},
+        )
+    raise ImportFormatError(f"Upsert is not supported on {dialect_name}")
+
+
+def _write_batch(batch: Dict[str, Dict], report: ImportReport) -> None:
+    with session_scope() as session:
+        existing = {
+            row.email: row
+            for row in session.execute(
+                select(Employee.id, Employee.email, Employee.department_id, Employee.base_rate)
+                .where(Employee.email.in_(list(batch)))
+            )
+        }
+        now = datetime.utcnow()
+        rows = [{**row, "created_at": now, "updated_at": now} for row in batch.values()]
+        connection = session.connection()
+        connection.execute(_upsert_statement(connection.dialect.name), rows)
+
+        delta = CounterDelta()
+        rate_changed = []
+        for email, row in batch.items():
+            previous = existing.get(email)
+            if previous is None:
+                delta.employees(row["department_id"], 1)
+                continue
+            if previous.department_id != row["department_id"]:
+                delta.employees(previous.department_id, -1)
+                delta.employees(row["department_id"], 1)
+            if to_cents(previous.base_rate) != to_cents(row["base_rate"]):
+                rate_changed.append(previous.id)
+        delta.apply(connection)
+        mark_rate_changed(session, rate_changed)
+        bump(connection, [Employee.__tablename__])
+
+    report.updated += len(existing)
+    report.inserted += len(batch) - len(existing)
+
+
+def import_employees(stream: BinaryIO, fmt: str, batch_size: int | None = None) -> ImportReport:
+    """Validate and upsert every employee row in ``stream``."""
+    if fmt not in FORMATS:
+        raise ImportFormatError(f"Unsupported format: {fmt}")
+    batch_size = batch_size or settings.import_batch_size
+    report = ImportReport()
+
+    with session_scope() as session:
+        by_name, ids = _load_departments(session)
+
+    # Keyed by email so a repeated address within a batch keeps its last row.
+    batch: Dict[str, Dict] = {}
+    for line, raw in iter_rows(stream, fmt):
+        report.rows_read += 1
+        if raw is None:
+            report.reject(line, "Unreadable row")
+            continue
+        try:
+            row = _validate(raw, by_name, ids)
+        except (ValueError, TypeError, ArithmeticError) as exc:
+            report.reject(line, str(exc))
+            continue
+        batch[row["email"]] = row
+        if len(batch) >= batch_size:
+            _write_batch(batch, report)
+            batch = {}
+    if batch:
+        _write_batch(batch, report)
+    return report
@@ -0,0 +1,233 @@
+"""Request-scoped SQL and timing instrumentation with a Prometheus endpoint.
+
+Enabled with ``METRICS_ENABLED=true``. ``install(app)`` then:
+
+* counts SQL statements and their time per request through engine events,
+* times every request from ``before_request`` to ``after_request``,
+* logs statements slower than ``SLOW_QUERY_MS`` with their bound parameters
+  on the ``backend.sql.slow`` logger,
+* adds a ``Server-Timing`` header (``db`` and ``app`` durations), and
+* serves per-route histograms in the Prometheus text format at ``/metrics``.
+
+When disabled nothing is registered: no engine listeners, no request hooks
+and no ``/metrics`` route, so requests run exactly as before. Metrics live
+in process memory; with several worker processes each one reports its own.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, Response, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+slow_query_log = logging.getLogger("backend.sql.slow")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PARAMETER_PREVIEW = 500
+
+
+class Histogram:
+    """Cumulative Prometheus histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...], buckets) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: Tuple[str, ...], value: float) -> None:
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = [
+                (key, list(counts), total, count)
+                for key, (counts, total, count) in self._series.items()
+            ]
+        for label_values, counts, total, count in sorted(snapshot):
+            labels = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket{{{labels},le="{bound:g}"}} {cumulative}'
+            yield f'{self.name}_bucket{{{labels},le="+Inf"}} {count}'
+            yield f"{self.name}_sum{{{labels}}} {total:.6f}"
+            yield f"{self.name}_count{{{labels}}} {count}"
+
+
+class Counter:
+    """Monotonic Prometheus counter keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values: Tuple[str, ...], amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for label_values, value in snapshot:
+            yield f"{self.name}{{{_labels(self.labels, label_values)}}} {value:g}"
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "payroll_http_request_duration_seconds",
+    "Time spent handling a request.",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "payroll_http_requests_total", "Requests handled.", ("method", "route", "status")
+)
+DB_SECONDS = Histogram(
+    "payroll_db_duration_seconds",
+    "Time spent in SQL statements per request.",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+DB_STATEMENTS = Histogram(
+    "payroll_db_statements",
+    "SQL statements executed per request.",
+    ("method", "route"),
+    STATEMENT_BUCKETS,
+)
+SLOW_QUERIES = Counter(
+    "payroll_db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.", ("route",)
+)
+METRICS = (REQUEST_SECONDS, REQUESTS, DB_SECONDS, DB_STATEMENTS, SLOW_QUERIES)
+
+
+class RequestStats:
+    __slots__ = ("route", "started", "statements", "db_seconds")
+
+    def __init__(self, route: str) -> None:
+        self.route = route
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+_listening = False
+
+
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany):
+    context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(_conn, _cursor, statement, parameters, context, _executemany):
+    elapsed = time.perf_counter() - context.query_started
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+    if elapsed * 1000 >= settings.slow_query_ms:
+        route = stats.route if stats is not None else "-"
+        SLOW_QUERIES.inc((route,))
+        slow_query_log.warning(
+            "slow query %.1f ms on %s: %s params=%.*r",
+            elapsed * 1000,
+            route,
+            " ".join(statement.split()),
+            PARAMETER_PREVIEW,
+            parameters,
+        )
+
+
+def _listen() -> None:
+    # Listening on the Engine class covers the primary, the read replica and
+    # any engine swapped in later (benchmarks, async engines' sync side).
+    global _listening  # pylint: disable=global-statement
+    if not _listening:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listening = True
+
+
+def _route() -> str:
+    # The URL rule, not the path, keeps label cardinality bounded.
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+def start_request() -> None:
+    _current.set(RequestStats(_route()))
+
+
+def finish_request(response: Response) -> Response:
+    stats = _current.get()
+    if stats is None:
+        return response
+    elapsed = time.perf_counter() - stats.started
+    labels = (request.method, stats.route)
+    REQUEST_SECONDS.observe(labels, elapsed)
+    REQUESTS.inc((request.method, stats.route, str(response.status_code)))
+    DB_SECONDS.observe(labels, stats.db_seconds)
+    DB_STATEMENTS.observe(labels, stats.statements)
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries", '
+        f"app;dur={elapsed * 1000:.1f}",
+    )
+    return response
+
+
+def reset_request(_exc=None) -> None:
+    _current.set(None)
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def install(app: Flask) -> None:
+    """Register the hooks and ``/metrics`` when ``settings.metrics_enabled``."""
+    if not settings.metrics_enabled:
+        return
+    _listen()
+    app.before_request(start_request)
+    app.after_request(finish_request)
+    app.teardown_request(reset_request)
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
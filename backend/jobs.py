@@ -0,0 +1,313 @@
+"""Durable background jobs stored in the ``jobs`` table.
+
+The web process only enqueues: ``enqueue`` inserts a ``QUEUED`` row and the
+request returns ``202``. Jobs are executed by ``python -m backend.worker``,
+which claims one row at a time with a conditional ``UPDATE`` (so several
+worker processes can share the table without a broker) and calls the
+handler registered for its ``kind``.
+
+A handler receives a ``JobContext`` and the job's payload as keyword
+arguments and returns a JSON-serialisable result. It reports progress with
+``context.progress(done, total)``, which also raises ``JobCancelled`` once
+cancellation was requested; cancellation is therefore cooperative and takes
+effect at the next progress report. Raising ``JobFailed`` fails the job at
+once; any other exception is retried after an exponential backoff until
+``max_attempts`` is reached. Handlers must be safe to run again, since a
+retry repeats the whole handler.
+
+While a job runs its worker keeps refreshing ``locked_at``. A ``RUNNING``
+job whose lease is older than ``JOB_LEASE_SECONDS`` belonged to a worker
+that died; it is requeued (counting as an attempt) by the next claim.
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from sqlalchemy import select, update
+
+from .config import settings
+from .database import session_scope
+from .models import Job
+
+log = logging.getLogger(__name__)
+
+HANDLERS: Dict[str, Callable] = {}
+# Progress is written at most this often; the final report always is.
+PROGRESS_INTERVAL_SECONDS = 0.5
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job was cancelled."""
+
+
+class JobFailed(Exception):
+    """Raise from a handler to fail the job without retrying it."""
+
+
+def handler(kind: str) -> Callable:
+    """Register the decorated function as the handler of ``kind`` jobs."""
+
+    def register(func: Callable) -> Callable:
+        HANDLERS[kind] = func
+        return func
+
+    return register
+
+
+@dataclass(slots=True)
+class JobContext:
+    """Handed to a handler for progress reports and cancellation checks."""
+
+    job_id: int
+    _reported_at: float = field(default=0.0)
+
+    def progress(self, done: int, total: int) -> None:
+        now = time.monotonic()
+        if done < total and now - self._reported_at < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._reported_at = now
+        with session_scope() as session:
+            session.execute(
+                update(Job)
+                .where(Job.id == self.job_id)
+                .values(progress_done=done, progress_total=total)
+            )
+            cancelled = session.scalar(select(Job.cancel_requested).where(Job.id == self.job_id))
+        if cancelled:
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+
+def enqueue(kind: str, payload: Dict, max_attempts: int | None = None) -> Dict:
+    """Queue a job and return it; ``kind`` must have a registered handler."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    try:
+        inspect.signature(HANDLERS[kind]).bind(None, **payload)
+    except TypeError as exc:
+        raise ValueError(f"Invalid payload for '{kind}': {exc}") from None
+    with session_scope() as session:
+        job = Job(
+            kind=kind,
+            payload=json.dumps(payload),
+            max_attempts=max_attempts or settings.job_max_attempts,
+        )
+        session.add(job)
+        session.flush()
+        return job.to_dict()
+
+
+def cancel(job_id: int) -> Dict | None:
+    """Cancel a queued job now, or ask a running one to stop.
+
+    Returns the job, or ``None`` if it does not exist. Finished jobs are
+    returned unchanged.
+    """
+    with session_scope() as session:
+        session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "QUEUED")
+            .values(status="CANCELLED", cancel_requested=True)
+        )
+        session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "RUNNING")
+            .values(cancel_requested=True)
+        )
+        job = session.get(Job, job_id)
+        return job.to_dict() if job else None
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number ``attempts``: doubling, capped, with jitter."""
+    delay = settings.job_backoff_seconds * 2 ** (attempts - 1)
+    return min(delay, settings.job_backoff_max_seconds) * random.uniform(0.8, 1.2)
+
+
+def _requeue_expired(session, now: datetime) -> None:
+    expired = now - timedelta(seconds=settings.job_lease_seconds)
+    running = (Job.status == "RUNNING", Job.locked_at < expired)
+    lost = {"locked_by": None, "locked_at": None, "error": "Worker lease expired"}
+    session.execute(
+        update(Job)
+        .where(*running, Job.cancel_requested.is_(True))
+        .values(status="CANCELLED", **lost)
+    )
+    session.execute(
+        update(Job)
+        .where(*running, Job.attempts >= Job.max_attempts)
+        .values(status="FAILED", **lost)
+    )
+    session.execute(update(Job).where(*running).values(status="QUEUED", run_after=now, **lost))
+
+
+def claim(worker_id: str) -> int | None:
+    """Take the next due job for ``worker_id``; ``None`` when none is due."""
+    now = datetime.utcnow()
+    with session_scope() as session:
+        _requeue_expired(session, now)
+        due = session.scalars(
+            select(Job.id)
+            .where(Job.status == "QUEUED", Job.run_after <= now)
+            .order_by(Job.run_after, Job.id)
+            .limit(10)
+        ).all()
+        for job_id in due:
+            # Another worker may have claimed it since the SELECT.
+            claimed = session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "QUEUED")
+                .values(
+                    status="RUNNING",
+                    locked_by=worker_id,
+                    locked_at=now,
+                    attempts=Job.attempts + 1,
+                )
+            ).rowcount
+            if claimed:
+                return job_id
+    return None
+
+
+def heartbeat(worker_id: str, job_ids: List[int]) -> None:
+    """Extend the lease of the jobs ``worker_id`` is running."""
+    if not job_ids:
+        return
+    with session_scope() as session:
+        session.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids), Job.locked_by == worker_id, Job.status == "RUNNING")
+            .values(locked_at=datetime.utcnow())
+        )
+
+
+def _finish(job_id: int, worker_id: str, **values) -> None:
+    # Only the lease holder may finish a job; a requeued one belongs to another.
+    with session_scope() as session:
+        session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == "RUNNING")
+            .values(locked_by=None, locked_at=None, **values)
+        )
+
+
+def run(job_id: int, worker_id: str) -> None:
+    """Execute a claimed job and record its outcome."""
+    with session_scope() as session:
+        job = session.get(Job, job_id)
+        kind, payload, attempts, max_attempts = (
+            job.kind,
+            json.loads(job.payload),
+            job.attempts,
+            job.max_attempts,
+        )
+
+    try:
+        result = HANDLERS[kind](JobContext(job_id), **payload)
+    except JobCancelled:
+        _finish(job_id, worker_id, status="CANCELLED")
+    except Exception as exc:  # pylint: disable=broad-except
+        log.exception("Job %s (%s) attempt %s failed", job_id, kind, attempts)
+        if isinstance(exc, JobFailed) or attempts >= max_attempts:
+            _finish(job_id, worker_id, status="FAILED", error=str(exc))
+        else:
+            retry_at = datetime.utcnow() + timedelta(seconds=backoff_seconds(attempts))
+            _finish(job_id, worker_id, status="QUEUED", run_after=retry_at, error=str(exc))
+    else:
+        _finish(job_id, worker_id, status="COMPLETED", result=json.dumps(result), error=None)
+
+
+@handler("payroll_run")
+def _payroll_run(context: JobContext, period_id: int, **options) -> Dict:
+    """``POST /api/payroll-runs`` in the background; reruns skip paid employees."""
+    # pylint: disable=import-outside-toplevel
+    from .models import PayrollPeriod
+    from .payroll_runs import execute_payroll_run, parse_entries
+    from .tax import load_schedule
+
+    # Bad input fails the same way on every attempt, so it is not retried.
+    tax_rate, tax_schedule = options.get("tax_rate"), options.get("tax_schedule")
+    if not tax_schedule:
+        try:
+            tax_rate = float(tax_rate)
+        except (TypeError, ValueError):
+            raise JobFailed("payroll_run needs a tax_rate or tax_schedule") from None
+        if not 0 <= tax_rate <= 1:
+            raise JobFailed("Tax rate must be between 0 and 1")
+    with session_scope() as session:
+        period = session.execute(
+            select(PayrollPeriod.status, PayrollPeriod.end_date).where(
+                PayrollPeriod.id == period_id
+            )
+        ).first()
+        if period is None or period.status != "OPEN":
+            status = period.status if period is not None else "missing"
+            raise JobFailed(f"Payroll period {period_id} is {status}")
+        if tax_schedule and load_schedule(session, tax_schedule, period.end_date) is None:
+            raise JobFailed(f"No tax schedule '{tax_schedule}' in force")
+    entries, errors = parse_entries(options.get("entries", []))
+    try:
+        summary = execute_payroll_run(
+            period_id,
+            entries,
+            tax_rate=None if tax_schedule else tax_rate,
+            default_hours=options.get("default_hours"),
+            tax_schedule=tax_schedule,
+            on_progress=context.progress,
+        )
+    except ValueError as exc:
+        raise JobFailed(str(exc)) from exc
+    summary["errors"] = errors + summary["errors"]
+    return summary
+
+
+@handler("archive_period")
+def _archive_period(context: JobContext, period_id: int) -> Dict:
+    """Move a paid period's records into its archive file.
+
+    ``ArchiveError`` is retried: it is also raised when records changed while
+    the file was written.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .archive import ArchiveUnavailable, archive_period
+
+    try:
+        archived = archive_period(period_id)
+    except ArchiveUnavailable as exc:
+        raise JobFailed(str(exc)) from exc
+    context.progress(1, 1)
+    return archived
+
+
+@handler("render_payslips")
+def _render_payslips(context: JobContext, batch_id: int) -> Dict:
+    """Render a payslip batch; a retry renders it from the start again."""
+    # pylint: disable=import-outside-toplevel
+    from .models import PayslipBatch
+    from .payslips import render_payslips
+
+    with session_scope() as session:
+        if session.get(PayslipBatch, batch_id) is None:
+            raise JobFailed(f"Payslip batch {batch_id} not found")
+    return render_payslips(batch_id, on_progress=context.progress)
+
+
+@handler("reconcile_counters")
+def _reconcile_counters(context: JobContext, fix: bool = False) -> Dict:
+    """Check the dashboard counters for drift and rebuild them when ``fix``."""
+    # pylint: disable=import-outside-toplevel
+    from .counters import find_drift, rebuild
+
+    with session_scope() as session:
+        problems = find_drift(session.connection())
+        if problems and fix:
+            rebuild(session.connection())
+    context.progress(1, 1)
+    return {"problems": problems, "rebuilt": bool(problems and fix)}
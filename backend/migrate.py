@@ -0,0 +1,26 @@
+"""Apply pending schema migrations.
+
+Usage::
+
+    python -m backend.migrate           # bring the database up to date
+    python -m backend.migrate --check   # exit 1 if migrations are pending
+"""
+
+import argparse
+import sys
+
+from backend.database import engine
+from backend.migrations import SCHEMA_VERSION, current_version, migrate
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--check", action="store_true", help="only report pending migrations")
+    args = parser.parse_args()
+
+    version = current_version(engine)
+    if args.check:
+        print(f"Schema version {version}, code expects {SCHEMA_VERSION}.")
+        sys.exit(0 if version >= SCHEMA_VERSION else 1)
+    for description in migrate(engine):
+        print(f"Applied migration {description}")
+    print(f"Schema is at version {SCHEMA_VERSION}.")
@@ -0,0 +1,403 @@
+"""Numbered schema migrations, applied by ``python -m backend.migrate``.
+
+``schema_version`` holds one row with the number of the last migration
+applied. Serving processes only read that row (``check_schema``) instead of
+running ``create_all``, which inspects every table, on each worker start.
+DDL runs from the ``migrate`` command, or at startup when ``AUTO_MIGRATE``
+is set and the schema is behind.
+
+Each entry of ``MIGRATIONS`` is ``(number, description, step)`` where
+``step`` takes the engine. Append new steps with the next number and never
+change one that has shipped. Steps create the frozen tables of
+``backend.schema_history`` and backfill data with their own statements over
+those tables, never through the models or helpers of other modules, so they
+keep doing the same thing as the rest of the code moves on. Steps should be
+safe to re-run (``checkfirst``) because databases created from
+``schema.sql`` already contain every table of the current schema.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import column, delete, func, inspect, insert, select, table, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from . import schema_history as history
+from .models import SchemaVersion
+
+SCHEMA_ROW_ID = 1
+
+_MONEY = {
+    "gross_cents": "gross_pay",
+    "tax_cents": "tax_amount",
+    "deduction_cents": "other_deductions",
+    "net_cents": "net_pay",
+}
+_YTD_MONEY = ("gross_cents", "tax_cents", "net_cents")
+_KEY_BATCH = 500
+
+
+class SchemaOutdated(RuntimeError):
+    """Raised at startup when the database needs ``python -m backend.migrate``."""
+
+
+def _cents(value) -> int:
+    return int((Decimal(str(value or 0)) * 100).to_integral_value(ROUND_HALF_EVEN))
+
+
+def _money_sums() -> List:
+    records = history.payroll_records
+    return [func.coalesce(func.sum(records.c[name]), 0) for name in _MONEY.values()]
+
+
+def _archived_employee_totals(path: str) -> List[Dict]:
+    """Record count and cents per employee of a ``backend.archive`` file."""
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    with pa.memory_map(path, "r") as source:
+        archived = pa.ipc.open_file(source).read_all()
+    grouped = archived.group_by("employee_id").aggregate(
+        [("id", "count"), *((name, "sum") for name in _MONEY)]
+    )
+    return [
+        {
+            "employee_id": row["employee_id"],
+            "record_count": row["id_count"],
+            **{name: row[f"{name}_sum"] for name in _MONEY},
+        }
+        for row in grouped.to_pylist()
+    ]
+
+
+def _baseline_ytd(connection: Connection) -> None:
+    """Fill ``ytd_accumulators`` from live and archived records."""
+    records, periods = history.payroll_records, history.payroll_periods
+    archives = history.period_archives
+    tax_year = func.extract("year", periods.c.end_date)
+    rows = connection.execute(
+        select(
+            records.c.employee_id,
+            tax_year,
+            func.count(records.c.id),
+            *(func.sum(records.c[_MONEY[name]]) for name in _YTD_MONEY),
+        )
+        .join(periods, periods.c.id == records.c.payroll_period_id)
+        .group_by(records.c.employee_id, tax_year)
+    )
+    totals: Dict[Tuple[int, int], Dict[str, int]] = {
+        (employee_id, int(year)): {
+            "record_count": count,
+            **{name: _cents(value) for name, value in zip(_YTD_MONEY, money)},
+        }
+        for employee_id, year, count, *money in rows
+    }
+    archived = connection.execute(
+        select(archives.c.path, periods.c.end_date)
+        .join(periods, periods.c.id == archives.c.payroll_period_id)
+        .where(archives.c.record_count > 0)
+    ).all()
+    for path, end_date in archived:
+        for row in _archived_employee_totals(path):
+            entry = totals.setdefault(
+                (row["employee_id"], end_date.year),
+                dict.fromkeys(("record_count", *_YTD_MONEY), 0),
+            )
+            for name in entry:
+                entry[name] += row[name]
+
+    connection.execute(delete(history.ytd_accumulators))
+    rows = [
+        {"employee_id": employee_id, "tax_year": year, **values}
+        for (employee_id, year), values in totals.items()
+    ]
+    for start in range(0, len(rows), 10_000):
+        connection.execute(insert(history.ytd_accumulators), rows[start : start + 10_000])
+
+
+def _baseline_counters(connection: Connection) -> None:
+    """Fill the summary, department and period counters from the source tables."""
+    records, periods = history.payroll_records, history.payroll_periods
+    departments, employees = history.departments, history.employees
+    archives = history.period_archives
+
+    count, *money = connection.execute(select(func.count(records.c.id), *_money_sums())).one()
+    summary = {
+        "id": 1,
+        "total_employees": connection.scalar(select(func.count(employees.c.id))),
+        "total_departments": connection.scalar(select(func.count(departments.c.id))),
+        "total_periods": connection.scalar(select(func.count(periods.c.id))),
+        "total_records": count,
+        **{name: _cents(value) for name, value in zip(_MONEY, money)},
+    }
+    department_counts = connection.execute(
+        select(departments.c.id, func.count(employees.c.id))
+        .outerjoin(employees, employees.c.department_id == departments.c.id)
+        .group_by(departments.c.id)
+    ).all()
+    period_rows = connection.execute(
+        select(periods.c.id, func.count(records.c.id), *_money_sums())
+        .outerjoin(records, records.c.payroll_period_id == periods.c.id)
+        .group_by(periods.c.id)
+    )
+    period_totals = {
+        period_id: {
+            "payroll_period_id": period_id,
+            "record_count": record_count,
+            **{name: _cents(value) for name, value in zip(_MONEY, money)},
+        }
+        for period_id, record_count, *money in period_rows
+    }
+    # Archived records left payroll_records but still count.
+    archived = connection.execute(
+        select(
+            archives.c.payroll_period_id,
+            archives.c.record_count,
+            *(archives.c[name] for name in _MONEY),
+        )
+    )
+    for period_id, record_count, *money in archived:
+        summary["total_records"] += record_count
+        period_totals[period_id]["record_count"] += record_count
+        for name, cents in zip(_MONEY, money):
+            summary[name] += cents
+            period_totals[period_id][name] += cents
+
+    connection.execute(delete(history.summary_counters))
+    connection.execute(delete(history.department_totals))
+    connection.execute(delete(history.period_totals))
+    connection.execute(insert(history.summary_counters).values(**summary))
+    if department_counts:
+        connection.execute(
+            insert(history.department_totals),
+            [{"department_id": d, "employee_count": n} for d, n in department_counts],
+        )
+    if period_totals:
+        connection.execute(insert(history.period_totals), list(period_totals.values()))
+    _baseline_ytd(connection)
+
+
+def _baseline(bind: Engine) -> None:
+    """Every table, index, search index and counter row of schema version 1."""
+    history.metadata.create_all(bind=bind, tables=history.BASELINE_TABLES)
+    # create_all skips existing tables, so add indexes declared after the fact.
+    for baseline_table in history.BASELINE_TABLES:
+        for index in baseline_table.indexes:
+            index.create(bind=bind, checkfirst=True)
+    if bind.dialect.name == "sqlite" and not inspect(bind).has_table(
+        history.SQLITE_SEARCH_TABLE
+    ):
+        with bind.begin() as connection:
+            for statement in history.SQLITE_SEARCH_DDL:
+                connection.execute(text(statement))
+
+    # Databases that predate the counters get them built from their rows.
+    with bind.begin() as connection:
+        if connection.scalar(select(history.summary_counters.c.id).limit(1)) is None:
+            _baseline_counters(connection)
+        elif (
+            connection.scalar(select(history.ytd_accumulators.c.employee_id).limit(1)) is None
+            and connection.scalar(select(history.payroll_records.c.id).limit(1)) is not None
+        ):
+            _baseline_ytd(connection)
+        versioned = set(connection.scalars(select(history.table_versions.c.table_name)))
+        missing = [name for name in history.VERSIONED_TABLES if name not in versioned]
+        if missing:
+            now = datetime.utcnow()
+            connection.execute(
+                insert(history.table_versions),
+                [{"table_name": name, "version": 0, "updated_at": now} for name in missing],
+            )
+
+
+def _upsert_batches(bind: Engine) -> None:
+    """Idempotency records of batch record upserts (``backend.record_upserts``)."""
+    history.upsert_batches.create(bind=bind, checkfirst=True)
+
+
+def _jobs(bind: Engine) -> None:
+    """Background job queue (``backend.jobs``)."""
+    history.jobs.create(bind=bind, checkfirst=True)
+
+
+def _archived_rollups(connection: Connection, period_id: int, path: str) -> List[Dict]:
+    """Rollup rows of an archived period, by each employee's current department."""
+    employees = history.employees
+    totals = _archived_employee_totals(path)
+    employee_ids = [row["employee_id"] for row in totals]
+    departments = {}
+    for start in range(0, len(employee_ids), _KEY_BATCH):
+        departments.update(
+            connection.execute(
+                select(employees.c.id, employees.c.department_id).where(
+                    employees.c.id.in_(employee_ids[start : start + _KEY_BATCH])
+                )
+            ).all()
+        )
+    grouped: Dict[int, Dict[str, int]] = defaultdict(
+        lambda: dict.fromkeys(("record_count", *_MONEY), 0)
+    )
+    for row in totals:
+        if row["employee_id"] in departments:  # else deleted after archiving
+            entry = grouped[departments[row["employee_id"]]]
+            for name in entry:
+                entry[name] += row[name]
+    return [
+        {"payroll_period_id": period_id, "department_id": department_id, **entry}
+        for department_id, entry in grouped.items()
+    ]
+
+
+def _period_department_rollups(bind: Engine) -> None:
+    """Department totals of closed periods (``backend.analytics``), backfilled."""
+    rollups, records = history.period_department_rollups, history.payroll_records
+    periods, employees = history.payroll_periods, history.employees
+    archives = history.period_archives
+    rollups.create(bind=bind, checkfirst=True)
+    with bind.begin() as connection:
+        closed = list(
+            connection.scalars(
+                select(periods.c.id).where(periods.c.status.in_(("PROCESSED", "PAID")))
+            )
+        )
+        for start in range(0, len(closed), _KEY_BATCH):
+            batch = closed[start : start + _KEY_BATCH]
+            connection.execute(delete(rollups).where(rollups.c.payroll_period_id.in_(batch)))
+            archived = dict(
+                connection.execute(
+                    select(archives.c.payroll_period_id, archives.c.path).where(
+                        archives.c.payroll_period_id.in_(batch), archives.c.record_count > 0
+                    )
+                ).all()
+            )
+            live = connection.execute(
+                select(
+                    records.c.payroll_period_id,
+                    employees.c.department_id,
+                    func.count(records.c.id),
+                    *_money_sums(),
+                )
+                .join(employees, employees.c.id == records.c.employee_id)
+                .where(
+                    records.c.payroll_period_id.in_([p for p in batch if p not in archived])
+                )
+                .group_by(records.c.payroll_period_id, employees.c.department_id)
+            )
+            rows = [
+                {
+                    "payroll_period_id": period_id,
+                    "department_id": department_id,
+                    "record_count": count,
+                    **{name: _cents(value) for name, value in zip(_MONEY, money)},
+                }
+                for period_id, department_id, count, *money in live
+            ]
+            for period_id, path in archived.items():
+                rows.extend(_archived_rollups(connection, period_id, path))
+            if rows:
+                connection.execute(insert(rollups), rows)
+
+
+def _add_columns(bind: Engine, table_name: str, columns) -> None:
+    """Add the nullable ``columns`` that ``table_name`` is missing."""
+    existing = {column["name"] for column in inspect(bind).get_columns(table_name)}
+    with bind.begin() as connection:
+        for added in columns:
+            if added.name not in existing:
+                column_type = added.type.compile(dialect=bind.dialect)
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {table_name} ADD COLUMN {added.name} {column_type}"
+                )
+
+
+def _record_pay_inputs(bind: Engine) -> None:
+    """Rate and tax basis columns of payroll records (``backend.recompute``)."""
+    _add_columns(bind, "payroll_records", history.record_pay_inputs)
+
+
+def _unsynced_updated_at_indexes(bind: Engine) -> None:
+    """Drop ``updated_at`` indexes that only delta-synced tables need."""
+    for synced in (
+        history.payroll_runs,
+        history.upsert_batches,
+        history.payslip_batches,
+        history.jobs,
+        history.tax_schedules,
+    ):
+        for index in synced.indexes:
+            if index.name == f"ix_{synced.name}_updated_at":
+                index.drop(bind=bind, checkfirst=True)
+
+
+def _payslip_batch_jobs(bind: Engine) -> None:
+    """Job of each payslip batch; fail batches whose rendering thread is gone."""
+    _add_columns(bind, "payslip_batches", history.payslip_batch_job)
+    batches = table("payslip_batches", column("status"), column("error"), column("job_id"))
+    with bind.begin() as connection:
+        connection.execute(
+            update(batches)
+            .where(batches.c.status == "RUNNING", batches.c.job_id.is_(None))
+            .values(status="FAILED", error="Interrupted before payslips ran as jobs")
+        )
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Engine], None]]] = [
+    (1, "baseline schema", _baseline),
+    (2, "upsert_batches", _upsert_batches),
+    (3, "jobs", _jobs),
+    (4, "period_department_rollups", _period_department_rollups),
+    (5, "payroll record pay inputs", _record_pay_inputs),
+    (6, "drop unsynced updated_at indexes", _unsynced_updated_at_indexes),
+    (7, "payslip batch jobs", _payslip_batch_jobs),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(bind: Engine) -> int:
+    """The applied schema version, 0 for a database that was never migrated."""
+    try:
+        with bind.connect() as connection:
+            version = connection.scalar(
+                select(SchemaVersion.version).where(SchemaVersion.id == SCHEMA_ROW_ID)
+            )
+    except (OperationalError, ProgrammingError):
+        return 0  # no schema_version table yet
+    return version or 0
+
+
+def _record(bind: Engine, number: int) -> None:
+    with bind.begin() as connection:
+        updated = connection.execute(
+            update(SchemaVersion)
+            .where(SchemaVersion.id == SCHEMA_ROW_ID)
+            .values(version=number)
+        ).rowcount
+        if not updated:
+            connection.execute(insert(SchemaVersion).values(id=SCHEMA_ROW_ID, version=number))
+
+
+def migrate(bind: Engine) -> List[str]:
+    """Apply every pending migration; return the descriptions applied."""
+    start = current_version(bind)
+    applied = []
+    for number, description, step in MIGRATIONS:
+        if number <= start:
+            continue
+        step(bind)
+        _record(bind, number)
+        applied.append(f"{number}: {description}")
+    return applied
+
+
+def check_schema(bind: Engine) -> None:
+    """Fail fast with one query when the schema is older than the code."""
+    version = current_version(bind)
+    if version < SCHEMA_VERSION:
+        raise SchemaOutdated(
+            f"Database schema is at version {version}, the code needs {SCHEMA_VERSION}; "
+            "run `python -m backend.migrate`"
+        )
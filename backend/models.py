@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime
 from typing import Dict
 
 from sqlalchemy import (
+    BigInteger,
+    Boolean,
     CheckConstraint,
     Column,
     Date,
@@ -11,18 +14,25 @@ from sqlalchemy import (
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
     UniqueConstraint,
+    func,
+    select,
 )
-from sqlalchemy.orm import Mapped, relationship
+from sqlalchemy.orm import Mapped, object_session, relationship
 
 from .database import Base
 
 EMPLOYMENT_TYPES = ("FULL_TIME", "PART_TIME", "CONTRACT")
 PAYROLL_STATUSES = ("OPEN", "PROCESSED", "PAID")
+RUN_STATUSES = ("RUNNING", "COMPLETED", "FAILED")
+PAYSLIP_FORMATS = ("html", "pdf", "both")
+PAYSLIP_OUTPUTS = ("zip", "directory")
+JOB_STATUSES = ("QUEUED", "RUNNING", "COMPLETED", "FAILED", "CANCELLED")
 
 
 class TimestampMixin:
@@ -46,12 +56,24 @@ class Department(Base, TimestampMixin):
 
     employees = relationship("Employee", back_populates="department", cascade="all")
 
+    # Delta sync (``backend.changes``) reads rows by ``updated_at``.
+    __table_args__ = (Index("ix_departments_updated_at", "updated_at"),)
+
+    def _employee_count(self) -> int:
+        """Count employees with one query instead of loading the collection."""
+        session = object_session(self)
+        if session is None or self.id is None:
+            return len(self.employees)
+        return session.scalar(
+            select(func.count(Employee.id)).where(Employee.department_id == self.id)
+        )
+
     def to_dict(self) -> Dict:
         return {
             "id": self.id,
             "name": self.name,
             "description": self.description,
-            "employee_count": len(self.employees),
+            "employee_count": self._employee_count(),
         }
 
 
@@ -72,6 +94,20 @@ class Employee(Base, TimestampMixin):
         "PayrollRecord", back_populates="employee", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_employees_updated_at", "updated_at"),
+        Index("ix_employees_last_name_id", "last_name", "id"),
+        Index("ix_employees_department_last_name", "department_id", "last_name", "id"),
+        # SQLite searches through the employees_fts table (see backend.search).
+        Index(
+            "ft_employees_search",
+            "first_name",
+            "last_name",
+            "email",
+            mysql_prefix="FULLTEXT",
+        ).ddl_if(dialect="mysql"),
+    )
+
     @property
     def full_name(self) -> str:
         return f"{self.first_name} {self.last_name}"
@@ -106,6 +142,8 @@ class PayrollPeriod(Base, TimestampMixin):
 
     __table_args__ = (
         CheckConstraint("end_date >= start_date", name="ck_period_dates"),
+        Index("ix_payroll_periods_updated_at", "updated_at"),
+        Index("ix_payroll_periods_start_date_id", "start_date", "id"),
     )
 
     def to_dict(self) -> Dict:
@@ -132,6 +170,14 @@ class PayrollRecord(Base, TimestampMixin):
     other_deductions: Mapped[float] = Column(Numeric(12, 2), default=0)
     net_pay: Mapped[float] = Column(Numeric(12, 2), nullable=False)
     notes: Mapped[str | None] = Column(Text)
+    # Pay inputs, kept so records of open periods can be recomputed when the
+    # employee's base rate changes (``backend.recompute``): an explicit hourly
+    # rate (NULL means ``base_rate`` applied), and the flat tax rate or the
+    # bracket schedule tax was withheld by. Records written before schema
+    # version 5 have neither and are never recomputed.
+    hourly_rate: Mapped[float | None] = Column(Numeric(10, 2))
+    tax_rate: Mapped[float | None] = Column(Numeric(7, 6))
+    tax_schedule: Mapped[str | None] = Column(String(100))
 
     employee = relationship("Employee", back_populates="payroll_records")
     payroll_period = relationship("PayrollPeriod", back_populates="records")
@@ -142,6 +188,10 @@ class PayrollRecord(Base, TimestampMixin):
             "payroll_period_id",
             name="uq_employee_period",
         ),
+        Index("ix_payroll_records_updated_at", "updated_at"),
+        Index("ix_payroll_records_created_id", "created_at", "id"),
+        Index("ix_payroll_records_period_created", "payroll_period_id", "created_at", "id"),
+        Index("ix_payroll_records_employee_created", "employee_id", "created_at", "id"),
     )
 
     def to_dict(self) -> Dict:
@@ -162,3 +212,376 @@ class PayrollRecord(Base, TimestampMixin):
             "created_at": self.created_at.isoformat(),
         }
 
+
+class PayrollRun(Base, TimestampMixin):
+    __tablename__ = "payroll_runs"
+
+    id: Mapped[int] = Column(Integer, primary_key=True)
+    payroll_period_id: Mapped[int] = Column(
+        ForeignKey("payroll_periods.id"), nullable=False
+    )
+    status: Mapped[str] = Column(Enum(*RUN_STATUSES), default="RUNNING", nullable=False)
+    records_created: Mapped[int] = Column(Integer, default=0, nullable=False)
+    records_skipped: Mapped[int] = Column(Integer, default=0, nullable=False)
+    total_gross: Mapped[float] = Column(Numeric(14, 2), default=0, nullable=False)
+    total_tax: Mapped[float] = Column(Numeric(14, 2), default=0, nullable=False)
+    total_deductions: Mapped[float] = Column(Numeric(14, 2), default=0, nullable=False)
+    total_net: Mapped[float] = Column(Numeric(14, 2), default=0, nullable=False)
+    error: Mapped[str | None] = Column(Text)
+
+    payroll_period = relationship("PayrollPeriod")
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "payroll_period_id": self.payroll_period_id,
+            "status": self.status,
+            "records_created": self.records_created,
+            "records_skipped": self.records_skipped,
+            "total_gross": float(self.total_gross or 0),
+            "total_tax": float(self.total_tax or 0),
+            "total_deductions": float(self.total_deductions or 0),
+            "total_net": float(self.total_net or 0),
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+class UpsertBatch(Base, TimestampMixin):
+    """One submitted batch of ``backend.record_upserts``, keyed for safe replays."""
+
+    __tablename__ = "upsert_batches"
+
+    id: Mapped[int] = Column(Integer, primary_key=True)
+    idempotency_key: Mapped[str | None] = Column(String(128), unique=True)
+    request_hash: Mapped[str] = Column(String(64), nullable=False)
+    payroll_period_id: Mapped[int] = Column(
+        ForeignKey("payroll_periods.id"), nullable=False
+    )
+    status: Mapped[str] = Column(Enum(*RUN_STATUSES), default="RUNNING", nullable=False)
+    records_inserted: Mapped[int] = Column(Integer, default=0, nullable=False)
+    records_updated: Mapped[int] = Column(Integer, default=0, nullable=False)
+    records_unchanged: Mapped[int] = Column(Integer, default=0, nullable=False)
+    errors: Mapped[str | None] = Column(Text)
+    error: Mapped[str | None] = Column(Text)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "idempotency_key": self.idempotency_key,
+            "payroll_period_id": self.payroll_period_id,
+            "status": self.status,
+            "records_inserted": self.records_inserted,
+            "records_updated": self.records_updated,
+            "records_unchanged": self.records_unchanged,
+            "errors": json.loads(self.errors) if self.errors else [],
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+class Job(Base, TimestampMixin):
+    """A unit of background work queued for ``python -m backend.worker``.
+
+    ``locked_by``/``locked_at`` form a lease: the worker running the job
+    refreshes ``locked_at``, and a job whose lease expired is requeued.
+    """
+
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = Column(Integer, primary_key=True)
+    kind: Mapped[str] = Column(String(50), nullable=False)
+    payload: Mapped[str] = Column(Text, nullable=False)
+    status: Mapped[str] = Column(Enum(*JOB_STATUSES), default="QUEUED", nullable=False)
+    attempts: Mapped[int] = Column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = Column(Integer, default=3, nullable=False)
+    run_after: Mapped[datetime] = Column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+    locked_by: Mapped[str | None] = Column(String(64))
+    locked_at: Mapped[datetime | None] = Column(DateTime(timezone=True))
+    cancel_requested: Mapped[bool] = Column(Boolean, default=False, nullable=False)
+    progress_done: Mapped[int] = Column(Integer, default=0, nullable=False)
+    progress_total: Mapped[int] = Column(Integer, default=0, nullable=False)
+    result: Mapped[str | None] = Column(Text)
+    error: Mapped[str | None] = Column(Text)
+
+    __table_args__ = (Index("ix_jobs_status_run_after", "status", "run_after", "id"),)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "payload": json.loads(self.payload),
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "run_after": self.run_after.isoformat(),
+            "cancel_requested": self.cancel_requested,
+            "progress": {
+                "done": self.progress_done,
+                "total": self.progress_total,
+                "fraction": round(self.progress_done / self.progress_total, 4)
+                if self.progress_total
+                else 0.0,
+            },
+            "result": json.loads(self.result) if self.result else None,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
+class PayslipBatch(Base, TimestampMixin):
+    """Progress of a period's payslip rendering, updated by ``backend.payslips``."""
+
+    __tablename__ = "payslip_batches"
+
+    id: Mapped[int] = Column(Integer, primary_key=True)
+    payroll_period_id: Mapped[int] = Column(
+        ForeignKey("payroll_periods.id"), nullable=False
+    )
+    status: Mapped[str] = Column(Enum(*RUN_STATUSES), default="RUNNING", nullable=False)
+    format: Mapped[str] = Column(Enum(*PAYSLIP_FORMATS), default="both", nullable=False)
+    output: Mapped[str] = Column(Enum(*PAYSLIP_OUTPUTS), default="zip", nullable=False)
+    total: Mapped[int] = Column(Integer, default=0, nullable=False)
+    rendered: Mapped[int] = Column(Integer, default=0, nullable=False)
+    path: Mapped[str | None] = Column(String(255))
+    error: Mapped[str | None] = Column(Text)
+    # The ``render_payslips`` job doing the work (``backend.jobs``).
+    job_id: Mapped[int | None] = Column(Integer)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "payroll_period_id": self.payroll_period_id,
+            "job_id": self.job_id,
+            "status": self.status,
+            "format": self.format,
+            "output": self.output,
+            "total": self.total,
+            "rendered": self.rendered,
+            "progress": round(self.rendered / self.total, 4) if self.total else 0.0,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
+class SummaryCounter(Base):
+    """Single-row dashboard totals kept current by ``backend.counters``."""
+
+    __tablename__ = "summary_counters"
+
+    id: Mapped[int] = Column(Integer, primary_key=True)
+    total_employees: Mapped[int] = Column(Integer, default=0, nullable=False)
+    total_departments: Mapped[int] = Column(Integer, default=0, nullable=False)
+    total_periods: Mapped[int] = Column(Integer, default=0, nullable=False)
+    total_records: Mapped[int] = Column(Integer, default=0, nullable=False)
+    gross_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    tax_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    deduction_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    net_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+
+
+class DepartmentTotal(Base):
+    """Per-department counters kept current by ``backend.counters``."""
+
+    __tablename__ = "department_totals"
+
+    department_id: Mapped[int] = Column(Integer, primary_key=True)
+    employee_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+
+
+class PeriodTotal(Base):
+    """Per-period payroll totals kept current by ``backend.counters``."""
+
+    __tablename__ = "period_totals"
+
+    payroll_period_id: Mapped[int] = Column(Integer, primary_key=True)
+    record_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+    gross_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    tax_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    deduction_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    net_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+
+    def to_dict(self) -> Dict:
+        return {
+            "payroll_period_id": self.payroll_period_id,
+            "record_count": self.record_count,
+            "gross_pay": self.gross_cents / 100,
+            "tax_amount": self.tax_cents / 100,
+            "other_deductions": self.deduction_cents / 100,
+            "net_pay": self.net_cents / 100,
+        }
+
+
+class PeriodDepartmentRollup(Base):
+    """Totals per department of a closed period, written by ``backend.analytics``."""
+
+    __tablename__ = "period_department_rollups"
+
+    payroll_period_id: Mapped[int] = Column(
+        ForeignKey("payroll_periods.id", ondelete="CASCADE"), primary_key=True
+    )
+    # No foreign key: the history outlives a deleted department.
+    department_id: Mapped[int] = Column(Integer, primary_key=True)
+    record_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+    gross_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    tax_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    deduction_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    net_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+
+
+class PeriodArchive(Base):
+    """Marks a paid period whose records were moved to a columnar archive file.
+
+    The totals mirror what the archived records contributed to the counters,
+    so ``backend.counters`` can reconcile without reading the file.
+    """
+
+    __tablename__ = "period_archives"
+
+    payroll_period_id: Mapped[int] = Column(
+        ForeignKey("payroll_periods.id"), primary_key=True
+    )
+    path: Mapped[str] = Column(String(255), nullable=False)
+    record_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+    gross_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    tax_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    deduction_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    net_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    min_created_at: Mapped[datetime | None] = Column(DateTime(timezone=True))
+    max_created_at: Mapped[datetime | None] = Column(DateTime(timezone=True))
+    archived_at: Mapped[datetime] = Column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+
+    def to_dict(self) -> Dict:
+        return {
+            "payroll_period_id": self.payroll_period_id,
+            "record_count": self.record_count,
+            "gross_pay": self.gross_cents / 100,
+            "tax_amount": self.tax_cents / 100,
+            "other_deductions": self.deduction_cents / 100,
+            "net_pay": self.net_cents / 100,
+            "archived_at": self.archived_at.isoformat(),
+        }
+
+
+class YtdAccumulator(Base):
+    """Per-employee, per-tax-year pay totals kept current by ``backend.counters``.
+
+    The tax year is the year of the period's ``end_date``.
+    """
+
+    __tablename__ = "ytd_accumulators"
+
+    employee_id: Mapped[int] = Column(Integer, primary_key=True)
+    tax_year: Mapped[int] = Column(Integer, primary_key=True)
+    record_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+    gross_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    tax_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    net_cents: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+
+    __table_args__ = (Index("ix_ytd_accumulators_year_employee", "tax_year", "employee_id"),)
+
+    def to_dict(self) -> Dict:
+        return {
+            "employee_id": self.employee_id,
+            "tax_year": self.tax_year,
+            "record_count": self.record_count,
+            "gross_pay": self.gross_cents / 100,
+            "tax_amount": self.tax_cents / 100,
+            "net_pay": self.net_cents / 100,
+        }
+
+
+class TaxSchedule(Base, TimestampMixin):
+    """One version of a named bracket schedule, in force from ``effective_from``.
+
+    Schedules are never edited; new rates are published as a new version.
+    """
+
+    __tablename__ = "tax_schedules"
+
+    id: Mapped[int] = Column(Integer, primary_key=True)
+    name: Mapped[str] = Column(String(100), nullable=False)
+    effective_from: Mapped[datetime] = Column(Date, nullable=False)
+
+    brackets = relationship(
+        "TaxBracket",
+        back_populates="schedule",
+        cascade="all, delete-orphan",
+        order_by="TaxBracket.lower_bound",
+    )
+
+    __table_args__ = (
+        UniqueConstraint("name", "effective_from", name="uq_tax_schedule_version"),
+    )
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "effective_from": self.effective_from.isoformat(),
+            "brackets": [bracket.to_dict() for bracket in self.brackets],
+        }
+
+
+class TaxBracket(Base):
+    """Annual income from ``lower_bound`` up to the next bracket is taxed at ``rate``."""
+
+    __tablename__ = "tax_brackets"
+
+    id: Mapped[int] = Column(Integer, primary_key=True)
+    schedule_id: Mapped[int] = Column(ForeignKey("tax_schedules.id"), nullable=False)
+    lower_bound: Mapped[float] = Column(Numeric(14, 2), nullable=False)
+    rate: Mapped[float] = Column(Numeric(7, 6), nullable=False)
+
+    schedule = relationship("TaxSchedule", back_populates="brackets")
+
+    __table_args__ = (
+        UniqueConstraint("schedule_id", "lower_bound", name="uq_tax_bracket_bound"),
+        CheckConstraint("rate >= 0 AND rate <= 1", name="ck_tax_bracket_rate"),
+    )
+
+    def to_dict(self) -> Dict:
+        return {"lower_bound": float(self.lower_bound), "rate": float(self.rate)}
+
+
+class SchemaVersion(Base):
+    """Single row holding the number of the last migration applied."""
+
+    __tablename__ = "schema_version"
+
+    id: Mapped[int] = Column(Integer, primary_key=True)
+    version: Mapped[int] = Column(Integer, nullable=False)
+    applied_at: Mapped[datetime] = Column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+
+
+class TableVersion(Base):
+    """Monotonic per-table write counter used for HTTP validators."""
+
+    __tablename__ = "table_versions"
+
+    table_name: Mapped[str] = Column(String(64), primary_key=True)
+    version: Mapped[int] = Column(BigInteger, default=0, nullable=False)
+    updated_at: Mapped[datetime] = Column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+
+
+class Tombstone(Base):
+    """Marker left behind by a hard delete so delta sync can report it."""
+
+    __tablename__ = "tombstones"
+
+    id: Mapped[int] = Column(Integer, primary_key=True)
+    table_name: Mapped[str] = Column(String(64), nullable=False)
+    row_id: Mapped[int] = Column(Integer, nullable=False)
+    deleted_at: Mapped[datetime] = Column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False, index=True
+    )
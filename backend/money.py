@@ -0,0 +1,19 @@
+"""Conversions between stored money values and integer cents.
+
+Kept apart from ``backend.pay_calc`` so modules that only convert amounts
+(counters, archives) do not import NumPy.
+"""
+
+from decimal import ROUND_HALF_EVEN, Decimal
+
+CENTS = 100
+
+
+def to_cents(value) -> int:
+    """Convert a stored money value (``Decimal``, float or int) to cents."""
+    return int((Decimal(str(value or 0)) * CENTS).to_integral_value(ROUND_HALF_EVEN))
+
+
+def cents_to_decimal(cents) -> Decimal:
+    """Convert an integer amount of cents to a two-place ``Decimal``."""
+    return Decimal(int(cents)).scaleb(-2)
@@ -0,0 +1,203 @@
+"""Opaque keyset cursors for the list endpoints.
+
+A cursor encodes the sort key of the last row on a page, so the next page is
+fetched with an indexed ``WHERE (a, b) > (:a, :b)`` seek instead of an
+``OFFSET`` scan: page N costs the same as page 1. Ranked search results have
+no stable key and carry an offset instead; clients treat both as opaque.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import ColumnElement, Select
+
+from .config import settings
+
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor this server did not produce."""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(value: Any, column: ColumnElement) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return value
+
+
+def encode_cursor(payload: Dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str | None) -> Dict | None:
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+    if not isinstance(payload, dict):
+        raise InvalidCursor("Invalid cursor")
+    return payload
+
+
+def page_limit(raw: str | None) -> int:
+    """Parse the ``limit`` query parameter, defaulting to ``settings.page_size``."""
+    if raw is None:
+        return settings.page_size
+    try:
+        limit = int(raw)
+    except ValueError as exc:
+        raise InvalidCursor("limit must be an integer") from exc
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def int_param(raw: str | None) -> int | None:
+    """Parse an integer filter parameter the way Flask's ``args.get(type=int)`` does.
+
+    A missing or malformed value yields ``None`` so the filter is ignored.
+    """
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        return None
+
+
+def cursor_keys(
+    cursor: str | None, keys: Sequence[Tuple[ColumnElement, bool]]
+) -> List | None:
+    """Decode the sort key values a keyset cursor carries, or ``None``."""
+    payload = decode_cursor(cursor)
+    if payload is None:
+        return None
+    values = payload.get("k")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursor("Invalid cursor")
+    try:
+        return [_decode_value(v, col) for v, (col, _) in zip(values, keys)]
+    except (TypeError, ValueError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+
+def keyset_cursor(values: Sequence[Any]) -> str:
+    """Encode sort key values as the cursor of the page that follows them."""
+    return encode_cursor({"k": [_encode_value(value) for value in values]})
+
+
+def keyset_statement(
+    stmt: Select,
+    keys: Sequence[Tuple[ColumnElement, bool]],
+    cursor: str | None,
+    limit: int,
+) -> Select:
+    """Apply the cursor seek, ordering and ``limit + 1`` to ``stmt``."""
+    values = cursor_keys(cursor, keys)
+    if values is not None:
+        stmt = stmt.where(_seek_predicate(keys, values))
+
+    stmt = stmt.order_by(*(col.desc() if desc else col.asc() for col, desc in keys))
+    return stmt.limit(limit + 1)
+
+
+def keyset_result(
+    rows: List, keys: Sequence[Tuple[ColumnElement, bool]], limit: int
+) -> Tuple[List, str | None]:
+    """Trim the extra row fetched by ``keyset_statement`` into a next cursor."""
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, keyset_cursor([getattr(rows[-1], col.key) for col, _ in keys])
+
+
+def keyset_page(
+    session,
+    stmt: Select,
+    keys: Sequence[Tuple[ColumnElement, bool]],
+    cursor: str | None,
+    limit: int,
+) -> Tuple[List, str | None]:
+    """Fetch one page of ``stmt`` ordered by ``keys``.
+
+    ``keys`` lists ``(column, descending)`` pairs ending with a unique column,
+    and the rows of ``stmt`` must expose those columns under the same names
+    (see ``backend.serializers``). Returns the rows and the next page cursor.
+    """
+    rows = session.execute(keyset_statement(stmt, keys, cursor, limit)).all()
+    return keyset_result(rows, keys, limit)
+
+
+async def keyset_page_async(
+    session,
+    stmt: Select,
+    keys: Sequence[Tuple[ColumnElement, bool]],
+    cursor: str | None,
+    limit: int,
+) -> Tuple[List, str | None]:
+    """``keyset_page`` for an ``AsyncSession``."""
+    result = await session.execute(keyset_statement(stmt, keys, cursor, limit))
+    return keyset_result(result.all(), keys, limit)
+
+
+def _offset(cursor: str | None) -> int:
+    payload = decode_cursor(cursor) or {}
+    offset = payload.get("o", 0)
+    if not isinstance(offset, int) or offset < 0:
+        raise InvalidCursor("Invalid cursor")
+    return offset
+
+
+def _offset_result(rows: List, offset: int, limit: int) -> Tuple[List, str | None]:
+    if len(rows) <= limit:
+        return rows, None
+    return rows[:limit], encode_cursor({"o": offset + limit})
+
+
+def offset_page(session, stmt: Select, cursor: str | None, limit: int) -> Tuple[List, str | None]:
+    """Fetch one page of a ranked statement that has no stable seek key."""
+    offset = _offset(cursor)
+    rows = session.execute(stmt.limit(limit + 1).offset(offset)).all()
+    return _offset_result(rows, offset, limit)
+
+
+async def offset_page_async(
+    session, stmt: Select, cursor: str | None, limit: int
+) -> Tuple[List, str | None]:
+    """``offset_page`` for an ``AsyncSession``."""
+    offset = _offset(cursor)
+    result = await session.execute(stmt.limit(limit + 1).offset(offset))
+    return _offset_result(result.all(), offset, limit)
+
+
+def _seek_predicate(keys: Sequence[Tuple[ColumnElement, bool]], values: List) -> ColumnElement:
+    """Expand ``(a, b, c) > (x, y, z)`` into portable AND/OR form."""
+    clauses = []
+    for index, (column, descending) in enumerate(keys):
+        equal_prefix = [keys[i][0] == values[i] for i in range(index)]
+        step = column < values[index] if descending else column > values[index]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+def page_response(
+    data: List[Dict] | Dict[str, List], limit: int, next_cursor: str | None, **included: List
+) -> Dict:
+    """The body of a list page; ``included`` holds the entities columnar records reference."""
+    return {"data": data, **included, "limit": limit, "next_cursor": next_cursor}
@@ -0,0 +1,127 @@
+"""Vectorized gross/tax/net calculation on integer cents.
+
+Inputs are converted to fixed point before any arithmetic: hours in
+hundredths, rates and deductions in cents, tax rates in millionths. Every
+product is then divided back with round-half-even on ``int64`` arrays, which
+gives the same result as ``decimal.Decimal`` quantized with
+``ROUND_HALF_EVEN`` while avoiding binary floating point drift.
+
+The int64 range leaves room for gross pay up to roughly 9 trillion currency
+units, far beyond what ``Numeric(12, 2)`` columns can store. NaN, infinities
+and figures whose products would leave that range raise ``ValueError``
+instead of wrapping around.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict
+
+import numpy as np
+
+from .money import CENTS, cents_to_decimal, to_cents  # noqa: F401  (re-exported)
+
+HOURS_SCALE = 100
+TAX_RATE_SCALE = 1_000_000
+INT64_MAX = int(np.iinfo(np.int64).max)
+# Scaled floats at or above 2**63 do not fit in int64.
+_FIXED_LIMIT = 2.0**63
+
+
+@dataclass(slots=True)
+class PayBreakdown:
+    """Pay figures in integer cents, one array element per employee."""
+
+    gross_cents: np.ndarray
+    tax_cents: np.ndarray
+    deduction_cents: np.ndarray
+    net_cents: np.ndarray
+
+
+def check_fixed(value: float, scale: int) -> float:
+    """Return ``value`` if ``to_fixed`` can convert it, else raise ``ValueError``."""
+    if not math.isfinite(value):
+        raise ValueError("Pay figures must be finite numbers")
+    if abs(value) * scale >= _FIXED_LIMIT:
+        raise ValueError("Pay figures are too large")
+    return value
+
+
+def to_fixed(values, scale: int) -> np.ndarray:
+    """Convert numbers to ``int64`` units of ``1 / scale`` (half-even)."""
+    scaled = np.asarray(values, dtype=np.float64) * scale
+    if not np.isfinite(scaled).all():
+        raise ValueError("Pay figures must be finite numbers")
+    if scaled.size and np.abs(scaled).max() >= _FIXED_LIMIT:
+        raise ValueError("Pay figures are too large")
+    return np.rint(scaled).astype(np.int64)
+
+
+def _largest(values: np.ndarray) -> int:
+    return int(np.abs(values).max()) if values.size else 0
+
+
+def _check_range(*terms: int) -> None:
+    """Raise ``ValueError`` unless a result of magnitude ``sum(terms)`` fits in int64."""
+    if sum(terms) > INT64_MAX:
+        raise ValueError("Pay figures are too large")
+
+
+def round_half_even_div(numerator: np.ndarray, denominator: int) -> np.ndarray:
+    """Integer division of ``numerator`` by ``denominator`` with banker's rounding."""
+    quotient, remainder = np.divmod(numerator, denominator)
+    twice = remainder * 2
+    round_up = (twice > denominator) | ((twice == denominator) & (quotient % 2 == 1))
+    return quotient + round_up
+
+
+def compute_pay_fixed(
+    hours_centi: np.ndarray,
+    rate_cents: np.ndarray,
+    tax_rate_micro: np.ndarray,
+    deduction_cents: np.ndarray,
+) -> PayBreakdown:
+    """Compute pay from inputs that are already in fixed point."""
+    hours_centi = np.asarray(hours_centi, dtype=np.int64)
+    rate_cents = np.asarray(rate_cents, dtype=np.int64)
+    tax_rate_micro = np.asarray(tax_rate_micro, dtype=np.int64)
+    # int64 arithmetic wraps silently, so bound every product and sum first.
+    _check_range(_largest(hours_centi) * _largest(rate_cents))
+    gross = round_half_even_div(hours_centi * rate_cents, HOURS_SCALE)
+    _check_range(_largest(gross) * _largest(tax_rate_micro))
+    tax = round_half_even_div(gross * tax_rate_micro, TAX_RATE_SCALE)
+    deductions = np.broadcast_to(np.asarray(deduction_cents, dtype=np.int64), gross.shape)
+    _check_range(_largest(gross), _largest(tax), _largest(deductions))
+    return PayBreakdown(
+        gross_cents=gross,
+        tax_cents=tax,
+        deduction_cents=deductions,
+        net_cents=gross - tax - deductions,
+    )
+
+
+def compute_pay(hours, hourly_rate, tax_rate, deductions=0) -> PayBreakdown:
+    """Compute pay for arrays (or scalars) of employees at once."""
+    return compute_pay_fixed(
+        to_fixed(hours, HOURS_SCALE),
+        to_fixed(hourly_rate, CENTS),
+        to_fixed(tax_rate, TAX_RATE_SCALE),
+        to_fixed(deductions, CENTS),
+    )
+
+
+def compute_single(
+    hours: float, hourly_rate: float, tax_rate: float, deductions: float = 0
+) -> Dict[str, Decimal]:
+    """Compute one employee's pay, returned as ``Decimal`` column values."""
+    result = compute_pay(
+        np.atleast_1d(hours), np.atleast_1d(hourly_rate), tax_rate, deductions
+    )
+    return {
+        "gross_pay": cents_to_decimal(result.gross_cents[0]),
+        "tax_amount": cents_to_decimal(result.tax_cents[0]),
+        "other_deductions": cents_to_decimal(result.deduction_cents[0]),
+        "net_pay": cents_to_decimal(result.net_cents[0]),
+    }
@@ -0,0 +1,237 @@
+"""Set-based payroll run engine.
+
+A payroll run computes and inserts every ``PayrollRecord`` of a period in one
+pass: employee rates and existing records are loaded with two queries, pay is
+computed for all employees at once by ``pay_calc`` (or ``tax`` for a bracket
+schedule, with year-to-date earnings read in one more query) and the rows
+are written with bulk ``INSERT`` statements committed in chunks, each chunk
+updating the dashboard counters and YTD accumulators in the same
+transaction. Each run is tracked by a ``PayrollRun`` summary row.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List
+
+import numpy as np
+from sqlalchemy import insert, select
+
+from .config import settings
+from .counters import CounterDelta
+from .database import session_scope
+from .models import Employee, PayrollPeriod, PayrollRecord, PayrollRun
+from .pay_calc import CENTS, HOURS_SCALE, cents_to_decimal, check_fixed, compute_pay
+from .tax import compute_pay_progressive, load_schedule, ytd_gross
+from .versions import bump
+
+
+@dataclass(slots=True)
+class RunEntry:
+    """Hours and deductions submitted for one employee in a run."""
+
+    employee_id: int
+    hours_worked: float
+    hourly_rate: float | None = None
+    other_deductions: float = 0.0
+    notes: str | None = None
+
+
+def parse_entries(raw_entries: Iterable[Dict]) -> tuple[List[RunEntry], List[Dict]]:
+    """Validate raw JSON entries, returning the usable ones and the rejects."""
+    entries: List[RunEntry] = []
+    errors: List[Dict] = []
+    for index, raw in enumerate(raw_entries):
+        try:
+            entry = RunEntry(
+                employee_id=int(raw["employee_id"]),
+                hours_worked=float(raw["hours_worked"]),
+                hourly_rate=float(raw["hourly_rate"]) if raw.get("hourly_rate") else None,
+                other_deductions=float(raw.get("other_deductions") or 0),
+                notes=raw.get("notes"),
+            )
+        except (KeyError, TypeError, ValueError):
+            errors.append({"index": index, "error": "employee_id and hours_worked are required"})
+            continue
+        try:
+            check_fixed(entry.hours_worked, HOURS_SCALE)
+            check_fixed(entry.hourly_rate or 0, CENTS)
+            check_fixed(entry.other_deductions, CENTS)
+        except ValueError as exc:
+            errors.append({"index": index, "employee_id": entry.employee_id, "error": str(exc)})
+            continue
+        if entry.hours_worked <= 0:
+            errors.append(
+                {
+                    "index": index,
+                    "employee_id": entry.employee_id,
+                    "error": "Hours worked must be greater than zero",
+                }
+            )
+            continue
+        entries.append(entry)
+    return entries, errors
+
+
+def execute_payroll_run(
+    period_id: int,
+    entries: List[RunEntry],
+    tax_rate: float | None = None,
+    default_hours: float | None = None,
+    chunk_size: int | None = None,
+    tax_schedule: str | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> Dict:
+    """Compute and insert the payroll records of a period.
+
+    Employees listed in ``entries`` use the submitted figures. When
+    ``default_hours`` is given, every other employee is paid that many hours
+    at their ``base_rate``. Employees that already have a record for the
+    period are skipped, so an interrupted run can simply be submitted again.
+    Tax is withheld at the flat ``tax_rate`` or, when ``tax_schedule`` names
+    a bracket schedule, progressively on each employee's year-to-date pay.
+    ``on_progress(created, total)`` is called after every committed chunk.
+    """
+    chunk_size = chunk_size or settings.payroll_run_chunk_size
+
+    with session_scope() as session:
+        run = PayrollRun(payroll_period_id=period_id)
+        session.add(run)
+        session.flush()
+        run_id = run.id
+
+    errors: List[Dict] = []
+    pay = compute_pay([], [], 0)
+    created = 0
+    skipped = 0
+
+    try:
+        with session_scope() as session:
+            end_date = session.scalar(
+                select(PayrollPeriod.end_date).where(PayrollPeriod.id == period_id)
+            )
+            schedule = None
+            if tax_schedule is not None:
+                schedule = load_schedule(session, tax_schedule, end_date)
+                if schedule is None:
+                    raise ValueError(f"No tax schedule {tax_schedule!r} in force on {end_date}")
+                ytd = ytd_gross(session, end_date.year)
+            rates = dict(session.execute(select(Employee.id, Employee.base_rate)).all())
+            already_paid = set(
+                session.scalars(
+                    select(PayrollRecord.employee_id).where(
+                        PayrollRecord.payroll_period_id == period_id
+                    )
+                )
+            )
+
+        by_employee = {entry.employee_id: entry for entry in entries}
+        if default_hours is not None:
+            for employee_id in rates:
+                by_employee.setdefault(
+                    employee_id, RunEntry(employee_id=employee_id, hours_worked=default_hours)
+                )
+
+        payable: List[RunEntry] = []
+        for employee_id, entry in by_employee.items():
+            if employee_id not in rates:
+                errors.append({"employee_id": employee_id, "error": "Employee not found"})
+            elif employee_id in already_paid:
+                skipped += 1
+            else:
+                payable.append(entry)
+
+        hours = np.fromiter((entry.hours_worked for entry in payable), np.float64, len(payable))
+        hourly_rates = np.fromiter(
+            (entry.hourly_rate or rates[entry.employee_id] for entry in payable),
+            np.float64,
+            len(payable),
+        )
+        deductions = np.fromiter(
+            (entry.other_deductions for entry in payable), np.float64, len(payable)
+        )
+        if schedule is not None:
+            ytd_cents = np.fromiter(
+                (ytd.get(entry.employee_id, 0) for entry in payable), np.int64, len(payable)
+            )
+            pay = compute_pay_progressive(hours, hourly_rates, schedule, ytd_cents, deductions)
+        else:
+            pay = compute_pay(hours, hourly_rates, tax_rate, deductions)
+        rows = [
+            {
+                "employee_id": entry.employee_id,
+                "payroll_period_id": period_id,
+                "hours_worked": entry.hours_worked,
+                "gross_pay": cents_to_decimal(gross),
+                "tax_amount": cents_to_decimal(tax),
+                "other_deductions": cents_to_decimal(deduction),
+                "net_pay": cents_to_decimal(net),
+                "notes": entry.notes,
+                "hourly_rate": entry.hourly_rate,
+                "tax_rate": None if schedule is not None else tax_rate,
+                "tax_schedule": tax_schedule,
+            }
+            for entry, gross, tax, deduction, net in zip(
+                payable,
+                pay.gross_cents.tolist(),
+                pay.tax_cents.tolist(),
+                pay.deduction_cents.tolist(),
+                pay.net_cents.tolist(),
+            )
+        ]
+
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start : start + chunk_size]
+            window = slice(start, start + chunk_size)
+            delta = CounterDelta()
+            delta.records(
+                period_id,
+                len(chunk),
+                gross_cents=int(pay.gross_cents[window].sum()),
+                tax_cents=int(pay.tax_cents[window].sum()),
+                deduction_cents=int(pay.deduction_cents[window].sum()),
+                net_cents=int(pay.net_cents[window].sum()),
+            )
+            for row, gross, tax, net in zip(
+                chunk,
+                pay.gross_cents[window].tolist(),
+                pay.tax_cents[window].tolist(),
+                pay.net_cents[window].tolist(),
+            ):
+                delta.year_to_date(
+                    row["employee_id"],
+                    end_date.year,
+                    1,
+                    gross_cents=gross,
+                    tax_cents=tax,
+                    net_cents=net,
+                )
+            with session_scope() as session:
+                session.execute(insert(PayrollRecord), chunk)
+                delta.apply(session.connection())
+                bump(session.connection(), [PayrollRecord.__tablename__])
+            created += len(chunk)
+            if on_progress is not None:
+                on_progress(created, len(rows))
+    except Exception as exc:
+        with session_scope() as session:
+            run = session.get(PayrollRun, run_id)
+            run.status = "FAILED"
+            run.records_created = created
+            run.error = str(exc)
+        raise
+
+    with session_scope() as session:
+        run = session.get(PayrollRun, run_id)
+        run.status = "COMPLETED"
+        run.records_created = created
+        run.records_skipped = skipped
+        run.total_gross = cents_to_decimal(pay.gross_cents.sum())
+        run.total_tax = cents_to_decimal(pay.tax_cents.sum())
+        run.total_deductions = cents_to_decimal(pay.deduction_cents.sum())
+        run.total_net = cents_to_decimal(pay.net_cents.sum())
+        session.flush()
+        summary = run.to_dict()
+
+    summary["errors"] = errors
+    return summary
@@ -0,0 +1,309 @@
+"""Parallel payslip rendering for a payroll period.
+
+Records are read in batches of ``settings.payslip_batch_size`` as plain
+dicts (``serializers.payroll_record_dict``) and handed to a
+``ProcessPoolExecutor``. Each worker compiles the ``payslip.html`` Jinja
+template once in its initializer and renders HTML and/or a small single-page
+PDF for every record in a batch. The parent process writes the returned files
+into a zip archive or a directory and records progress on the
+``PayslipBatch`` row after every finished batch. At most two batches per
+worker are in flight, so memory does not grow with the size of the period.
+Archived periods are read from their archive file (``backend.archive``).
+
+The API queues each batch as a ``render_payslips`` job (``backend.jobs``), so
+rendering survives restarts of the web process: a retry starts the batch
+over, and a batch whose job failed for good is reported as failed.
+"""
+
+from __future__ import annotations
+
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+from sqlalchemy import func, select, update
+from werkzeug.utils import secure_filename
+
+from . import jobs
+from .archive import archived_record_batches, record_dicts
+from .config import settings
+from .database import session_scope
+from .models import Job, PayrollRecord, PayslipBatch, PeriodArchive
+from .pagination import keyset_page
+from .serializers import payroll_record_dict, payroll_record_rows
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+_template: Template | None = None
+
+
+def _init_worker() -> None:
+    """Compile the payslip template once per worker process."""
+    global _template  # pylint: disable=global-statement
+    environment = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape(["html"])
+    )
+    _template = environment.get_template("payslip.html")
+
+
+def _context(record: Dict) -> Dict:
+    hours = record["hours_worked"] or 0
+    return {
+        **record,
+        "hourly_rate": record["gross_pay"] / hours if hours else 0.0,
+    }
+
+
+def render_html(record: Dict) -> bytes:
+    if _template is None:
+        _init_worker()
+    return _template.render(**_context(record)).encode()
+
+
+def _pdf_text(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(record: Dict) -> bytes:
+    """Render a one-page PDF payslip using the built-in Helvetica font."""
+    context = _context(record)
+    employee, period = context["employee"], context["period"]
+    lines = [
+        (16, "Payslip"),
+        (10, f"{period['label']} ({period['start_date']} to {period['end_date']})"),
+        (10, ""),
+        (11, f"Employee: {employee['full_name']} (#{employee['id']})"),
+        (11, f"Email: {employee['email']}"),
+        (11, f"Department: {employee['department'] or '-'}"),
+        (11, f"Employment type: {employee['employment_type']}"),
+        (11, ""),
+        (11, f"Hours worked: {context['hours_worked']:.2f}"),
+        (11, f"Hourly rate: {context['hourly_rate']:,.2f}"),
+        (11, f"Gross pay: {context['gross_pay']:,.2f}"),
+        (11, f"Tax: -{context['tax_amount']:,.2f}"),
+        (11, f"Other deductions: -{context['other_deductions']:,.2f}"),
+        (13, f"Net pay: {context['net_pay']:,.2f}"),
+    ]
+    if context["notes"]:
+        lines += [(10, ""), (10, context["notes"])]
+
+    text = ["BT", "72 770 Td"]
+    for size, line in lines:
+        text.append(f"/F1 {size} Tf 0 -{size + 8} Td ({_pdf_text(line)}) Tj")
+    text.append("ET")
+    stream = "\n".join(text).encode("latin-1", "replace")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+def render_batch(records: List[Dict], fmt: str) -> List[Tuple[str, bytes]]:
+    """Render the payslips of ``records``; runs inside a worker process."""
+    files = []
+    for record in records:
+        employee = record["employee"]
+        stem = secure_filename(f"{employee['id']}-{employee['last_name']}-{employee['first_name']}")
+        if fmt in ("html", "both"):
+            files.append((f"{stem}.html", render_html(record)))
+        if fmt in ("pdf", "both"):
+            files.append((f"{stem}.pdf", render_pdf(record)))
+    return files
+
+
+def _record_batches(period_id: int, batch_size: int) -> Iterator[List[Dict]]:
+    with session_scope() as session:
+        archived = session.get(PeriodArchive, period_id) is not None
+    if archived:
+        for batch in archived_record_batches(period_id, batch_size):
+            yield record_dicts(*batch)
+        return
+    # Each batch is its own short keyset query so no read transaction stays
+    # open while progress updates are written.
+    stmt = payroll_record_rows().where(PayrollRecord.payroll_period_id == period_id)
+    cursor = None
+    while True:
+        with session_scope() as session:
+            rows, cursor = keyset_page(
+                session, stmt, [(PayrollRecord.id, False)], cursor, batch_size
+            )
+            records = [payroll_record_dict(row) for row in rows]
+        if records:
+            yield records
+        if cursor is None:
+            return
+
+
+class _Writer:
+    """Write rendered files to a zip archive or a directory."""
+
+    def __init__(self, path: Path, output: str) -> None:
+        self.path = path
+        if output == "zip":
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.archive = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        else:
+            path.mkdir(parents=True, exist_ok=True)
+            self.archive = None
+
+    def write(self, files: List[Tuple[str, bytes]]) -> None:
+        for name, data in files:
+            if self.archive is not None:
+                self.archive.writestr(name, data)
+            else:
+                (self.path / name).write_bytes(data)
+
+    def close(self) -> None:
+        if self.archive is not None:
+            self.archive.close()
+
+
+def start_batch(period_id: int, fmt: str = "both", output: str = "zip") -> Dict:
+    """Create the ``PayslipBatch`` row that tracks rendering of a period."""
+    with session_scope() as session:
+        archive = session.get(PeriodArchive, period_id)
+        total = archive.record_count if archive is not None else session.scalar(
+            select(func.count(PayrollRecord.id)).where(
+                PayrollRecord.payroll_period_id == period_id
+            )
+        )
+        batch = PayslipBatch(
+            payroll_period_id=period_id, format=fmt, output=output, total=total
+        )
+        session.add(batch)
+        session.flush()
+        suffix = ".zip" if output == "zip" else ""
+        batch.path = str(Path(settings.payslip_dir) / f"period-{period_id}-batch-{batch.id}{suffix}")
+        session.flush()
+        return batch.to_dict()
+
+
+def queue_batch(period_id: int, fmt: str = "both", output: str = "zip") -> Dict:
+    """Create a ``PayslipBatch`` and queue the job that renders it."""
+    batch = start_batch(period_id, fmt, output)
+    try:
+        job = jobs.enqueue("render_payslips", {"batch_id": batch["id"]})
+    except Exception as exc:
+        _fail(batch["id"], str(exc))
+        raise
+    with session_scope() as session:
+        session.execute(
+            update(PayslipBatch).where(PayslipBatch.id == batch["id"]).values(job_id=job["id"])
+        )
+    return {**batch, "job_id": job["id"]}
+
+
+def batch_state(session, batch: PayslipBatch) -> Dict:
+    """``batch`` as a dict, failed when its job ended without finishing it.
+
+    A job is only retried while its worker is alive to run the handler; one
+    that lost its lease on the last attempt never reaches ``render_payslips``.
+    """
+    if batch.status == "RUNNING" and batch.job_id is not None:
+        job = session.get(Job, batch.job_id)
+        if job is not None and job.status in ("FAILED", "CANCELLED"):
+            batch.status = "FAILED"
+            batch.error = job.error or f"Payslip job {job.id} was {job.status.lower()}"
+            session.flush()
+    return batch.to_dict()
+
+
+def _fail(batch_id: int, error: str) -> None:
+    with session_scope() as session:
+        session.execute(
+            update(PayslipBatch)
+            .where(PayslipBatch.id == batch_id)
+            .values(status="FAILED", error=error)
+        )
+
+
+def render_payslips(
+    batch_id: int,
+    workers: int | None = None,
+    batch_size: int | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> Dict:
+    """Render every payslip of a ``PayslipBatch`` and return its final state.
+
+    ``on_progress(rendered, total)`` is called after every finished batch.
+    Rendering always starts from the first record, so a retry overwrites the
+    files of an earlier attempt.
+    """
+    workers = workers or settings.payslip_workers
+    batch_size = batch_size or settings.payslip_batch_size
+    with session_scope() as session:
+        batch = session.get(PayslipBatch, batch_id)
+        batch.status, batch.rendered, batch.error = "RUNNING", 0, None
+        period_id, fmt, output, path, total = (
+            batch.payroll_period_id,
+            batch.format,
+            batch.output,
+            Path(batch.path),
+            batch.total,
+        )
+
+    rendered = 0
+    writer = _Writer(path, output)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            pending = set()
+            for records in _record_batches(period_id, batch_size):
+                pending.add(pool.submit(render_batch, records, fmt))
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    rendered += _collect(batch_id, done, writer, fmt)
+                    if on_progress is not None:
+                        on_progress(rendered, total)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                rendered += _collect(batch_id, done, writer, fmt)
+                if on_progress is not None:
+                    on_progress(rendered, total)
+        writer.close()
+    except Exception as exc:
+        writer.close()
+        _fail(batch_id, str(exc))
+        raise
+
+    with session_scope() as session:
+        batch = session.get(PayslipBatch, batch_id)
+        batch.status = "COMPLETED"
+        batch.rendered = rendered
+        session.flush()
+        return batch.to_dict()
+
+
+def _collect(batch_id: int, done, writer: _Writer, fmt: str) -> int:
+    per_record = 2 if fmt == "both" else 1
+    count = 0
+    for future in done:
+        files = future.result()
+        writer.write(files)
+        count += len(files) // per_record
+    with session_scope() as session:
+        session.execute(
+            update(PayslipBatch)
+            .where(PayslipBatch.id == batch_id)
+            .values(rendered=PayslipBatch.rendered + count)
+        )
+    return count
@@ -0,0 +1,209 @@
+"""Recompute open-period payroll records when an employee's base rate changes.
+
+Records keep the inputs they were computed from (``hourly_rate``,
+``tax_rate``, ``tax_schedule``). When ``base_rate`` changes, the employee's
+records in ``OPEN`` periods that follow the base rate (no explicit
+``hourly_rate``) are recalculated from their hours, deductions and tax basis
+and rewritten. Processed and paid periods are never touched, and no period
+has to be deleted and posted again.
+
+Changed employees collect in a per-session dirty set: an ``after_flush``
+listener adds ORM updates of ``base_rate`` and bulk writers call
+``mark_rate_changed``. The set is drained once, just before the transaction
+commits, so a script or import that changes thousands of rates over many
+flushes recomputes in a single pass. Each batch of employees costs one read
+of their open records and one executemany ``UPDATE`` of those whose figures
+changed. Counters and year-to-date accumulators move by the difference, as
+with batch upserts, and progressive tax is withheld on the year-to-date
+accumulator less the record itself (``backend.record_upserts``).
+
+``employment_type`` does not enter the pay calculation, so changing it does
+not recompute anything. Records written before schema version 5 have no tax
+basis and are left as they are.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence
+
+from sqlalchemy import bindparam, event, inspect, or_, select, update
+
+from .counters import CounterDelta
+from .database import SessionLocal
+from .models import Employee, PayrollPeriod, PayrollRecord
+from .money import cents_to_decimal, to_cents
+from .versions import bump
+
+RECOMPUTED_STATUSES = ("OPEN",)
+_DIRTY = "rate_changed_employees"
+# Keeps ``IN`` lists well under every driver's bound-parameter limit.
+_KEY_BATCH = 500
+_RECORD_UPDATE = (
+    update(PayrollRecord.__table__)
+    .where(PayrollRecord.id == bindparam("record_id"))
+    .values(
+        gross_pay=bindparam("new_gross_pay"),
+        tax_amount=bindparam("new_tax_amount"),
+        net_pay=bindparam("new_net_pay"),
+        updated_at=bindparam("new_updated_at"),
+    )
+)
+
+
+def mark_rate_changed(session, employee_ids: Iterable[int]) -> None:
+    """Queue employees whose ``base_rate`` was changed by a bulk statement."""
+    session.info.setdefault(_DIRTY, set()).update(employee_ids)
+
+
+@event.listens_for(SessionLocal.session_factory, "after_flush")
+def _track_rate_changes(session, _flush_context) -> None:
+    changed = [
+        obj.id
+        for obj in session.dirty
+        if isinstance(obj, Employee) and inspect(obj).attrs.base_rate.history.has_changes()
+    ]
+    if changed:
+        mark_rate_changed(session, changed)
+
+
+@event.listens_for(SessionLocal.session_factory, "before_commit")
+def _recompute_before_commit(session) -> None:
+    recompute_pending(session)
+
+
+@event.listens_for(SessionLocal.session_factory, "after_rollback")
+def _forget_on_rollback(session) -> None:
+    session.info.pop(_DIRTY, None)
+
+
+def recompute_pending(session) -> int:
+    """Flush, then recompute the records of every queued employee.
+
+    Runs by itself before each commit; views call it to report the number
+    of records rewritten.
+    """
+    session.flush()
+    employee_ids = sorted(session.info.pop(_DIRTY, ()))
+    rewritten = 0
+    for start in range(0, len(employee_ids), _KEY_BATCH):
+        rewritten += _recompute_batch(session, employee_ids[start : start + _KEY_BATCH])
+    return rewritten
+
+
+def _open_records(session, employee_ids: Sequence[int]) -> List:
+    return session.execute(
+        select(
+            PayrollRecord.id,
+            PayrollRecord.employee_id,
+            PayrollRecord.payroll_period_id,
+            PayrollRecord.hours_worked,
+            PayrollRecord.gross_pay,
+            PayrollRecord.tax_amount,
+            PayrollRecord.other_deductions,
+            PayrollRecord.net_pay,
+            PayrollRecord.tax_rate,
+            PayrollRecord.tax_schedule,
+            Employee.base_rate,
+            PayrollPeriod.end_date,
+        )
+        .join(Employee, Employee.id == PayrollRecord.employee_id)
+        .join(PayrollPeriod, PayrollPeriod.id == PayrollRecord.payroll_period_id)
+        .where(
+            PayrollRecord.employee_id.in_(employee_ids),
+            PayrollPeriod.status.in_(RECOMPUTED_STATUSES),
+            PayrollRecord.hourly_rate.is_(None),
+            or_(PayrollRecord.tax_rate.is_not(None), PayrollRecord.tax_schedule.is_not(None)),
+        )
+        # Period order, so each record's year-to-date reflects the ones before it.
+        .order_by(PayrollPeriod.end_date, PayrollRecord.id)
+        .with_for_update()
+    ).all()
+
+
+def _withhold(session, records: List, gross: List[int], taxes: List[int | None]) -> None:
+    """Fill in the progressive tax of ``records`` that have a schedule."""
+    # pylint: disable=import-outside-toplevel
+    from .tax import load_schedule, ytd_gross
+
+    years = {record.end_date.year for record in records}
+    employee_ids = {record.employee_id for record in records}
+    running = {
+        (employee_id, year): cents
+        for year in years
+        for employee_id, cents in ytd_gross(session, year, employee_ids).items()
+    }
+    groups: Dict[tuple, List[tuple]] = defaultdict(list)
+    for index, record in enumerate(records):
+        key = (record.employee_id, record.end_date.year)
+        old_gross = to_cents(record.gross_pay)
+        # The accumulator holds every record's old gross; swap in the new ones as we go.
+        before = running.get(key, 0) - old_gross
+        running[key] = before + gross[index]
+        if record.tax_schedule is not None:
+            groups[(record.tax_schedule, record.end_date)].append((index, before))
+
+    for (name, end_date), members in groups.items():
+        schedule = load_schedule(session, name, end_date)
+        if schedule is None:
+            continue  # schedule removed since; leave these records as they are
+        withheld = schedule.withholding_array(
+            [before for _, before in members], [gross[index] for index, _ in members]
+        )
+        for (index, _), tax in zip(members, withheld.tolist()):
+            taxes[index] = tax
+
+
+def _recompute_batch(session, employee_ids: Sequence[int]) -> int:
+    from .pay_calc import compute_pay  # pylint: disable=import-outside-toplevel
+
+    records = _open_records(session, employee_ids)
+    if not records:
+        return 0
+    pay = compute_pay(
+        [record.hours_worked for record in records],
+        [float(record.base_rate) for record in records],
+        [float(record.tax_rate or 0) for record in records],
+        [float(record.other_deductions or 0) for record in records],
+    )
+    gross = pay.gross_cents.tolist()
+    taxes: List[int | None] = [
+        tax if record.tax_schedule is None else None
+        for record, tax in zip(records, pay.tax_cents.tolist())
+    ]
+    _withhold(session, records, gross, taxes)
+
+    now = datetime.utcnow()
+    rows = []
+    delta = CounterDelta()
+    for record, new_gross, tax, deduction in zip(
+        records, gross, taxes, pay.deduction_cents.tolist()
+    ):
+        old_gross, old_tax = to_cents(record.gross_pay), to_cents(record.tax_amount)
+        if tax is None or (new_gross, tax) == (old_gross, old_tax):
+            continue
+        net = new_gross - tax - deduction
+        changes = {
+            "gross_cents": new_gross - old_gross,
+            "tax_cents": tax - old_tax,
+            "net_cents": net - to_cents(record.net_pay),
+        }
+        delta.records(record.payroll_period_id, 0, **changes)
+        delta.year_to_date(record.employee_id, record.end_date.year, 0, **changes)
+        rows.append(
+            {
+                "record_id": record.id,
+                "new_gross_pay": cents_to_decimal(new_gross),
+                "new_tax_amount": cents_to_decimal(tax),
+                "new_net_pay": cents_to_decimal(net),
+                "new_updated_at": now,
+            }
+        )
+
+    if rows:
+        connection = session.connection()
+        connection.execute(_RECORD_UPDATE, rows)
+        delta.apply(connection)
+        bump(connection, [PayrollRecord.__tablename__])
+    return len(rows)
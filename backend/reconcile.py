@@ -0,0 +1,36 @@
+"""Check the dashboard counters for drift and optionally rebuild them.
+
+Usage::
+
+    python -m backend.reconcile          # report drift, exit 1 if any
+    python -m backend.reconcile --fix    # rebuild the counters from scratch
+"""
+
+import argparse
+import sys
+
+from backend.counters import find_drift, rebuild
+from backend.database import session_scope
+
+
+def reconcile(fix: bool = False) -> bool:
+    """Print every drifted counter; return ``True`` when none remain."""
+    with session_scope() as session:
+        connection = session.connection()
+        problems = find_drift(connection)
+        for problem in problems:
+            print(problem)
+        if not problems:
+            print("Counters match the source tables.")
+            return True
+        if fix:
+            rebuild(connection)
+            print("Counters rebuilt.")
+            return True
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check dashboard counters for drift.")
+    parser.add_argument("--fix", action="store_true", help="rebuild the counters from scratch")
+    sys.exit(0 if reconcile(fix=parser.parse_args().fix) else 1)
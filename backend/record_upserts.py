@@ -0,0 +1,357 @@
+"""Idempotent batch upserts of payroll records.
+
+A batch carries hours and deductions for many employees of one period and is
+written with the dialect's native upsert (``INSERT ... ON CONFLICT DO
+UPDATE`` on SQLite, ``INSERT ... ON DUPLICATE KEY UPDATE`` on MySQL) keyed by
+``uq_employee_period``, so a correction replaces the existing record instead
+of needing a delete and a re-insert.
+
+Each chunk reads the records it may replace (locked on MySQL), computes pay
+for the whole chunk at once and writes only the rows whose figures differ
+from the stored ones; unchanged rows cost nothing beyond that read. The
+counters and YTD accumulators move by the difference between the new and
+the old amounts in the same transaction.
+
+A batch submitted with an idempotency key is recorded in ``upsert_batches``
+with a hash of its payload. Replaying a completed batch returns the stored
+summary without touching the records; reusing a key for a different payload
+is refused. A failed batch, or one left ``RUNNING`` for longer than
+``STALE_AFTER`` by a process that died, can be submitted again with the same
+key and resumes cheaply because the chunks it committed are now unchanged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from .config import settings
+from .counters import CounterDelta
+from .database import session_scope
+from .models import Employee, PayrollPeriod, PayrollRecord, UpsertBatch
+from .money import CENTS, cents_to_decimal, to_cents
+from .pay_calc import TAX_RATE_SCALE, compute_pay
+from .payroll_runs import RunEntry
+from .tax import compute_pay_progressive, load_schedule, ytd_gross
+from .versions import bump
+
+STALE_AFTER = timedelta(minutes=10)
+_UPDATED_COLUMNS = (
+    "hours_worked",
+    "gross_pay",
+    "tax_amount",
+    "other_deductions",
+    "net_pay",
+    "notes",
+    "hourly_rate",
+    "tax_rate",
+    "tax_schedule",
+    "updated_at",
+)
+
+
+class IdempotencyConflict(ValueError):
+    """The idempotency key is running or belongs to a different payload."""
+
+
+def request_hash(payload: Dict) -> str:
+    """Stable digest of a batch payload, ignoring the idempotency key itself."""
+    body = {key: value for key, value in payload.items() if key != "idempotency_key"}
+    encoded = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def replayed_batch(session, key: str | None, digest: str) -> Dict | None:
+    """The stored summary of a completed batch with ``key``, if there is one."""
+    if key is None:
+        return None
+    batch = session.scalars(select(UpsertBatch).where(UpsertBatch.idempotency_key == key)).first()
+    if batch is None:
+        return None
+    if batch.request_hash != digest:
+        raise IdempotencyConflict("Idempotency key was already used for a different batch")
+    return batch.to_dict() if batch.status == "COMPLETED" else None
+
+
+def start_batch(period_id: int, key: str | None, digest: str) -> int:
+    """Record a new batch, or take over a failed or stale one with the same key."""
+    with session_scope() as session:
+        if key is not None:
+            taken_over = session.execute(
+                update(UpsertBatch)
+                .where(
+                    UpsertBatch.idempotency_key == key,
+                    UpsertBatch.request_hash == digest,
+                    or_(
+                        UpsertBatch.status == "FAILED",
+                        and_(
+                            UpsertBatch.status == "RUNNING",
+                            UpsertBatch.updated_at < datetime.utcnow() - STALE_AFTER,
+                        ),
+                    ),
+                )
+                .values(
+                    status="RUNNING",
+                    payroll_period_id=period_id,
+                    records_inserted=0,
+                    records_updated=0,
+                    records_unchanged=0,
+                    error=None,
+                )
+            ).rowcount
+            if taken_over:
+                return session.scalar(
+                    select(UpsertBatch.id).where(UpsertBatch.idempotency_key == key)
+                )
+        batch = UpsertBatch(idempotency_key=key, request_hash=digest, payroll_period_id=period_id)
+        session.add(batch)
+        try:
+            session.flush()
+        except IntegrityError:
+            session.rollback()
+            raise IdempotencyConflict(
+                "A batch with this idempotency key is already running"
+            ) from None
+        return batch.id
+
+
+def _upsert_statement(dialect_name: str):
+    """``INSERT`` into ``payroll_records`` that updates the figures on conflict."""
+    if dialect_name == "mysql":
+        stmt = mysql.insert(PayrollRecord)
+        return stmt.on_duplicate_key_update(
+            {name: stmt.inserted[name] for name in _UPDATED_COLUMNS}
+        )
+    stmt = sqlite.insert(PayrollRecord)
+    return stmt.on_conflict_do_update(
+        index_elements=["employee_id", "payroll_period_id"],
+        set_={name: stmt.excluded[name] for name in _UPDATED_COLUMNS},
+    )
+
+
+def _fixed(value, scale: int) -> int | None:
+    return None if value is None else round(float(value) * scale)
+
+
+def _same_basis(old, hourly_rate, tax_rate, tax_schedule) -> bool:
+    """Whether a stored record was computed from the same rate and tax basis."""
+    return (
+        _fixed(old.hourly_rate, CENTS) == _fixed(hourly_rate, CENTS)
+        and _fixed(old.tax_rate, TAX_RATE_SCALE) == _fixed(tax_rate, TAX_RATE_SCALE)
+        and old.tax_schedule == tax_schedule
+    )
+
+
+def _upsert_chunk(
+    session, period_id: int, end_date, chunk: List[RunEntry], tax_rate, schedule, errors
+) -> tuple[int, int, int]:
+    """Write the changed rows of ``chunk``; return (inserted, updated, unchanged)."""
+    employee_ids = [entry.employee_id for entry in chunk]
+    rates = dict(
+        session.execute(
+            select(Employee.id, Employee.base_rate).where(Employee.id.in_(employee_ids))
+        ).all()
+    )
+    existing = {
+        row.employee_id: row
+        for row in session.execute(
+            select(
+                PayrollRecord.employee_id,
+                PayrollRecord.hours_worked,
+                PayrollRecord.gross_pay,
+                PayrollRecord.tax_amount,
+                PayrollRecord.other_deductions,
+                PayrollRecord.net_pay,
+                PayrollRecord.notes,
+                PayrollRecord.hourly_rate,
+                PayrollRecord.tax_rate,
+                PayrollRecord.tax_schedule,
+            )
+            .where(
+                PayrollRecord.payroll_period_id == period_id,
+                PayrollRecord.employee_id.in_(employee_ids),
+            )
+            .with_for_update()
+        )
+    }
+
+    payable: List[RunEntry] = []
+    for entry in chunk:
+        if entry.employee_id in rates:
+            payable.append(entry)
+        else:
+            errors.append({"employee_id": entry.employee_id, "error": "Employee not found"})
+
+    hours = np.fromiter((entry.hours_worked for entry in payable), np.float64, len(payable))
+    hourly_rates = np.fromiter(
+        (entry.hourly_rate or rates[entry.employee_id] for entry in payable),
+        np.float64,
+        len(payable),
+    )
+    deductions = np.fromiter(
+        (entry.other_deductions for entry in payable), np.float64, len(payable)
+    )
+    if schedule is not None:
+        ytd = ytd_gross(session, end_date.year, employee_ids)
+        # The accumulators already include the record being replaced.
+        for employee_id, old in existing.items():
+            ytd[employee_id] = ytd.get(employee_id, 0) - to_cents(old.gross_pay)
+        ytd_cents = np.fromiter(
+            (ytd.get(entry.employee_id, 0) for entry in payable),
+            np.int64,
+            len(payable),
+        )
+        pay = compute_pay_progressive(hours, hourly_rates, schedule, ytd_cents, deductions)
+    else:
+        pay = compute_pay(hours, hourly_rates, tax_rate, deductions)
+
+    basis_rate = None if schedule is not None else tax_rate
+    basis_schedule = schedule.name if schedule is not None else None
+    now = datetime.utcnow()
+    rows = []
+    delta = CounterDelta()
+    inserted = updated = unchanged = 0
+    for entry, gross, tax, deduction, net in zip(
+        payable,
+        pay.gross_cents.tolist(),
+        pay.tax_cents.tolist(),
+        pay.deduction_cents.tolist(),
+        pay.net_cents.tolist(),
+    ):
+        old = existing.get(entry.employee_id)
+        if old is None:
+            count, old_cents = 1, (0, 0, 0, 0)
+            inserted += 1
+        else:
+            count = 0
+            old_cents = (
+                to_cents(old.gross_pay),
+                to_cents(old.tax_amount),
+                to_cents(old.other_deductions),
+                to_cents(old.net_pay),
+            )
+            if (
+                old_cents == (gross, tax, deduction, net)
+                and old.hours_worked == entry.hours_worked
+                and old.notes == entry.notes
+                and _same_basis(old, entry.hourly_rate, basis_rate, basis_schedule)
+            ):
+                unchanged += 1
+                continue
+            updated += 1
+        rows.append(
+            {
+                "employee_id": entry.employee_id,
+                "payroll_period_id": period_id,
+                "hours_worked": entry.hours_worked,
+                "gross_pay": cents_to_decimal(gross),
+                "tax_amount": cents_to_decimal(tax),
+                "other_deductions": cents_to_decimal(deduction),
+                "net_pay": cents_to_decimal(net),
+                "notes": entry.notes,
+                "hourly_rate": entry.hourly_rate,
+                "tax_rate": basis_rate,
+                "tax_schedule": basis_schedule,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        delta.records(
+            period_id,
+            count,
+            gross_cents=gross - old_cents[0],
+            tax_cents=tax - old_cents[1],
+            deduction_cents=deduction - old_cents[2],
+            net_cents=net - old_cents[3],
+        )
+        delta.year_to_date(
+            entry.employee_id,
+            end_date.year,
+            count,
+            gross_cents=gross - old_cents[0],
+            tax_cents=tax - old_cents[1],
+            net_cents=net - old_cents[3],
+        )
+
+    if rows:
+        session.execute(_upsert_statement(session.get_bind().dialect.name), rows)
+        delta.apply(session.connection())
+        bump(session.connection(), [PayrollRecord.__tablename__])
+    return inserted, updated, unchanged
+
+
+def upsert_records(
+    batch_id: int,
+    period_id: int,
+    entries: List[RunEntry],
+    tax_rate: float | None = None,
+    tax_schedule: str | None = None,
+    errors: List[Dict] | None = None,
+    chunk_size: int | None = None,
+) -> Dict:
+    """Insert or update the records of ``entries`` and complete the batch.
+
+    When an employee appears more than once the last entry wins. ``errors``
+    (rejects found while parsing) are stored with the batch so a replay
+    returns the same summary.
+    """
+    chunk_size = chunk_size or settings.payroll_run_chunk_size
+    errors = list(errors or [])
+    pending = list({entry.employee_id: entry for entry in entries}.values())
+    inserted = updated = unchanged = 0
+
+    try:
+        with session_scope() as session:
+            end_date = session.scalar(
+                select(PayrollPeriod.end_date).where(PayrollPeriod.id == period_id)
+            )
+            schedule = None
+            if tax_schedule is not None:
+                schedule = load_schedule(session, tax_schedule, end_date)
+                if schedule is None:
+                    raise ValueError(f"No tax schedule {tax_schedule!r} in force on {end_date}")
+
+        for start in range(0, len(pending), chunk_size):
+            with session_scope() as session:
+                counts = _upsert_chunk(
+                    session,
+                    period_id,
+                    end_date,
+                    pending[start : start + chunk_size],
+                    tax_rate,
+                    schedule,
+                    errors,
+                )
+                inserted += counts[0]
+                updated += counts[1]
+                unchanged += counts[2]
+                # Progress also keeps updated_at fresh, so the batch is not stale.
+                session.execute(
+                    update(UpsertBatch)
+                    .where(UpsertBatch.id == batch_id)
+                    .values(
+                        records_inserted=inserted,
+                        records_updated=updated,
+                        records_unchanged=unchanged,
+                    )
+                )
+    except Exception as exc:
+        with session_scope() as session:
+            batch = session.get(UpsertBatch, batch_id)
+            batch.status = "FAILED"
+            batch.error = str(exc)
+        raise
+
+    with session_scope() as session:
+        batch = session.get(UpsertBatch, batch_id)
+        batch.status = "COMPLETED"
+        batch.errors = json.dumps(errors) if errors else None
+        session.flush()
+        return batch.to_dict()
@@ -0,0 +1,55 @@
+"""Copy the primary SQLite database onto the read replica.
+
+A local stand-in for database replication, used to try ``READ_DATABASE_URL``
+with two SQLite files::
+
+    python -m backend.replicate                # copy once
+    python -m backend.replicate --interval 2   # keep copying every 2 seconds
+
+Each copy uses SQLite's online backup API, so it is consistent even while the
+app keeps writing to the primary. Readers of the replica see the data as of
+the last copy, which is the replication lag that the read-your-writes window
+in ``backend.database`` covers for the client that wrote.
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+
+from sqlalchemy.engine import make_url
+
+from backend.config import settings
+
+
+def _sqlite_path(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or not parsed.database:
+        raise ValueError(f"Not a file-backed SQLite URL: {url}")
+    return parsed.database
+
+
+def sync_replica(primary_url: str, replica_url: str) -> None:
+    """Overwrite the replica file with a consistent snapshot of the primary."""
+    source = sqlite3.connect(_sqlite_path(primary_url))
+    target = sqlite3.connect(_sqlite_path(replica_url))
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy the primary SQLite file to the replica.")
+    parser.add_argument("--interval", type=float, help="repeat every N seconds")
+    args = parser.parse_args()
+
+    if not settings.read_database_url:
+        sys.exit("READ_DATABASE_URL is not set")
+    while True:
+        sync_replica(settings.database_url, settings.read_database_url)
+        print(f"Replica synced at {time.strftime('%H:%M:%S')}")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
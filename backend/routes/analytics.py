@@ -0,0 +1,34 @@
+from datetime import date
+
+from flask import Blueprint, Response, g, jsonify, request
+
+from backend.analytics import department_costs_json
+from backend.database import read_session_scope
+from backend.versions import conditional
+
+analytics_bp = Blueprint("analytics", __name__, url_prefix="/api/analytics")
+
+
+@analytics_bp.get("/department-costs")
+@conditional("payroll_records", "payroll_periods", "employees", "departments", "period_archives")
+def department_costs():
+    """Cost per department and period for periods ending between ``?from=`` and ``?to=``."""
+    try:
+        date_from, date_to = (
+            date.fromisoformat(request.args[name]) if request.args.get(name) else None
+            for name in ("from", "to")
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid date format, use YYYY-MM-DD"}), 400
+    if date_from and date_to and date_to < date_from:
+        return jsonify({"error": "End date must be after start date"}), 400
+
+    with read_session_scope() as session:
+        body = department_costs_json(
+            session,
+            tuple(sorted(g.table_versions.items())),
+            date_from=date_from,
+            date_to=date_to,
+            department_id=request.args.get("department_id", type=int),
+        )
+    return Response(body, mimetype="application/json")
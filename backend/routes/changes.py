@@ -0,0 +1,17 @@
+from flask import Blueprint, jsonify, request
+
+from backend.changes import changes_since
+from backend.database import session_scope
+from backend.pagination import InvalidCursor
+
+changes_bp = Blueprint("changes", __name__, url_prefix="/api/changes")
+
+
+@changes_bp.get("")
+def list_changes():
+    """Return rows created, updated or deleted since the ``since`` cursor."""
+    try:
+        with session_scope() as session:
+            return jsonify(changes_since(session, request.args.get("since")))
+    except InvalidCursor as exc:
+        return jsonify({"error": str(exc)}), 400
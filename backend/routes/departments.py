@@ -1,18 +1,46 @@
 from flask import Blueprint, jsonify, request
-from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
-from backend.database import session_scope
+from backend.database import read_session_scope, session_scope
 from backend.models import Department
+from backend.pagination import InvalidCursor, keyset_page, page_limit, page_response
+from backend.serializers import (
+    DEPARTMENT_FIELDS,
+    InvalidProjection,
+    apply_projection,
+    department_dict,
+    department_rows,
+    parse_projection,
+)
+from backend.versions import conditional
 
 departments_bp = Blueprint("departments", __name__, url_prefix="/api/departments")
 
 
 @departments_bp.get("")
+@conditional("departments", "employees")
 def list_departments():
-    with session_scope() as session:
-        departments = session.scalars(select(Department).order_by(Department.name)).all()
-        return jsonify({"data": [dept.to_dict() for dept in departments]})
+    try:
+        limit = page_limit(request.args.get("limit"))
+        projection = parse_projection(
+            request.args.get("fields"), request.args.get("format"), DEPARTMENT_FIELDS
+        )
+        with read_session_scope() as session:
+            departments, next_cursor = keyset_page(
+                session,
+                department_rows(),
+                [(Department.name, False), (Department.id, False)],
+                request.args.get("cursor"),
+                limit,
+            )
+            data = [department_dict(row) for row in departments]
+            return jsonify(
+                page_response(
+                    apply_projection(data, projection, DEPARTMENT_FIELDS), limit, next_cursor
+                )
+            )
+    except (InvalidCursor, InvalidProjection) as exc:
+        return jsonify({"error": str(exc)}), 400
 
 
 @departments_bp.post("")
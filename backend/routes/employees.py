@@ -1,35 +1,94 @@
 from datetime import date
 
 from flask import Blueprint, jsonify, request
-from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
-from backend.database import session_scope
+from backend.database import read_session_scope, session_scope
+from backend.directory import directory
+from backend.importer import (
+    ImportFormatError,
+    detect_format,
+    import_employees,
+    parse_base_rate,
+    parse_employment_type,
+)
 from backend.models import Department, Employee
+from backend.pagination import (
+    InvalidCursor,
+    keyset_page,
+    offset_page,
+    page_limit,
+    page_response,
+)
+from backend.recompute import recompute_pending
+from backend.search import apply_search
+from backend.serializers import (
+    EMPLOYEE_FIELDS,
+    InvalidProjection,
+    apply_projection,
+    employee_dict,
+    employee_rows,
+    parse_projection,
+)
+from backend.versions import conditional
 
 employees_bp = Blueprint("employees", __name__, url_prefix="/api/employees")
 
+SUGGEST_MAX_LIMIT = 50
+
 
 @employees_bp.get("")
+@conditional("employees", "departments")
 def list_employees():
-    search_term = request.args.get("q", "").lower()
-    dept_filter = request.args.get("department_id")
+    search_term = request.args.get("q", "")
+    dept_filter = request.args.get("department_id", type=int)
+    cursor = request.args.get("cursor")
 
-    with session_scope() as session:
-        stmt = select(Employee).order_by(Employee.last_name.asc())
-        if dept_filter:
-            stmt = stmt.where(Employee.department_id == int(dept_filter))
-        employees = session.scalars(stmt).all()
+    try:
+        limit = page_limit(request.args.get("limit"))
+        projection = parse_projection(
+            request.args.get("fields"), request.args.get("format"), EMPLOYEE_FIELDS
+        )
+        with read_session_scope() as session:
+            search_stmt = apply_search(
+                employee_rows(), session.get_bind().dialect.name, search_term
+            )
+            stmt = search_stmt if search_stmt is not None else employee_rows()
+            if dept_filter:
+                stmt = stmt.where(Employee.department_id == dept_filter)
+
+            if search_stmt is not None:
+                # Ranked results have no stable seek key, so they page by offset.
+                employees, next_cursor = offset_page(session, stmt, cursor, limit)
+            else:
+                employees, next_cursor = keyset_page(
+                    session,
+                    stmt,
+                    [(Employee.last_name, False), (Employee.id, False)],
+                    cursor,
+                    limit,
+                )
+            data = [employee_dict(row) for row in employees]
+            return jsonify(
+                page_response(
+                    apply_projection(data, projection, EMPLOYEE_FIELDS), limit, next_cursor
+                )
+            )
+    except (InvalidCursor, InvalidProjection) as exc:
+        return jsonify({"error": str(exc)}), 400
 
-        if search_term:
-            employees = [
-                emp
-                for emp in employees
-                if search_term in emp.full_name.lower()
-                or search_term in emp.email.lower()
-            ]
 
-        return jsonify({"data": [emp.to_dict() for emp in employees]})
+@employees_bp.get("/suggest")
+def suggest_employees():
+    """Typeahead matches on name or email prefix from the in-memory directory."""
+    try:
+        limit = max(1, min(int(request.args.get("limit", 10)), SUGGEST_MAX_LIMIT))
+        dept_filter = request.args.get("department_id")
+        department_id = int(dept_filter) if dept_filter else None
+    except ValueError:
+        return jsonify({"error": "limit and department_id must be integers"}), 400
+    matches = directory.suggest(request.args.get("q", ""), limit, department_id)
+    return jsonify({"data": [entry.to_dict() for entry in matches]})
 
 
 @employees_bp.post("")
@@ -57,6 +116,12 @@ def create_employee():
     except ValueError:
         return jsonify({"error": "Invalid hire_date format, use YYYY-MM-DD"}), 400
 
+    try:
+        base_rate = parse_base_rate(payload["base_rate"])
+        employment_type = parse_employment_type(payload["employment_type"])
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
     with session_scope() as session:
         department = session.get(Department, int(payload["department_id"]))
         if not department:
@@ -66,9 +131,9 @@ def create_employee():
             first_name=payload["first_name"].strip(),
             last_name=payload["last_name"].strip(),
             email=payload["email"].strip().lower(),
-            base_rate=float(payload["base_rate"]),
+            base_rate=base_rate,
             department=department,
-            employment_type=payload["employment_type"],
+            employment_type=employment_type,
             hire_date=hire_date,
         )
 
@@ -76,26 +141,58 @@ def create_employee():
         try:
             session.flush()
         except IntegrityError:
+            session.rollback()
             return jsonify({"error": "Email already exists"}), 409
 
         return jsonify({"message": "Employee created", "data": employee.to_dict()}), 201
 
 
+@employees_bp.post("/import")
+def import_employees_upload():
+    """Stream a CSV or NDJSON upload into the employees table."""
+    upload = request.files.get("file")
+    if upload is not None:
+        stream, filename, content_type = upload.stream, upload.filename, upload.mimetype
+    else:
+        stream, filename, content_type = request.stream, None, request.mimetype
+
+    fmt = request.args.get("format") or detect_format(filename, content_type)
+    try:
+        report = import_employees(stream, fmt)
+    except ImportFormatError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify({"message": "Import finished", "data": report.to_dict()})
+
+
 @employees_bp.put("/<int:employee_id>")
 def update_employee(employee_id: int):
     payload = request.get_json(force=True)
 
+    try:
+        base_rate = parse_base_rate(payload["base_rate"]) if "base_rate" in payload else None
+        employment_type = (
+            parse_employment_type(payload["employment_type"])
+            if "employment_type" in payload
+            else None
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
     with session_scope() as session:
         employee = session.get(Employee, employee_id)
         if not employee:
             return jsonify({"error": "Employee not found"}), 404
 
-        for field in ["first_name", "last_name", "email", "employment_type"]:
+        for field in ["first_name", "last_name", "email"]:
             if field in payload:
                 setattr(employee, field, payload[field].strip())
 
-        if "base_rate" in payload:
-            employee.base_rate = float(payload["base_rate"])
+        if employment_type is not None:
+            employee.employment_type = employment_type
+
+        if base_rate is not None:
+            employee.base_rate = base_rate
 
         if "hire_date" in payload:
             try:
@@ -113,8 +210,16 @@ def update_employee(employee_id: int):
             employee.department = department
 
         session.add(employee)
-
-        return jsonify({"message": "Employee updated", "data": employee.to_dict()})
+        # A base_rate change rewrites the employee's records in open periods.
+        recomputed = recompute_pending(session)
+
+        return jsonify(
+            {
+                "message": "Employee updated",
+                "data": employee.to_dict(),
+                "recomputed_records": recomputed,
+            }
+        )
 
 
 @employees_bp.delete("/<int:employee_id>")
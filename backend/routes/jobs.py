@@ -0,0 +1,74 @@
+from flask import Blueprint, jsonify, request
+from sqlalchemy import select
+
+from backend import jobs
+from backend.database import read_session_scope
+from backend.models import JOB_STATUSES, Job
+from backend.pagination import (
+    InvalidCursor,
+    keyset_result,
+    keyset_statement,
+    page_limit,
+    page_response,
+)
+
+jobs_bp = Blueprint("jobs", __name__)
+
+JOB_KEYS = [(Job.id, True)]
+
+
+@jobs_bp.get("/api/jobs")
+def list_jobs():
+    """Newest jobs first, optionally only those with ``?status=``."""
+    status = request.args.get("status")
+    if status is not None and status not in JOB_STATUSES:
+        return jsonify({"error": f"Status must be one of {', '.join(JOB_STATUSES)}"}), 400
+    try:
+        limit = page_limit(request.args.get("limit"))
+        stmt = select(Job)
+        if status is not None:
+            stmt = stmt.where(Job.status == status)
+        stmt = keyset_statement(stmt, JOB_KEYS, request.args.get("cursor"), limit)
+        with read_session_scope() as session:
+            rows, next_cursor = keyset_result(session.scalars(stmt).all(), JOB_KEYS, limit)
+            return jsonify(page_response([job.to_dict() for job in rows], limit, next_cursor))
+    except InvalidCursor as exc:
+        return jsonify({"error": str(exc)}), 400
+
+
+@jobs_bp.post("/api/jobs")
+def create_job():
+    """Queue a job of a registered ``kind`` for ``python -m backend.worker``."""
+    payload = request.get_json(force=True)
+    kind = payload.get("kind")
+    if not kind:
+        return jsonify({"error": f"kind must be one of {', '.join(sorted(jobs.HANDLERS))}"}), 400
+    max_attempts = payload.get("max_attempts")
+    if max_attempts is not None and (not isinstance(max_attempts, int) or max_attempts < 1):
+        return jsonify({"error": "max_attempts must be a positive integer"}), 400
+    try:
+        job = jobs.enqueue(kind, payload.get("payload") or {}, max_attempts)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({"message": "Job queued", "data": job}), 202
+
+
+@jobs_bp.get("/api/jobs/<int:job_id>")
+def get_job(job_id: int):
+    """Status, attempts and progress of a job."""
+    with read_session_scope() as session:
+        job = session.get(Job, job_id)
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify({"data": job.to_dict()})
+
+
+@jobs_bp.post("/api/jobs/<int:job_id>/cancel")
+def cancel_job(job_id: int):
+    """Cancel a queued job, or ask a running one to stop at its next progress report."""
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] in ("COMPLETED", "FAILED"):
+        return jsonify({"error": f"Job is {job['status']}"}), 409
+    return jsonify({"message": "Cancellation requested", "data": job}), 202
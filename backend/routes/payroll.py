@@ -1,43 +1,220 @@
 from __future__ import annotations
 
+import threading
 from datetime import date
 
-from flask import Blueprint, jsonify, request
-from sqlalchemy import func, select
+from flask import Blueprint, Response, g, jsonify, request, stream_with_context
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import secure_filename
 
-from backend.database import session_scope
-from backend.models import Department, Employee, PayrollPeriod, PayrollRecord
+from backend import archive, jobs
+from backend.config import settings
+from backend.database import read_session_scope, session_scope
+from backend.counters import SUMMARY_ID
+from backend.exporter import FORMATS, ExportUnavailable, export_register, gzip_chunks
+from backend.models import (
+    PAYROLL_STATUSES,
+    Employee,
+    PayrollPeriod,
+    PayrollRecord,
+    PayrollRun,
+    PeriodArchive,
+    PeriodTotal,
+    SummaryCounter,
+    YtdAccumulator,
+)
+from backend.pagination import (
+    InvalidCursor,
+    cursor_keys,
+    keyset_page,
+    keyset_result,
+    keyset_statement,
+    page_limit,
+    page_response,
+)
+from backend.serializers import (
+    PERIOD_FIELDS,
+    RECORD_FIELDS,
+    InvalidProjection,
+    apply_projection,
+    parse_projection,
+    payroll_record_page,
+    payroll_record_rows,
+    period_dict,
+    period_rows,
+    record_nested,
+)
+from backend.versions import conditional
 
 payroll_bp = Blueprint("payroll", __name__)
 
 
+def _get_or_create_period(session, label: str, start_date: date, end_date: date):
+    """Return the period with ``label``, creating it when it does not exist."""
+    period = (
+        session.execute(select(PayrollPeriod).where(PayrollPeriod.label == label))
+        .scalars()
+        .first()
+    )
+    if not period:
+        period = PayrollPeriod(label=label, start_date=start_date, end_date=end_date)
+        session.add(period)
+        session.flush()
+    return period
+
+
+def _record_exists(session, employee_id: int, period_label: str) -> bool:
+    return (
+        session.scalar(
+            select(PayrollRecord.id)
+            .join(PayrollPeriod, PayrollPeriod.id == PayrollRecord.payroll_period_id)
+            .where(PayrollRecord.employee_id == employee_id, PayrollPeriod.label == period_label)
+            .limit(1)
+        )
+        is not None
+    )
+
+
+def _duplicate_record():
+    return (
+        jsonify(
+            {
+                "error": "Payroll record already exists for this employee and period; "
+                "use POST /api/payroll-records/batch to correct it"
+            }
+        ),
+        409,
+    )
+
+
+def _tax_basis(payload) -> tuple[float | None, str | None, str | None]:
+    """Return ``(tax_rate, tax_schedule, error)``; exactly one of the first two is set."""
+    tax_schedule = payload.get("tax_schedule")
+    if tax_schedule:
+        return None, str(tax_schedule), None
+    if "tax_rate" not in payload:
+        return None, None, "Missing fields: tax_rate or tax_schedule"
+    tax_rate = float(payload["tax_rate"])
+    if not 0 <= tax_rate <= 1:
+        return None, None, "Tax rate must be between 0 and 1"
+    return tax_rate, None, None
+
+
 @payroll_bp.get("/api/payroll-records")
+@conditional("payroll_records", "employees", "departments", "payroll_periods", "period_archives")
 def list_payroll_records():
-    employee_id = request.args.get("employee_id")
-    period_id = request.args.get("period_id")
+    """List records newest first, merging archived periods with live rows.
 
-    with session_scope() as session:
-        stmt = select(PayrollRecord).order_by(PayrollRecord.created_at.desc())
-        if employee_id:
-            stmt = stmt.where(PayrollRecord.employee_id == int(employee_id))
-        if period_id:
-            stmt = stmt.where(PayrollRecord.payroll_period_id == int(period_id))
+    ``?fields=`` and ``?format=columns`` shape the page (``backend.serializers``).
+    """
+    employee_id = request.args.get("employee_id", type=int)
+    period_id = request.args.get("period_id", type=int)
+    cursor = request.args.get("cursor")
+    keys = [(PayrollRecord.created_at, True), (PayrollRecord.id, True)]
 
-        records = session.scalars(stmt).unique().all()
-        return jsonify({"data": [record.to_dict() for record in records]})
+    try:
+        limit = page_limit(request.args.get("limit"))
+        projection = parse_projection(
+            request.args.get("fields"), request.args.get("format"), RECORD_FIELDS
+        )
+        with read_session_scope() as session:
+            stmt = payroll_record_rows(record_nested(projection))
+            if employee_id:
+                stmt = stmt.where(PayrollRecord.employee_id == employee_id)
+            if period_id:
+                stmt = stmt.where(PayrollRecord.payroll_period_id == period_id)
+            rows = session.execute(keyset_statement(stmt, keys, cursor, limit)).all()
+
+            archives = archive.archive_index(
+                session, g.table_versions.get(PeriodArchive.__tablename__)
+            )
+            if not archives:
+                records, next_cursor = keyset_result(rows, keys, limit)
+                data, included = payroll_record_page(records, projection)
+            else:
+                archived = archive.archived_candidates(
+                    archives, limit, cursor_keys(cursor, keys), employee_id, period_id
+                )
+                records, next_cursor = archive.merge_record_page(rows, archived, limit)
+                data, included = archive.record_page(session, records, projection)
+            return jsonify(page_response(data, limit, next_cursor, **included))
+    except (InvalidCursor, InvalidProjection) as exc:
+        return jsonify({"error": str(exc)}), 400
 
 
 @payroll_bp.get("/api/payroll-periods")
+@conditional("payroll_periods")
 def list_periods():
+    try:
+        limit = page_limit(request.args.get("limit"))
+        projection = parse_projection(
+            request.args.get("fields"), request.args.get("format"), PERIOD_FIELDS
+        )
+        with read_session_scope() as session:
+            periods, next_cursor = keyset_page(
+                session,
+                period_rows(),
+                [(PayrollPeriod.start_date, True), (PayrollPeriod.id, True)],
+                request.args.get("cursor"),
+                limit,
+            )
+            data = [period_dict(row) for row in periods]
+            return jsonify(
+                page_response(apply_projection(data, projection, PERIOD_FIELDS), limit, next_cursor)
+            )
+    except (InvalidCursor, InvalidProjection) as exc:
+        return jsonify({"error": str(exc)}), 400
+
+
+@payroll_bp.patch("/api/payroll-periods/<int:period_id>")
+def update_period(period_id: int):
+    """Move a period forward through OPEN → PROCESSED → PAID.
+
+    Paid periods are archived in the background when ``ARCHIVE_ON_PAID`` is
+    set and ``pyarrow`` is installed.
+    """
+    payload = request.get_json(force=True)
+    status = payload.get("status")
+    if status not in PAYROLL_STATUSES:
+        return jsonify({"error": f"Status must be one of {', '.join(PAYROLL_STATUSES)}"}), 400
+
     with session_scope() as session:
-        periods = session.scalars(
-            select(PayrollPeriod).order_by(PayrollPeriod.start_date.desc())
-        ).all()
-        return jsonify({"data": [period.to_dict() for period in periods]})
+        period = session.get(PayrollPeriod, period_id)
+        if not period:
+            return jsonify({"error": "Payroll period not found"}), 404
+        if session.get(PeriodArchive, period_id):
+            return jsonify({"error": "Payroll period is archived"}), 409
+        if PAYROLL_STATUSES.index(status) < PAYROLL_STATUSES.index(period.status):
+            return jsonify({"error": f"Cannot move a {period.status} period back to {status}"}), 409
+        period.status = status
+        session.flush()
+        data = period.to_dict()
+
+    if status == "PAID" and settings.archive_on_paid and archive.available():
+        threading.Thread(
+            target=archive.archive_in_background, args=(period_id,), daemon=True
+        ).start()
+        data["archive"] = "scheduled"
+    return jsonify({"message": "Payroll period updated", "data": data})
+
+
+@payroll_bp.get("/api/payroll-periods/<int:period_id>/archive")
+def get_period_archive(period_id: int):
+    with read_session_scope() as session:
+        archived = session.get(PeriodArchive, period_id)
+        if not archived:
+            return jsonify({"error": "Payroll period is not archived"}), 404
+        return jsonify({"data": archived.to_dict()})
 
 
 @payroll_bp.post("/api/payroll-records")
 def create_payroll_record():
+    # NumPy-backed modules load with the first write instead of at startup.
+    # pylint: disable=import-outside-toplevel
+    from backend.pay_calc import CENTS, HOURS_SCALE, check_fixed, compute_single
+    from backend.tax import compute_single_progressive, load_schedule
+
     payload = request.get_json(force=True)
     required = [
         "employee_id",
@@ -45,7 +222,6 @@ def create_payroll_record():
         "period_start",
         "period_end",
         "hours_worked",
-        "tax_rate",
     ]
     missing = [field for field in required if field not in payload]
     if missing:
@@ -60,14 +236,25 @@ def create_payroll_record():
     if end_date < start_date:
         return jsonify({"error": "End date must be after start date"}), 400
 
-    hours_worked = float(payload["hours_worked"])
-    tax_rate = float(payload["tax_rate"])
+    try:
+        hours_worked = float(payload["hours_worked"])
+        hourly_rate = float(payload.get("hourly_rate") or 0)
+        deductions = float(payload.get("other_deductions") or 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Hours, hourly rate and deductions must be numbers"}), 400
+    try:
+        check_fixed(hours_worked, HOURS_SCALE)
+        check_fixed(hourly_rate, CENTS)
+        check_fixed(deductions, CENTS)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     if hours_worked <= 0:
         return jsonify({"error": "Hours worked must be greater than zero"}), 400
-    if not 0 <= tax_rate <= 1:
-        return jsonify({"error": "Tax rate must be between 0 and 1"}), 400
-    hourly_rate = float(payload.get("hourly_rate", 0))
-    deductions = float(payload.get("other_deductions", 0))
+    tax_rate, tax_schedule, error = _tax_basis(payload)
+    if error:
+        return jsonify({"error": error}), 400
+    # Records without an explicit rate follow later base_rate changes.
+    explicit_rate = hourly_rate if hourly_rate > 0 else None
     notes = payload.get("notes")
 
     with session_scope() as session:
@@ -78,38 +265,51 @@ def create_payroll_record():
         if hourly_rate <= 0:
             hourly_rate = float(employee.base_rate)
 
-        period = (
-            session.execute(
-                select(PayrollPeriod).where(PayrollPeriod.label == payload["period_label"])
-            )
-            .scalars()
-            .first()
+        period = _get_or_create_period(
+            session, payload["period_label"], start_date, end_date
         )
-        if not period:
-            period = PayrollPeriod(
-                label=payload["period_label"],
-                start_date=start_date,
-                end_date=end_date,
-            )
-            session.add(period)
-            session.flush()
+        if period.status == "PAID" and session.get(PeriodArchive, period.id):
+            return jsonify({"error": "Payroll period is archived"}), 409
+        if _record_exists(session, employee.id, period.label):
+            return _duplicate_record()
 
-        gross_pay = hours_worked * hourly_rate
-        tax_amount = gross_pay * tax_rate
-        net_pay = gross_pay - tax_amount - deductions
+        if tax_schedule:
+            schedule = load_schedule(session, tax_schedule, period.end_date)
+            if schedule is None:
+                return jsonify({"error": f"No tax schedule '{tax_schedule}' in force"}), 404
+            ytd = session.get(YtdAccumulator, (employee.id, period.end_date.year))
+        try:
+            if tax_schedule:
+                pay = compute_single_progressive(
+                    hours_worked, hourly_rate, schedule, ytd.gross_cents if ytd else 0, deductions
+                )
+            else:
+                pay = compute_single(hours_worked, hourly_rate, tax_rate, deductions)
+        except ValueError as exc:
+            session.rollback()
+            return jsonify({"error": str(exc)}), 400
 
         record = PayrollRecord(
             employee=employee,
             payroll_period=period,
             hours_worked=hours_worked,
-            gross_pay=gross_pay,
-            tax_amount=tax_amount,
-            other_deductions=deductions,
-            net_pay=net_pay,
             notes=notes,
+            hourly_rate=explicit_rate,
+            tax_rate=tax_rate,
+            tax_schedule=tax_schedule,
+            **pay,
         )
         session.add(record)
-        session.flush()
+        employee_id, period_label = employee.id, period.label
+        try:
+            session.flush()
+        except IntegrityError:
+            # Only a record inserted concurrently is a conflict; other
+            # violations are bugs and surface as such.
+            session.rollback()
+            if _record_exists(session, employee_id, period_label):
+                return _duplicate_record()
+            raise
 
         return (
             jsonify({"message": "Payroll recorded", "data": record.to_dict()}),
@@ -117,23 +317,222 @@ def create_payroll_record():
         )
 
 
+@payroll_bp.post("/api/payroll-records/batch")
+def upsert_payroll_records():
+    """Insert or correct many records of a period, safely replayable by key."""
+    # pylint: disable=import-outside-toplevel
+    from backend.payroll_runs import parse_entries
+    from backend.record_upserts import (
+        IdempotencyConflict,
+        replayed_batch,
+        request_hash,
+        start_batch,
+        upsert_records,
+    )
+    from backend.tax import load_schedule
+
+    payload = request.get_json(force=True)
+    required = ["period_label", "period_start", "period_end", "entries"]
+    missing = [field for field in required if field not in payload]
+    if missing:
+        return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
+
+    try:
+        start_date = date.fromisoformat(payload["period_start"])
+        end_date = date.fromisoformat(payload["period_end"])
+    except ValueError:
+        return jsonify({"error": "Invalid date format, use YYYY-MM-DD"}), 400
+
+    if end_date < start_date:
+        return jsonify({"error": "End date must be after start date"}), 400
+
+    tax_rate, tax_schedule, error = _tax_basis(payload)
+    if error:
+        return jsonify({"error": error}), 400
+
+    key = request.headers.get("Idempotency-Key") or payload.get("idempotency_key")
+    if key is not None and (not isinstance(key, str) or not 0 < len(key) <= 128):
+        return jsonify({"error": "Idempotency key must be 1 to 128 characters"}), 400
+
+    entries, errors = parse_entries(payload["entries"])
+    if not entries:
+        return jsonify({"error": "No valid entries", "errors": errors}), 400
+
+    digest = request_hash(payload)
+    with session_scope() as session:
+        try:
+            replay = replayed_batch(session, key, digest)
+        except IdempotencyConflict as exc:
+            return jsonify({"error": str(exc)}), 409
+        if replay is not None:
+            response = jsonify({"message": "Batch already applied", "data": replay})
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+
+        period = _get_or_create_period(
+            session, payload["period_label"], start_date, end_date
+        )
+        if period.status != "OPEN":
+            return jsonify({"error": f"Payroll period is {period.status}"}), 409
+        if tax_schedule and load_schedule(session, tax_schedule, period.end_date) is None:
+            return jsonify({"error": f"No tax schedule '{tax_schedule}' in force"}), 404
+        period_id = period.id
+
+    try:
+        batch_id = start_batch(period_id, key, digest)
+    except IdempotencyConflict as exc:
+        return jsonify({"error": str(exc)}), 409
+
+    try:
+        summary = upsert_records(
+            batch_id,
+            period_id,
+            entries,
+            tax_rate=tax_rate,
+            tax_schedule=tax_schedule,
+            errors=errors,
+        )
+    except ValueError as exc:
+        # Figures too large for the pay kernel; the batch is marked FAILED.
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({"message": "Batch applied", "data": summary})
+
+
+@payroll_bp.post("/api/payroll-runs")
+def create_payroll_run():
+    """Compute every payroll record of a period in one set-based pass.
+
+    With ``"background": true`` the run is queued as a ``payroll_run`` job
+    instead and the response is ``202`` with the job to poll.
+    """
+    # pylint: disable=import-outside-toplevel
+    from backend.payroll_runs import execute_payroll_run, parse_entries
+    from backend.tax import load_schedule
+
+    payload = request.get_json(force=True)
+    required = ["period_label", "period_start", "period_end"]
+    missing = [field for field in required if field not in payload]
+    if missing:
+        return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
+
+    try:
+        start_date = date.fromisoformat(payload["period_start"])
+        end_date = date.fromisoformat(payload["period_end"])
+    except ValueError:
+        return jsonify({"error": "Invalid date format, use YYYY-MM-DD"}), 400
+
+    if end_date < start_date:
+        return jsonify({"error": "End date must be after start date"}), 400
+
+    tax_rate, tax_schedule, error = _tax_basis(payload)
+    if error:
+        return jsonify({"error": error}), 400
+
+    default_hours = payload.get("default_hours")
+    if default_hours is not None:
+        default_hours = float(default_hours)
+        if default_hours <= 0:
+            return jsonify({"error": "Default hours must be greater than zero"}), 400
+
+    entries, errors = parse_entries(payload.get("entries", []))
+    if not entries and default_hours is None:
+        return jsonify({"error": "Provide entries or default_hours", "errors": errors}), 400
+
+    with session_scope() as session:
+        period = _get_or_create_period(
+            session, payload["period_label"], start_date, end_date
+        )
+        if period.status != "OPEN":
+            return jsonify({"error": f"Payroll period is {period.status}"}), 409
+        if tax_schedule and load_schedule(session, tax_schedule, period.end_date) is None:
+            return jsonify({"error": f"No tax schedule '{tax_schedule}' in force"}), 404
+        period_id = period.id
+
+    if payload.get("background"):
+        job = jobs.enqueue(
+            "payroll_run",
+            {
+                "period_id": period_id,
+                "entries": payload.get("entries", []),
+                "tax_rate": tax_rate,
+                "default_hours": default_hours,
+                "tax_schedule": tax_schedule,
+            },
+        )
+        response = jsonify({"message": "Payroll run queued", "data": job})
+        response.headers["Location"] = f"/api/jobs/{job['id']}"
+        return response, 202
+
+    try:
+        summary = execute_payroll_run(
+            period_id,
+            entries,
+            tax_rate=tax_rate,
+            default_hours=default_hours,
+            tax_schedule=tax_schedule,
+        )
+    except ValueError as exc:
+        # Figures too large for the pay kernel; the run is marked FAILED.
+        return jsonify({"error": str(exc)}), 400
+    summary["errors"] = errors + summary["errors"]
+    return jsonify({"message": "Payroll run completed", "data": summary}), 201
+
+
+@payroll_bp.get("/api/payroll-runs/<int:run_id>")
+def get_payroll_run(run_id: int):
+    with read_session_scope() as session:
+        run = session.get(PayrollRun, run_id)
+        if not run:
+            return jsonify({"error": "Payroll run not found"}), 404
+        return jsonify({"data": run.to_dict()})
+
+
+@payroll_bp.get("/api/payroll-periods/<int:period_id>/totals")
+@conditional("payroll_records", "payroll_periods")
+def period_totals(period_id: int):
+    with read_session_scope() as session:
+        totals = session.get(PeriodTotal, period_id)
+        if not totals:
+            return jsonify({"error": "Payroll period not found"}), 404
+        return jsonify({"data": totals.to_dict()})
+
+
+@payroll_bp.get("/api/payroll-periods/<int:period_id>/register.<fmt>")
+def export_period_register(period_id: int, fmt: str):
+    """Stream every record of a period as CSV, NDJSON or Parquet."""
+    if fmt not in FORMATS:
+        return jsonify({"error": f"Format must be one of {', '.join(FORMATS)}"}), 400
+    with read_session_scope() as session:
+        period = session.get(PayrollPeriod, period_id)
+        if not period:
+            return jsonify({"error": "Payroll period not found"}), 404
+        filename = secure_filename(f"payroll-register-{period.label}.{fmt}")
+
+    try:
+        chunks = export_register(period_id, fmt)
+    except ExportUnavailable as exc:
+        return jsonify({"error": str(exc)}), 501
+
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if "gzip" in request.headers.get("Accept-Encoding", "") and fmt != "parquet":
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return Response(stream_with_context(chunks), mimetype=FORMATS[fmt], headers=headers)
+
+
 @payroll_bp.get("/api/summary")
+@conditional("payroll_records", "employees", "departments", "payroll_periods")
 def payroll_summary():
     """Provide aggregate data for the dashboard cards."""
-    with session_scope() as session:
-        total_employees = session.scalar(select(func.count(Employee.id))) or 0
-        total_departments = session.scalar(select(func.count(Department.id))) or 0
-        total_payroll = session.scalar(
-            select(func.coalesce(func.sum(PayrollRecord.net_pay), 0))
-        ) or 0
-        processed_periods = session.scalar(select(func.count(PayrollPeriod.id))) or 0
+    with read_session_scope() as session:
+        counters = session.get(SummaryCounter, SUMMARY_ID)
 
         return jsonify(
             {
-                "totalEmployees": total_employees,
-                "totalDepartments": total_departments,
-                "totalNetPay": float(total_payroll or 0),
-                "periods": processed_periods,
+                "totalEmployees": counters.total_employees,
+                "totalDepartments": counters.total_departments,
+                "totalNetPay": counters.net_cents / 100,
+                "periods": counters.total_periods,
             }
         )
-
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from flask import Blueprint, jsonify, request, send_file
+
+from backend.database import session_scope
+from backend.models import PAYSLIP_FORMATS, PAYSLIP_OUTPUTS, PayrollPeriod, PayslipBatch
+from backend.payslips import batch_state, queue_batch
+
+payslips_bp = Blueprint("payslips", __name__)
+
+
+@payslips_bp.post("/api/payroll-periods/<int:period_id>/payslips")
+def create_payslip_batch(period_id: int):
+    """Queue rendering of the payslips of a period for ``python -m backend.worker``."""
+    payload = request.get_json(silent=True) or {}
+    fmt = payload.get("format", "both")
+    output = payload.get("output", "zip")
+    if fmt not in PAYSLIP_FORMATS:
+        return jsonify({"error": f"Format must be one of {', '.join(PAYSLIP_FORMATS)}"}), 400
+    if output not in PAYSLIP_OUTPUTS:
+        return jsonify({"error": f"Output must be one of {', '.join(PAYSLIP_OUTPUTS)}"}), 400
+
+    with session_scope() as session:
+        if not session.get(PayrollPeriod, period_id):
+            return jsonify({"error": "Payroll period not found"}), 404
+
+    batch = queue_batch(period_id, fmt, output)
+    return jsonify({"message": "Payslip rendering queued", "data": batch}), 202
+
+
+@payslips_bp.get("/api/payslip-batches/<int:batch_id>")
+def get_payslip_batch(batch_id: int):
+    """Report progress of a payslip batch."""
+    with session_scope() as session:
+        batch = session.get(PayslipBatch, batch_id)
+        if not batch:
+            return jsonify({"error": "Payslip batch not found"}), 404
+        return jsonify({"data": batch_state(session, batch)})
+
+
+@payslips_bp.get("/api/payslip-batches/<int:batch_id>/download")
+def download_payslip_batch(batch_id: int):
+    with session_scope() as session:
+        batch = session.get(PayslipBatch, batch_id)
+        if not batch:
+            return jsonify({"error": "Payslip batch not found"}), 404
+        if batch.status != "COMPLETED":
+            return jsonify({"error": f"Payslip batch is {batch.status}"}), 409
+        if batch.output != "zip":
+            return jsonify({"error": f"Payslips were written to {batch.path}"}), 409
+        path = Path(batch.path)
+
+    return send_file(path, mimetype="application/zip", as_attachment=True, download_name=path.name)
@@ -0,0 +1,75 @@
+from datetime import date
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+
+from backend.database import read_session_scope, session_scope
+from backend.models import Employee, TaxBracket, TaxSchedule, YtdAccumulator
+
+tax_bp = Blueprint("tax", __name__)
+
+
+@tax_bp.get("/api/tax-schedules")
+def list_tax_schedules():
+    with read_session_scope() as session:
+        schedules = session.scalars(
+            select(TaxSchedule)
+            .options(selectinload(TaxSchedule.brackets))
+            .order_by(TaxSchedule.name, TaxSchedule.effective_from.desc())
+        )
+        return jsonify({"data": [schedule.to_dict() for schedule in schedules]})
+
+
+@tax_bp.post("/api/tax-schedules")
+def create_tax_schedule():
+    """Publish a new version of a bracket schedule; versions are immutable."""
+    from backend.tax import parse_brackets  # pylint: disable=import-outside-toplevel
+
+    payload = request.get_json(force=True)
+    name = (payload.get("name") or "").strip()
+    if not name or "effective_from" not in payload:
+        return jsonify({"error": "Missing fields: name, effective_from"}), 400
+    try:
+        effective_from = date.fromisoformat(payload["effective_from"])
+    except ValueError:
+        return jsonify({"error": "Invalid date format, use YYYY-MM-DD"}), 400
+    try:
+        brackets = parse_brackets(payload.get("brackets") or [])
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    with session_scope() as session:
+        schedule = TaxSchedule(
+            name=name,
+            effective_from=effective_from,
+            brackets=[TaxBracket(lower_bound=bound, rate=rate) for bound, rate in brackets],
+        )
+        session.add(schedule)
+        try:
+            session.flush()
+        except IntegrityError:
+            session.rollback()
+            return jsonify({"error": "This schedule version already exists"}), 409
+
+        return jsonify({"message": "Tax schedule created", "data": schedule.to_dict()}), 201
+
+
+@tax_bp.get("/api/employees/<int:employee_id>/ytd")
+def employee_ytd(employee_id: int):
+    year = request.args.get("year", type=int) or date.today().year
+    with read_session_scope() as session:
+        if not session.get(Employee, employee_id):
+            return jsonify({"error": "Employee not found"}), 404
+        totals = session.get(YtdAccumulator, (employee_id, year))
+        if totals is None:
+            totals = YtdAccumulator(
+                employee_id=employee_id,
+                tax_year=year,
+                record_count=0,
+                gross_cents=0,
+                tax_cents=0,
+                net_cents=0,
+            )
+        return jsonify({"data": totals.to_dict()})
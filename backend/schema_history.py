@@ -0,0 +1,352 @@
+"""Tables as the migrations of ``backend.migrations`` first created them.
+
+A migration must do the same thing however late it runs, so steps that
+create tables build these frozen definitions instead of the current models.
+A database migrated from scratch then passes through exactly the schemas
+an older one did, and later migrations find what they expect. Never edit
+these tables; change the schema with a new migration instead.
+"""
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    CheckConstraint,
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    Text,
+    UniqueConstraint,
+)
+
+metadata = MetaData()
+
+# Migration 1: the baseline schema.
+department_totals = Table(
+    "department_totals",
+    metadata,
+    Column("department_id", Integer, primary_key=True),
+    Column("employee_count", Integer, nullable=False),
+)
+
+departments = Table(
+    "departments",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(100), nullable=False, unique=True),
+    Column("description", String(255)),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False, index=True),
+)
+
+employees = Table(
+    "employees",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("first_name", String(80), nullable=False),
+    Column("last_name", String(80), nullable=False),
+    Column("email", String(120), nullable=False, unique=True),
+    Column("base_rate", Numeric(10, 2), nullable=False),
+    Column("department_id", Integer, ForeignKey("departments.id"), nullable=False),
+    Column("hire_date", Date, nullable=False),
+    Column("employment_type", Enum("FULL_TIME", "PART_TIME", "CONTRACT"), nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False, index=True),
+    Index(
+        "ft_employees_search",
+        "first_name",
+        "last_name",
+        "email",
+        mysql_prefix="FULLTEXT",
+    ).ddl_if(dialect="mysql"),
+    Index("ix_employees_department_last_name", "department_id", "last_name", "id"),
+    Index("ix_employees_last_name_id", "last_name", "id"),
+)
+
+payroll_periods = Table(
+    "payroll_periods",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("label", String(100), nullable=False, unique=True),
+    Column("start_date", Date, nullable=False),
+    Column("end_date", Date, nullable=False),
+    Column("status", Enum("OPEN", "PROCESSED", "PAID"), nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False, index=True),
+    CheckConstraint("end_date >= start_date", name="ck_period_dates"),
+    Index("ix_payroll_periods_start_date_id", "start_date", "id"),
+)
+
+payroll_records = Table(
+    "payroll_records",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("employee_id", Integer, ForeignKey("employees.id"), nullable=False),
+    Column("payroll_period_id", Integer, ForeignKey("payroll_periods.id"), nullable=False),
+    Column("hours_worked", Float, nullable=False),
+    Column("gross_pay", Numeric(12, 2), nullable=False),
+    Column("tax_amount", Numeric(12, 2), nullable=False),
+    Column("other_deductions", Numeric(12, 2)),
+    Column("net_pay", Numeric(12, 2), nullable=False),
+    Column("notes", Text),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False, index=True),
+    UniqueConstraint("employee_id", "payroll_period_id", name="uq_employee_period"),
+    Index("ix_payroll_records_created_id", "created_at", "id"),
+    Index("ix_payroll_records_employee_created", "employee_id", "created_at", "id"),
+    Index("ix_payroll_records_period_created", "payroll_period_id", "created_at", "id"),
+)
+
+payroll_runs = Table(
+    "payroll_runs",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("payroll_period_id", Integer, ForeignKey("payroll_periods.id"), nullable=False),
+    Column("status", Enum("RUNNING", "COMPLETED", "FAILED"), nullable=False),
+    Column("records_created", Integer, nullable=False),
+    Column("records_skipped", Integer, nullable=False),
+    Column("total_gross", Numeric(14, 2), nullable=False),
+    Column("total_tax", Numeric(14, 2), nullable=False),
+    Column("total_deductions", Numeric(14, 2), nullable=False),
+    Column("total_net", Numeric(14, 2), nullable=False),
+    Column("error", Text),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False, index=True),
+)
+
+payslip_batches = Table(
+    "payslip_batches",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("payroll_period_id", Integer, ForeignKey("payroll_periods.id"), nullable=False),
+    Column("status", Enum("RUNNING", "COMPLETED", "FAILED"), nullable=False),
+    Column("format", Enum("html", "pdf", "both"), nullable=False),
+    Column("output", Enum("zip", "directory"), nullable=False),
+    Column("total", Integer, nullable=False),
+    Column("rendered", Integer, nullable=False),
+    Column("path", String(255)),
+    Column("error", Text),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False, index=True),
+)
+
+period_archives = Table(
+    "period_archives",
+    metadata,
+    Column("payroll_period_id", Integer, ForeignKey("payroll_periods.id"), primary_key=True),
+    Column("path", String(255), nullable=False),
+    Column("record_count", Integer, nullable=False),
+    Column("gross_cents", BigInteger, nullable=False),
+    Column("tax_cents", BigInteger, nullable=False),
+    Column("deduction_cents", BigInteger, nullable=False),
+    Column("net_cents", BigInteger, nullable=False),
+    Column("min_created_at", DateTime(timezone=True)),
+    Column("max_created_at", DateTime(timezone=True)),
+    Column("archived_at", DateTime(timezone=True), nullable=False),
+)
+
+period_totals = Table(
+    "period_totals",
+    metadata,
+    Column("payroll_period_id", Integer, primary_key=True),
+    Column("record_count", Integer, nullable=False),
+    Column("gross_cents", BigInteger, nullable=False),
+    Column("tax_cents", BigInteger, nullable=False),
+    Column("deduction_cents", BigInteger, nullable=False),
+    Column("net_cents", BigInteger, nullable=False),
+)
+
+schema_version = Table(
+    "schema_version",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+summary_counters = Table(
+    "summary_counters",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("total_employees", Integer, nullable=False),
+    Column("total_departments", Integer, nullable=False),
+    Column("total_periods", Integer, nullable=False),
+    Column("total_records", Integer, nullable=False),
+    Column("gross_cents", BigInteger, nullable=False),
+    Column("tax_cents", BigInteger, nullable=False),
+    Column("deduction_cents", BigInteger, nullable=False),
+    Column("net_cents", BigInteger, nullable=False),
+)
+
+table_versions = Table(
+    "table_versions",
+    metadata,
+    Column("table_name", String(64), primary_key=True),
+    Column("version", BigInteger, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+tax_brackets = Table(
+    "tax_brackets",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("schedule_id", Integer, ForeignKey("tax_schedules.id"), nullable=False),
+    Column("lower_bound", Numeric(14, 2), nullable=False),
+    Column("rate", Numeric(7, 6), nullable=False),
+    UniqueConstraint("schedule_id", "lower_bound", name="uq_tax_bracket_bound"),
+    CheckConstraint("rate >= 0 AND rate <= 1", name="ck_tax_bracket_rate"),
+)
+
+tax_schedules = Table(
+    "tax_schedules",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("effective_from", Date, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False, index=True),
+    UniqueConstraint("name", "effective_from", name="uq_tax_schedule_version"),
+)
+
+tombstones = Table(
+    "tombstones",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("table_name", String(64), nullable=False),
+    Column("row_id", Integer, nullable=False),
+    Column("deleted_at", DateTime(timezone=True), nullable=False, index=True),
+)
+
+ytd_accumulators = Table(
+    "ytd_accumulators",
+    metadata,
+    Column("employee_id", Integer, primary_key=True),
+    Column("tax_year", Integer, primary_key=True),
+    Column("record_count", Integer, nullable=False),
+    Column("gross_cents", BigInteger, nullable=False),
+    Column("tax_cents", BigInteger, nullable=False),
+    Column("net_cents", BigInteger, nullable=False),
+    Index("ix_ytd_accumulators_year_employee", "tax_year", "employee_id"),
+)
+
+BASELINE_TABLES = tuple(metadata.sorted_tables)
+
+# Tables with a ``table_versions`` row (``backend.versions``).
+VERSIONED_TABLES = (
+    "departments",
+    "employees",
+    "payroll_periods",
+    "payroll_records",
+    "period_archives",
+)
+
+# SQLite only: the FTS5 index of employee names and emails (``backend.search``)
+# and the triggers that keep it in sync with ``employees``.
+SQLITE_SEARCH_TABLE = "employees_fts"
+SQLITE_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE employees_fts USING fts5(
+        first_name, last_name, email,
+        content='employees', content_rowid='id',
+        tokenize='unicode61', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS employees_fts_ai AFTER INSERT ON employees BEGIN
+        INSERT INTO employees_fts(rowid, first_name, last_name, email)
+        VALUES (new.id, new.first_name, new.last_name, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS employees_fts_ad AFTER DELETE ON employees BEGIN
+        INSERT INTO employees_fts(employees_fts, rowid, first_name, last_name, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS employees_fts_au AFTER UPDATE ON employees BEGIN
+        INSERT INTO employees_fts(employees_fts, rowid, first_name, last_name, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+        INSERT INTO employees_fts(rowid, first_name, last_name, email)
+        VALUES (new.id, new.first_name, new.last_name, new.email);
+    END
+    """,
+    "INSERT INTO employees_fts(employees_fts) VALUES ('rebuild')",
+)
+
+# Migration 2.
+upsert_batches = Table(
+    "upsert_batches",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("idempotency_key", String(128), unique=True),
+    Column("request_hash", String(64), nullable=False),
+    Column("payroll_period_id", Integer, ForeignKey("payroll_periods.id"), nullable=False),
+    Column("status", Enum("RUNNING", "COMPLETED", "FAILED"), nullable=False),
+    Column("records_inserted", Integer, nullable=False),
+    Column("records_updated", Integer, nullable=False),
+    Column("records_unchanged", Integer, nullable=False),
+    Column("errors", Text),
+    Column("error", Text),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False, index=True),
+)
+
+# Migration 3.
+jobs = Table(
+    "jobs",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("kind", String(50), nullable=False),
+    Column("payload", Text, nullable=False),
+    Column("status", Enum("QUEUED", "RUNNING", "COMPLETED", "FAILED", "CANCELLED"), nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("max_attempts", Integer, nullable=False),
+    Column("run_after", DateTime(timezone=True), nullable=False),
+    Column("locked_by", String(64)),
+    Column("locked_at", DateTime(timezone=True)),
+    Column("cancel_requested", Boolean, nullable=False),
+    Column("progress_done", Integer, nullable=False),
+    Column("progress_total", Integer, nullable=False),
+    Column("result", Text),
+    Column("error", Text),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False, index=True),
+    Index("ix_jobs_status_run_after", "status", "run_after", "id"),
+)
+
+# Migration 4.
+period_department_rollups = Table(
+    "period_department_rollups",
+    metadata,
+    Column(
+        "payroll_period_id",
+        Integer,
+        ForeignKey("payroll_periods.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("department_id", Integer, primary_key=True),
+    Column("record_count", Integer, nullable=False),
+    Column("gross_cents", BigInteger, nullable=False),
+    Column("tax_cents", BigInteger, nullable=False),
+    Column("deduction_cents", BigInteger, nullable=False),
+    Column("net_cents", BigInteger, nullable=False),
+)
+
+# Migration 5: columns added to payroll_records.
+record_pay_inputs = (
+    Column("hourly_rate", Numeric(10, 2)),
+    Column("tax_rate", Numeric(7, 6)),
+    Column("tax_schedule", String(100)),
+)
+
+# Migration 7: column added to payslip_batches.
+payslip_batch_job = (Column("job_id", Integer),)
@@ -0,0 +1,70 @@
+"""Employee search executed inside the database.
+
+On SQLite the ``employees_fts`` FTS5 table indexes first name, last name and
+email. It is an external-content table, so triggers keep it in sync with
+``employees`` whether rows are written through the ORM or bulk statements;
+migration 1 creates both (``backend.schema_history``). MySQL uses the ``ft_employees_search`` FULLTEXT index declared on the model,
+and other backends fall back to prefix ``LIKE`` matching.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import List
+
+from sqlalchemy import and_, column, literal_column, or_, table
+from sqlalchemy.sql import Select
+
+from .models import Employee
+
+FTS_TABLE = "employees_fts"
+
+_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+
+
+def tokenize(term: str) -> List[str]:
+    """Split a search box value into lowercase word tokens."""
+    return re.findall(r"\w+", term.lower())
+
+
+def apply_search(stmt: Select, dialect_name: str, term: str) -> Select | None:
+    """Filter and rank an employee ``stmt`` by ``term``; ``None`` if it is blank.
+
+    Every token must match as a word prefix of the first name, last name or
+    email, so typing ``"ava lo"`` finds *Ava Lopez*.
+    """
+    tokens = tokenize(term)
+    if not tokens:
+        return None
+
+    if dialect_name == "sqlite":
+        query = " ".join(f'"{token}"*' for token in tokens)
+        return (
+            stmt.join(_fts, _fts.c.rowid == Employee.id)
+            .where(literal_column(FTS_TABLE).op("MATCH")(query))
+            .order_by(_fts.c.rank, Employee.id)
+        )
+
+    if dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import match  # pylint: disable=import-outside-toplevel
+
+        relevance = match(
+            Employee.first_name,
+            Employee.last_name,
+            Employee.email,
+            against=" ".join(f"+{token}*" for token in tokens),
+        ).in_boolean_mode()
+        return stmt.where(relevance).order_by(relevance.desc(), Employee.id)
+
+    return stmt.where(
+        and_(
+            *(
+                or_(
+                    Employee.first_name.ilike(f"{token}%"),
+                    Employee.last_name.ilike(f"{token}%"),
+                    Employee.email.ilike(f"{token}%"),
+                )
+                for token in tokens
+            )
+        )
+    ).order_by(Employee.last_name, Employee.id)
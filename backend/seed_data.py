@@ -1,9 +1,19 @@
+"""Seed the database with demo data or a large synthetic data set.
+
+Usage::
+
+    python -m backend.seed_data                      # three demo employees
+    python -m backend.seed_data --employees 100000 --departments 40 --periods 26 --seed 7
+"""
+
+import argparse
 from datetime import date
 
 from sqlalchemy import func, select
 
 from backend.database import init_db, session_scope
 from backend.models import Department, Employee, PayrollPeriod, PayrollRecord
+from backend.synthetic import generate
 
 
 def seed():
@@ -73,6 +83,7 @@ def seed():
                 other_deductions=500,
                 net_pay=12940,
                 notes="Includes gadget allowance",
+                tax_rate=0.2,
             ),
             PayrollRecord(
                 employee_id=employees[1].id,
@@ -83,6 +94,7 @@ def seed():
                 other_deductions=300,
                 net_pay=11252,
                 notes="Standard payout",
+                tax_rate=0.2,
             ),
         ]
         session.add_all(sample_records)
@@ -90,6 +102,29 @@ def seed():
         print("Database seeded with demo data.")
 
 
+def seed_synthetic(departments: int, employees: int, periods: int, seed_value: int) -> None:
+    init_db()
+    try:
+        report = generate(departments, employees, periods, seed=seed_value)
+    except ValueError:
+        print("Database already seeded.")
+        return
+    print(
+        f"Generated {report.departments} departments, {report.employees} employees, "
+        f"{report.periods} periods and {report.records} payroll records "
+        f"in {report.seconds:.1f}s."
+    )
+
+
 if __name__ == "__main__":
-    seed()
+    parser = argparse.ArgumentParser(description="Seed the payroll database.")
+    parser.add_argument("--employees", type=int, help="generate this many synthetic employees")
+    parser.add_argument("--departments", type=int, default=10)
+    parser.add_argument("--periods", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if args.employees:
+        seed_synthetic(args.departments, args.employees, args.periods, args.seed)
+    else:
+        seed()
 
@@ -0,0 +1,321 @@
+"""Projection queries and row serializers for list responses.
+
+The model ``to_dict`` methods walk relationships, which costs one lazy load
+per related object when used over a list. The statements here select exactly
+the columns a list response needs, joining related tables and the counter
+tables maintained by ``backend.counters``, so a page is built from a single
+query. The dict shapes match the ``to_dict`` output of the models.
+
+List endpoints also accept ``?fields=`` (a projection, with ``employee.x``
+style names for the nested objects of a record) and ``?format=columns``
+(one array per field instead of one object per row). ``parse_projection``
+reads both and ``apply_projection`` shapes a list of dicts accordingly.
+Record pages are built column by column by ``payroll_record_page``, which
+serializes each employee and period once per page; in the columnar shape
+they are returned once, in ``employees`` and ``periods``, instead of
+nested in every record.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import Select
+
+from .models import Department, DepartmentTotal, Employee, PayrollPeriod, PayrollRecord
+
+_EMPLOYEE_COLUMNS = (
+    "id",
+    "first_name",
+    "last_name",
+    "email",
+    "base_rate",
+    "department_id",
+    "employment_type",
+    "hire_date",
+)
+_PERIOD_COLUMNS = ("id", "label", "start_date", "end_date", "status")
+
+DEPARTMENT_FIELDS = ("id", "name", "description", "employee_count")
+EMPLOYEE_FIELDS = (
+    "id",
+    "first_name",
+    "last_name",
+    "full_name",
+    "email",
+    "base_rate",
+    "department",
+    "department_id",
+    "employment_type",
+    "hire_date",
+)
+PERIOD_FIELDS = _PERIOD_COLUMNS
+RECORD_FIELDS = (
+    "id",
+    "employee",
+    "employee_id",
+    "payroll_period_id",
+    "period",
+    "hours_worked",
+    "gross_pay",
+    "tax_amount",
+    "other_deductions",
+    "net_pay",
+    "notes",
+    "created_at",
+)
+_NESTED_FIELDS = {"employee": EMPLOYEE_FIELDS, "period": PERIOD_FIELDS}
+FORMATS = ("rows", "columns")
+
+
+class InvalidProjection(ValueError):
+    """Raised for a ``fields=`` or ``format=`` parameter a list cannot honour."""
+
+
+class Projection(NamedTuple):
+    """The fields to return, in order, and whether as columns.
+
+    ``fields`` maps each name to ``None`` for the whole value or to the
+    subset of a nested object's fields; ``None`` selects every field.
+    """
+
+    fields: Dict[str, Tuple[str, ...] | None] | None = None
+    columns: bool = False
+
+
+def parse_projection(
+    fields: str | None, response_format: str | None, available: Sequence[str]
+) -> Projection:
+    """Read ``?fields=`` and ``?format=`` for a list of ``available`` fields."""
+    if response_format not in (None, *FORMATS):
+        raise InvalidProjection(f"format must be one of {', '.join(FORMATS)}")
+    selected: Dict[str, Tuple[str, ...] | None] = {}
+    for name in (fields or "").split(","):
+        name = name.strip()
+        if not name:
+            continue
+        parent, _, child = name.partition(".")
+        if parent not in available or (child and child not in _NESTED_FIELDS.get(parent, ())):
+            raise InvalidProjection(f"Unknown field '{name}'")
+        if not child:
+            selected[parent] = None
+        elif selected.get(parent, ()) is not None:
+            selected[parent] = (*selected.get(parent, ()), child)
+    return Projection(selected or None, response_format == "columns")
+
+
+def _pick(value: Dict | None, names: Tuple[str, ...] | None) -> Dict | None:
+    if names is None or value is None:
+        return value
+    return {name: value[name] for name in names}
+
+
+def apply_projection(
+    data: List[Dict], projection: Projection, available: Sequence[str]
+) -> List[Dict] | Dict[str, List]:
+    """Shape serialized rows as ``projection`` asks."""
+    fields = projection.fields
+    if fields is not None:
+        data = [{name: _pick(item[name], fields[name]) for name in fields} for item in data]
+    if not projection.columns:
+        return data
+    return {name: [item[name] for item in data] for name in (fields or available)}
+
+
+def department_rows() -> Select:
+    return select(
+        Department.id,
+        Department.name,
+        Department.description,
+        func.coalesce(DepartmentTotal.employee_count, 0).label("employee_count"),
+    ).outerjoin(DepartmentTotal, DepartmentTotal.department_id == Department.id)
+
+
+def department_dict(row: Row) -> Dict:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "description": row.description,
+        "employee_count": row.employee_count,
+    }
+
+
+def employee_rows() -> Select:
+    return select(
+        *(getattr(Employee, name) for name in _EMPLOYEE_COLUMNS),
+        Department.name.label("department"),
+    ).outerjoin(Department, Employee.department_id == Department.id)
+
+
+def employee_dict(row: Row, prefix: str = "") -> Dict:
+    values = row._mapping
+    first_name = values[f"{prefix}first_name"]
+    last_name = values[f"{prefix}last_name"]
+    return {
+        "id": values[f"{prefix}id"],
+        "first_name": first_name,
+        "last_name": last_name,
+        "full_name": f"{first_name} {last_name}",
+        "email": values[f"{prefix}email"],
+        "base_rate": float(values[f"{prefix}base_rate"]),
+        "department": values[f"{prefix}department"],
+        "department_id": values[f"{prefix}department_id"],
+        "employment_type": values[f"{prefix}employment_type"],
+        "hire_date": values[f"{prefix}hire_date"].isoformat(),
+    }
+
+
+def period_rows() -> Select:
+    return select(*(getattr(PayrollPeriod, name) for name in _PERIOD_COLUMNS))
+
+
+def period_dict(row: Row, prefix: str = "") -> Dict:
+    values = row._mapping
+    return {
+        "id": values[f"{prefix}id"],
+        "label": values[f"{prefix}label"],
+        "start_date": values[f"{prefix}start_date"].isoformat(),
+        "end_date": values[f"{prefix}end_date"].isoformat(),
+        "status": values[f"{prefix}status"],
+    }
+
+
+def payroll_record_rows(nested: Sequence[str] = ("employee", "period")) -> Select:
+    """Records with the columns of the ``nested`` objects they serialize with."""
+    columns = [
+        PayrollRecord.id,
+        PayrollRecord.employee_id,
+        PayrollRecord.payroll_period_id,
+        PayrollRecord.hours_worked,
+        PayrollRecord.gross_pay,
+        PayrollRecord.tax_amount,
+        PayrollRecord.other_deductions,
+        PayrollRecord.net_pay,
+        PayrollRecord.notes,
+        PayrollRecord.created_at,
+    ]
+    if "employee" in nested:
+        columns += [
+            *(getattr(Employee, name).label(f"employee_{name}") for name in _EMPLOYEE_COLUMNS),
+            Department.name.label("employee_department"),
+        ]
+    if "period" in nested:
+        columns += [
+            getattr(PayrollPeriod, name).label(f"period_{name}") for name in _PERIOD_COLUMNS
+        ]
+    return (
+        select(*columns)
+        .join(Employee, PayrollRecord.employee_id == Employee.id)
+        .outerjoin(Department, Employee.department_id == Department.id)
+        .join(PayrollPeriod, PayrollRecord.payroll_period_id == PayrollPeriod.id)
+    )
+
+
+def payroll_record_dict(row: Row) -> Dict:
+    return {
+        "id": row.id,
+        "employee": employee_dict(row, prefix="employee_"),
+        "employee_id": row.employee_id,
+        "payroll_period_id": row.payroll_period_id,
+        "period": period_dict(row, prefix="period_"),
+        "hours_worked": row.hours_worked,
+        "gross_pay": float(row.gross_pay),
+        "tax_amount": float(row.tax_amount),
+        "other_deductions": float(row.other_deductions or 0),
+        "net_pay": float(row.net_pay),
+        "notes": row.notes,
+        "created_at": row.created_at.isoformat(),
+    }
+
+
+def _money(value) -> float:
+    return float(value or 0)
+
+
+def _isoformat(value) -> str:
+    return value.isoformat()
+
+
+# Converters of the scalar record fields, which live rows and archived
+# records expose under the same attribute names.
+_RECORD_VALUES: Dict[str, Callable[[Any], Any] | None] = {
+    "id": None,
+    "employee_id": None,
+    "payroll_period_id": None,
+    "hours_worked": None,
+    "gross_pay": float,
+    "tax_amount": float,
+    "other_deductions": _money,
+    "net_pay": float,
+    "notes": None,
+    "created_at": _isoformat,
+}
+# Nested objects: (id attribute, column prefix in payroll_record_rows, serializer).
+_RECORD_NESTED = {
+    "employee": ("employee_id", "employee_", employee_dict),
+    "period": ("payroll_period_id", "period_", period_dict),
+}
+
+
+def record_nested(projection: Projection) -> Tuple[str, ...]:
+    """The nested objects of a record ``projection`` selects."""
+    fields = projection.fields
+    return tuple(name for name in _RECORD_NESTED if fields is None or name in fields)
+
+
+def _record_columns(items: Sequence, names: Sequence[str]) -> Dict[str, List]:
+    if items and all(isinstance(item, Row) for item in items):
+        # Transposing the row tuples is much cheaper than an attribute lookup per cell.
+        transposed = list(zip(*items))
+        positions = {name: index for index, name in enumerate(items[0]._fields)}
+        raw = {name: transposed[positions[name]] for name in names}
+    else:
+        raw = {name: [getattr(item, name) for item in items] for name in names}
+    columns = {}
+    for name, column in raw.items():
+        convert = _RECORD_VALUES[name]
+        columns[name] = list(column) if convert is None else [convert(value) for value in column]
+    return columns
+
+
+def payroll_record_page(
+    items: Sequence,
+    projection: Projection = Projection(),
+    known: Dict[str, Dict[int, Dict]] | None = None,
+) -> Tuple[List[Dict] | Dict[str, List], Dict[str, List[Dict]]]:
+    """Serialize a page of records as ``projection`` asks.
+
+    ``items`` are ``payroll_record_rows`` rows or archived records; the
+    employees and periods of the latter are taken from ``known``
+    (``{"employee": {id: dict}, "period": {id: dict}}``). Returns the
+    ``data`` of the page and, for the columnar shape, the ``employees`` and
+    ``periods`` it references.
+    """
+    fields = projection.fields or dict.fromkeys(RECORD_FIELDS)
+    nested = [name for name in _RECORD_NESTED if name in fields]
+    scalars = [name for name in fields if name not in _RECORD_NESTED]
+    for name in nested:
+        if _RECORD_NESTED[name][0] not in scalars:
+            scalars.append(_RECORD_NESTED[name][0])
+    columns = _record_columns(items, scalars)
+
+    included = {}
+    for name in nested:
+        id_attribute, prefix, serialize = _RECORD_NESTED[name]
+        found = {
+            key: _pick(value, fields[name]) for key, value in (known or {}).get(name, {}).items()
+        }
+        for key, item in zip(columns[id_attribute], items):
+            if key not in found and isinstance(item, Row):
+                found[key] = _pick(serialize(item, prefix=prefix), fields[name])
+        if projection.columns:
+            referenced = dict.fromkeys(columns[id_attribute])
+            included[f"{name}s"] = [found[key] for key in referenced if key in found]
+        else:
+            columns[name] = [found.get(key) for key in columns[id_attribute]]
+
+    if projection.columns:
+        return {name: columns[name] for name in scalars}, included
+    return [dict(zip(fields, values)) for values in zip(*(columns[name] for name in fields))], {}
@@ -1,12 +1,23 @@
 const api = {
   employees: "/api/employees",
+  employeeSuggest: "/api/employees/suggest",
   departments: "/api/departments",
   payrollRecords: "/api/payroll-records",
   summary: "/api/summary",
+  changes: "/api/changes",
 };
 
+const PAGE_LIMIT = 50;
+// The server's largest page; the payroll form lists every employee.
+const OPTION_PAGE_LIMIT = 200;
+const SEARCH_DEBOUNCE_MS = 250;
+
 let departmentCache = [];
 let employeeCache = [];
+const employeePager = { cursor: null, search: "", loading: false };
+const payrollPager = { cursor: null, loading: false };
+let payrollCache = [];
+let syncCursor = null;
 
 const formatCurrency = (value) =>
   Number(value || 0).toLocaleString("en-PH", {
@@ -15,16 +26,76 @@ const formatCurrency = (value) =>
     minimumFractionDigits: 2,
   });
 
+// GET responses keyed by URL, revalidated with If-None-Match.
+const responseCache = new Map();
+
 async function fetchJSON(url, options = {}) {
+  const isGet = !options.method || options.method === "GET";
+  const cached = isGet ? responseCache.get(url) : undefined;
+  const headers = { "Content-Type": "application/json" };
+  if (cached) headers["If-None-Match"] = cached.etag;
+
   const response = await fetch(url, {
-    headers: { "Content-Type": "application/json" },
+    headers,
+    cache: "no-store",
     ...options,
   });
+  if (response.status === 304 && cached) {
+    return cached.body;
+  }
   if (!response.ok) {
     const error = await response.json().catch(() => ({}));
     throw new Error(error.error || "Something went wrong");
   }
-  return response.json();
+  const body = await response.json();
+  const etag = response.headers.get("ETag");
+  if (isGet && etag) {
+    responseCache.set(url, { etag, body });
+  }
+  return body;
+}
+
+function pageUrl(url, params = {}) {
+  const query = new URLSearchParams({ limit: PAGE_LIMIT });
+  Object.entries(params).forEach(([key, value]) => {
+    if (value) query.set(key, value);
+  });
+  return `${url}?${query}`;
+}
+
+async function fetchAllPages(url, params = {}) {
+  let rows = [];
+  let cursor = null;
+  do {
+    const page = await fetchJSON(pageUrl(url, { ...params, cursor }));
+    rows = rows.concat(page.data);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return rows;
+}
+
+function attachInfiniteScroll(sentinelId, pager, loadMore) {
+  const sentinel = document.getElementById(sentinelId);
+  if (!sentinel || !("IntersectionObserver" in window)) return;
+
+  const observer = new IntersectionObserver(
+    async (entries) => {
+      if (!entries[0].isIntersecting || pager.loading || !pager.cursor) return;
+      pager.loading = true;
+      try {
+        await loadMore();
+      } catch (error) {
+        console.error(error);
+      } finally {
+        pager.loading = false;
+      }
+      // Re-observe so a sentinel that is still visible triggers another page.
+      observer.unobserve(sentinel);
+      observer.observe(sentinel);
+    },
+    { rootMargin: "200px" }
+  );
+  observer.observe(sentinel);
 }
 
 async function loadSummary() {
@@ -72,9 +143,12 @@ function refreshDepartmentSelects() {
 }
 
 async function loadDepartments() {
-  const { data } = await fetchJSON(api.departments);
-  departmentCache = data;
+  departmentCache = await fetchAllPages(api.departments);
+  renderDepartments();
+}
 
+function renderDepartments() {
+  const data = departmentCache;
   const list = document.getElementById("department-list");
 
   if (!data.length) {
@@ -93,24 +167,8 @@ async function loadDepartments() {
   refreshDepartmentSelects();
 }
 
-async function loadEmployees(search = "") {
-  const url = search ? `${api.employees}?q=${encodeURIComponent(search)}` : api.employees;
-  const tableBody = document.getElementById("employee-body");
-  const employeeSelect = document.getElementById("payroll-employee");
-  const { data } = await fetchJSON(url);
-  employeeCache = data;
-
-  if (!data.length) {
-    tableBody.innerHTML =
-      '<tr><td colspan="6">No employees yet. Add one using the form above.</td></tr>';
-    employeeSelect.innerHTML = '<option value="">Add employees first</option>';
-    return;
-  }
-
-  tableBody.innerHTML = data
-    .map(
-      (emp) => `
-      <tr>
+const employeeRow = (emp) => `
+      <tr data-id="${emp.id}">
         <td>${emp.full_name}</td>
         <td>${emp.email}</td>
         <td>${emp.department || "—"}</td>
@@ -122,31 +180,171 @@ async function loadEmployees(search = "") {
             <button class="action-btn delete" data-action="delete-employee" data-id="${emp.id}">Delete</button>
           </div>
         </td>
-      </tr>`
-    )
-    .join("");
+      </tr>`;
 
-  employeeSelect.innerHTML = data
-    .map((emp) => `<option value="${emp.id}">${emp.full_name}</option>`)
-    .join("");
+const employeeOption = (emp) =>
+  `<option value="${emp.id}">${emp.full_name}</option>`;
+
+// The payroll form picks from every employee, not just the table's loaded pages.
+async function loadEmployeeOptions() {
+  const employees = await fetchAllPages(api.employees, {
+    limit: OPTION_PAGE_LIMIT,
+    fields: "id,full_name",
+  });
+  document.getElementById("payroll-employee").innerHTML = employees.length
+    ? employees.map(employeeOption).join("")
+    : '<option value="">Add employees first</option>';
 }
 
-async function loadPayrollRecords() {
-  const tableBody = document.getElementById("payroll-body");
-  const { data } = await fetchJSON(api.payrollRecords);
-  tableBody.innerHTML = data
-    .map(
-      (record) => `
-      <tr>
+async function loadEmployees(search = "") {
+  employeePager.search = search;
+  const tableBody = document.getElementById("employee-body");
+  const { data, next_cursor } = await fetchJSON(
+    pageUrl(api.employees, { q: search })
+  );
+  employeeCache = data;
+  employeePager.cursor = next_cursor;
+
+  if (!data.length) {
+    tableBody.innerHTML =
+      '<tr><td colspan="6">No employees yet. Add one using the form above.</td></tr>';
+    return;
+  }
+
+  tableBody.innerHTML = data.map(employeeRow).join("");
+}
+
+async function loadMoreEmployees() {
+  const { data, next_cursor } = await fetchJSON(
+    pageUrl(api.employees, {
+      q: employeePager.search,
+      cursor: employeePager.cursor,
+    })
+  );
+  employeeCache = employeeCache.concat(data);
+  employeePager.cursor = next_cursor;
+  document
+    .getElementById("employee-body")
+    .insertAdjacentHTML("beforeend", data.map(employeeRow).join(""));
+}
+
+const payrollRow = (record) => `
+      <tr data-id="${record.id}">
         <td>${record.employee?.full_name ?? ""}</td>
         <td>${record.period?.label ?? ""}</td>
         <td>${record.hours_worked}</td>
         <td>${formatCurrency(record.gross_pay)}</td>
         <td>${formatCurrency(record.net_pay)}</td>
         <td>${record.notes || "—"}</td>
-      </tr>`
-    )
-    .join("");
+      </tr>`;
+
+async function loadPayrollRecords() {
+  const tableBody = document.getElementById("payroll-body");
+  const { data, next_cursor } = await fetchJSON(pageUrl(api.payrollRecords));
+  payrollPager.cursor = next_cursor;
+  payrollCache = data;
+  tableBody.innerHTML = data.map(payrollRow).join("");
+}
+
+async function loadMorePayrollRecords() {
+  const { data, next_cursor } = await fetchJSON(
+    pageUrl(api.payrollRecords, { cursor: payrollPager.cursor })
+  );
+  payrollPager.cursor = next_cursor;
+  payrollCache = payrollCache.concat(data);
+  document
+    .getElementById("payroll-body")
+    .insertAdjacentHTML("beforeend", data.map(payrollRow).join(""));
+}
+
+const compareEmployees = (a, b) =>
+  a.last_name < b.last_name ? -1 : a.last_name > b.last_name ? 1 : a.id - b.id;
+
+const comparePayrollRecords = (a, b) =>
+  a.created_at > b.created_at ? -1 : a.created_at < b.created_at ? 1 : b.id - a.id;
+
+// Patch changed and deleted rows into a sorted table in place. Rows that sort
+// after the last loaded one are left for the next page. Returns the new cache.
+function patchTable({ body, cache, changed, deletedIds, render, compare, hasMore }) {
+  const dropped = new Set([...deletedIds, ...changed.map((item) => item.id)]);
+  dropped.forEach((id) => body.querySelector(`tr[data-id="${id}"]`)?.remove());
+  const rows = cache.filter((row) => !dropped.has(row.id));
+
+  changed.forEach((item) => {
+    const index = rows.findIndex((row) => compare(item, row) < 0);
+    if (index === -1 && hasMore) return;
+    body.querySelector("tr:not([data-id])")?.remove();
+    if (index === -1) {
+      body.insertAdjacentHTML("beforeend", render(item));
+      rows.push(item);
+    } else {
+      body
+        .querySelector(`tr[data-id="${rows[index].id}"]`)
+        .insertAdjacentHTML("beforebegin", render(item));
+      rows.splice(index, 0, item);
+    }
+  });
+  return rows;
+}
+
+async function initSync() {
+  const { next_cursor } = await fetchJSON(api.changes);
+  syncCursor = next_cursor;
+}
+
+// Pull only what changed since the last sync and apply it to local state.
+async function syncChanges() {
+  const delta = syncCursor
+    ? await fetchJSON(`${api.changes}?since=${encodeURIComponent(syncCursor)}`)
+    : { reset: true };
+  syncCursor = delta.next_cursor;
+
+  if (delta.reset) {
+    if (!syncCursor) await initSync();
+    await Promise.all([loadSummary(), loadDepartments(), loadEmployeeOptions()]);
+    await loadEmployees(employeePager.search);
+    await loadPayrollRecords();
+    return;
+  }
+
+  const { changes, deleted } = delta;
+  if (changes.departments.length) {
+    departmentCache = changes.departments;
+    renderDepartments();
+  }
+
+  if (changes.employees.length || deleted.employees) {
+    await loadEmployeeOptions();
+  }
+
+  if (employeePager.search) {
+    // Search results are ranked by the server, so re-run the query instead.
+    await loadEmployees(employeePager.search);
+  } else if (changes.employees.length || deleted.employees) {
+    employeeCache = patchTable({
+      body: document.getElementById("employee-body"),
+      cache: employeeCache,
+      changed: changes.employees,
+      deletedIds: deleted.employees || [],
+      render: employeeRow,
+      compare: compareEmployees,
+      hasMore: Boolean(employeePager.cursor),
+    });
+  }
+
+  if (changes.payroll_records.length || deleted.payroll_records) {
+    payrollCache = patchTable({
+      body: document.getElementById("payroll-body"),
+      cache: payrollCache,
+      changed: changes.payroll_records,
+      deletedIds: deleted.payroll_records || [],
+      render: payrollRow,
+      compare: comparePayrollRecords,
+      hasMore: Boolean(payrollPager.cursor),
+    });
+  }
+
+  await loadSummary();
 }
 
 function attachFormHandlers() {
@@ -171,8 +369,7 @@ function attachFormHandlers() {
       employeeFeedback.style.color = "#475467";
       employeeFeedback.textContent = "Employee saved!";
       employeeForm.reset();
-      await loadSummary();
-      await loadEmployees();
+      await syncChanges();
     } catch (error) {
       employeeFeedback.textContent = error.message;
       employeeFeedback.style.color = "#b42318";
@@ -198,8 +395,7 @@ function attachFormHandlers() {
       payrollFeedback.style.color = "#475467";
       payrollFeedback.textContent = "Payroll recorded!";
       payrollForm.reset();
-      await loadSummary();
-      await loadPayrollRecords();
+      await syncChanges();
     } catch (error) {
       payrollFeedback.textContent = error.message;
       payrollFeedback.style.color = "#b42318";
@@ -218,7 +414,7 @@ function attachFormHandlers() {
       departmentFeedback.style.color = "#475467";
       departmentFeedback.textContent = "Department created!";
       departmentForm.reset();
-      await loadDepartments();
+      await syncChanges();
     } catch (error) {
       departmentFeedback.textContent = error.message;
       departmentFeedback.style.color = "#b42318";
@@ -228,8 +424,24 @@ function attachFormHandlers() {
 
 function attachSearchHandler() {
   const input = document.getElementById("employee-search");
-  input.addEventListener("input", (event) => {
-    loadEmployees(event.target.value);
+  const suggestions = document.getElementById("employee-suggestions");
+  let timer = null;
+  input.addEventListener("input", async (event) => {
+    const search = event.target.value;
+    // Suggestions come from the server's in-memory directory on every
+    // keystroke; the full table query waits for a pause in typing.
+    clearTimeout(timer);
+    timer = setTimeout(() => loadEmployees(search), SEARCH_DEBOUNCE_MS);
+    if (!search.trim()) {
+      suggestions.innerHTML = "";
+      return;
+    }
+    const { data } = await fetchJSON(
+      `${api.employeeSuggest}?${new URLSearchParams({ q: search })}`
+    );
+    suggestions.innerHTML = data
+      .map((emp) => `<option value="${emp.full_name}">${emp.email}</option>`)
+      .join("");
   });
 }
 
@@ -283,8 +495,7 @@ function attachEmployeeActions() {
       if (!confirmDelete) return;
       try {
         await fetchJSON(`${api.employees}/${employeeId}`, { method: "DELETE" });
-        await loadEmployees();
-        await loadSummary();
+        await syncChanges();
       } catch (error) {
         alert(error.message);
       }
@@ -311,8 +522,7 @@ function attachEmployeeActions() {
       });
       feedback.style.color = "#475467";
       feedback.textContent = "Employee updated!";
-      await loadEmployees();
-      await loadSummary();
+      await syncChanges();
       closeEmployeeModal();
     } catch (error) {
       feedback.style.color = "#b42318";
@@ -358,12 +568,15 @@ function initEstimator() {
 }
 
 document.addEventListener("DOMContentLoaded", async () => {
-  await Promise.all([loadSummary(), loadDepartments()]);
+  await initSync();
+  await Promise.all([loadSummary(), loadDepartments(), loadEmployeeOptions()]);
   await loadEmployees();
   await loadPayrollRecords();
   attachFormHandlers();
   attachSearchHandler();
   attachEmployeeActions();
+  attachInfiniteScroll("employee-sentinel", employeePager, loadMoreEmployees);
+  attachInfiniteScroll("payroll-sentinel", payrollPager, loadMorePayrollRecords);
   initEstimator();
 });
 
@@ -0,0 +1,244 @@
+"""Deterministic synthetic payroll data at arbitrary scale.
+
+``generate`` bulk-loads departments × employees × pay periods into an empty
+database. Every value comes from a ``random.Random(seed)`` / NumPy generator
+pair, so the same arguments always produce the same rows. Employees get a
+realistic mix of names, employment types and rates. Each employee is paid in
+every period, with pay computed by ``pay_calc.compute_pay`` exactly like a
+payroll run, so totals and counters are consistent. Rows are written with
+bulk ``INSERT`` statements in batches and the counters, department
+rollups and table versions are rebuilt once at the end.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import func, insert, select
+
+from .analytics import rebuild_rollups
+from .counters import rebuild
+from .database import session_scope
+from .models import Department, Employee, PayrollPeriod, PayrollRecord
+from .pay_calc import cents_to_decimal, compute_pay
+from .versions import TRACKED_TABLES, bump
+
+DEPARTMENT_NAMES = (
+    "Finance", "Human Resources", "Engineering", "Sales", "Marketing", "Operations",
+    "Customer Support", "Legal", "Procurement", "Facilities", "Research", "Quality Assurance",
+    "Logistics", "Information Technology", "Security", "Training",
+)
+FIRST_NAMES = (
+    "Ava", "Noah", "Mia", "Liam", "Sofia", "Lucas", "Isabella", "Mateo", "Camila", "Ethan",
+    "Amara", "Daniel", "Chloe", "Gabriel", "Aaliyah", "Samuel", "Hana", "Joshua", "Leah",
+    "Miguel", "Zoe", "Andrea", "Paolo", "Bea", "Carlo", "Jasmine", "Rafael", "Nina", "Marco",
+    "Kyla", "Adrian", "Elena", "Joaquin", "Sara", "Kenji", "Priya", "Omar", "Lina", "Tomas",
+    "Grace",
+)
+LAST_NAMES = (
+    "Lopez", "Garcia", "Santos", "Reyes", "Cruz", "Bautista", "Mendoza", "Torres", "Flores",
+    "Ramos", "Villanueva", "Aquino", "Castillo", "Navarro", "Dela Cruz", "Tan", "Lim", "Smith",
+    "Johnson", "Brown", "Nguyen", "Kim", "Patel", "Khan", "Silva", "Rossi", "Müller", "Dubois",
+    "Okafor", "Haddad", "Novak", "Ivanova", "Sato", "Chen", "Wong", "Avila", "Domingo",
+    "Pascual", "Salazar", "Valdez",
+)
+# Employment type, share of employees, base rate range, hours per period.
+EMPLOYMENT_MIX = (
+    ("FULL_TIME", 0.70, (300, 800), (72, 88)),
+    ("PART_TIME", 0.20, (150, 400), (30, 50)),
+    ("CONTRACT", 0.10, (400, 1200), (20, 90)),
+)
+TAX_RATE = 0.15
+PERIOD_DAYS = 14
+RECORD_COLUMNS = (
+    "employee_id",
+    "payroll_period_id",
+    "hours_worked",
+    "gross_pay",
+    "tax_amount",
+    "other_deductions",
+    "net_pay",
+    "tax_rate",
+    "created_at",
+    "updated_at",
+)
+
+
+@dataclass(slots=True)
+class GenerateReport:
+    departments: int
+    employees: int
+    periods: int
+    records: int
+    seconds: float = 0.0
+
+
+def _department_rows(count: int, now: datetime) -> List[Dict]:
+    rows = []
+    for index in range(count):
+        base = DEPARTMENT_NAMES[index % len(DEPARTMENT_NAMES)]
+        suffix = index // len(DEPARTMENT_NAMES)
+        name = base if suffix == 0 else f"{base} {suffix + 1}"
+        rows.append(
+            {"name": name, "description": f"{base} team", "created_at": now, "updated_at": now}
+        )
+    return rows
+
+
+def _employee_rows(
+    rng: random.Random, start: int, count: int, department_ids: List[int], first_period: date, now
+) -> List[Dict]:
+    types = [kind for kind, *_ in EMPLOYMENT_MIX]
+    weights = [share for _, share, *_ in EMPLOYMENT_MIX]
+    ranges = {kind: rate for kind, _, rate, _ in EMPLOYMENT_MIX}
+    rows = []
+    for number in range(start, start + count):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        kind = rng.choices(types, weights)[0]
+        low, high = ranges[kind]
+        rows.append(
+            {
+                "first_name": first,
+                "last_name": last,
+                "email": f"{first}.{last}.{number}@example.com".lower().replace(" ", ""),
+                "base_rate": cents_to_decimal(rng.randrange(low * 100, high * 100)),
+                "department_id": rng.choice(department_ids),
+                "employment_type": kind,
+                "hire_date": first_period - timedelta(days=rng.randrange(30, 3650)),
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+    return rows
+
+
+def _driver_insert(connection, table: str, columns) -> str:
+    # Payroll records go straight to the DBAPI executemany: at millions of
+    # rows SQLAlchemy's per-row bind processing costs more than the insert.
+    marker = "?" if connection.dialect.paramstyle == "qmark" else "%s"
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join([marker] * len(columns))})"
+    )
+
+
+def _timestamp(connection, value: datetime):
+    """Bind ``value`` the way SQLAlchemy stores it on this dialect."""
+    if connection.dialect.name == "sqlite":
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return value
+
+
+def generate(
+    departments: int = 10,
+    employees: int = 1_000,
+    periods: int = 12,
+    seed: int = 42,
+    batch_size: int = 10_000,
+    first_period: date = date(2025, 1, 6),
+) -> GenerateReport:
+    """Bulk-load synthetic data into an empty database."""
+    with session_scope() as session:
+        if session.scalar(select(func.count(Department.id))):
+            raise ValueError("generate() needs an empty database")
+
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    now = datetime.utcnow()
+    started = datetime.now()
+
+    with session_scope() as session:
+        session.execute(insert(Department), _department_rows(departments, now))
+        department_ids = list(session.scalars(select(Department.id).order_by(Department.id)))
+        period_rows = []
+        for index in range(periods):
+            start = first_period + timedelta(days=PERIOD_DAYS * index)
+            period_rows.append(
+                {
+                    "label": f"{start.year} P{index + 1:03d} ({start.isoformat()})",
+                    "start_date": start,
+                    "end_date": start + timedelta(days=PERIOD_DAYS - 1),
+                    "status": "OPEN" if index == periods - 1 else "PAID",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+        if period_rows:
+            session.execute(insert(PayrollPeriod), period_rows)
+
+    for start in range(0, employees, batch_size):
+        count = min(batch_size, employees - start)
+        with session_scope() as session:
+            session.connection().execute(
+                insert(Employee.__table__),
+                _employee_rows(rng, start, count, department_ids, first_period, now),
+            )
+
+    hours_by_type = {kind: hours for kind, _, _, hours in EMPLOYMENT_MIX}
+    records = 0
+    with session_scope() as session:
+        insert_record = _driver_insert(
+            session.connection(), PayrollRecord.__tablename__, RECORD_COLUMNS
+        )
+        periods_loaded = session.execute(
+            select(PayrollPeriod.id, PayrollPeriod.end_date).order_by(PayrollPeriod.id)
+        ).all()
+        last_id = 0
+        while True:
+            staff = session.execute(
+                select(Employee.id, Employee.base_rate, Employee.employment_type)
+                .where(Employee.id > last_id)
+                .order_by(Employee.id)
+                .limit(batch_size)
+            ).all()
+            if not staff:
+                break
+            last_id = staff[-1].id
+            connection = session.connection()
+            ids = [row.id for row in staff]
+            rates = np.array([float(row.base_rate) for row in staff])
+            low = np.array([hours_by_type[row.employment_type][0] for row in staff])
+            high = np.array([hours_by_type[row.employment_type][1] for row in staff])
+            for period_id, end_date in periods_loaded:
+                hours = np.round(np_rng.uniform(low, high), 2)
+                deductions = np.round(np_rng.choice([0, 0, 0, 100, 250, 500], len(ids)), 2)
+                pay = compute_pay(hours, rates, TAX_RATE, deductions)
+                created = _timestamp(connection, datetime.combine(end_date, time(17, 0)))
+                connection.exec_driver_sql(
+                    insert_record,
+                    list(
+                        zip(
+                            ids,
+                            [period_id] * len(ids),
+                            hours.tolist(),
+                            (pay.gross_cents / 100).tolist(),
+                            (pay.tax_cents / 100).tolist(),
+                            (pay.deduction_cents / 100).tolist(),
+                            (pay.net_cents / 100).tolist(),
+                            [TAX_RATE] * len(ids),
+                            [created] * len(ids),
+                            [created] * len(ids),
+                        )
+                    ),
+                )
+                records += len(ids)
+            session.commit()
+
+    with session_scope() as session:
+        connection = session.connection()
+        rebuild(connection)
+        rebuild_rollups(connection)
+        bump(connection, TRACKED_TABLES)
+
+    return GenerateReport(
+        departments=departments,
+        employees=employees,
+        periods=periods,
+        records=records,
+        seconds=(datetime.now() - started).total_seconds(),
+    )
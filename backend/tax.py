@@ -0,0 +1,218 @@
+"""Progressive withholding from versioned bracket schedules.
+
+A ``TaxSchedule`` lists annual income brackets, each taxed at its own rate.
+Schedules are compiled once into sorted integer arrays (bracket lower
+bounds in cents, rates in millionths and the exact tax owed at each lower
+bound), so the tax on any income is one ``bisect`` plus one multiply, and a
+whole payroll run is one ``numpy.searchsorted``.
+
+Withholding uses the cumulative method: a record withholds the tax on the
+year's earnings including this record minus the tax on the earnings before
+it, both rounded to cents. Year-to-date earnings come from the
+``ytd_accumulators`` table maintained by ``backend.counters``, so no
+aggregate over ``payroll_records`` is needed, and the amounts withheld over
+a year always add up to the tax on the year's total.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from .models import TaxSchedule, YtdAccumulator
+from .pay_calc import (
+    INT64_MAX,
+    TAX_RATE_SCALE,
+    PayBreakdown,
+    cents_to_decimal,
+    compute_pay,
+    round_half_even_div,
+    to_cents,
+)
+
+
+# Largest income in cents whose tax × TAX_RATE_SCALE fits in int64.
+_ARRAY_SAFE_CENTS = INT64_MAX // TAX_RATE_SCALE
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledSchedule:
+    """A bracket schedule as parallel arrays sorted by lower bound."""
+
+    id: int
+    name: str
+    effective_from: date
+    bounds: Tuple[int, ...]
+    rates: Tuple[int, ...]
+    # Tax owed on exactly ``bounds[i]``, in cents × TAX_RATE_SCALE.
+    base: Tuple[int, ...]
+
+    def tax_on(self, income_cents: int) -> int:
+        """Annual tax in cents on ``income_cents`` (half-even)."""
+        if income_cents <= 0:
+            return 0
+        index = bisect_right(self.bounds, income_cents) - 1
+        exact = self.base[index] + (income_cents - self.bounds[index]) * self.rates[index]
+        quotient, remainder = divmod(exact, TAX_RATE_SCALE)
+        twice = remainder * 2
+        round_up = twice > TAX_RATE_SCALE or (twice == TAX_RATE_SCALE and quotient % 2 == 1)
+        return quotient + round_up
+
+    def withholding(self, ytd_gross_cents: int, gross_cents: int) -> int:
+        """Tax in cents to withhold from ``gross_cents`` paid after ``ytd_gross_cents``."""
+        return self.tax_on(ytd_gross_cents + gross_cents) - self.tax_on(ytd_gross_cents)
+
+    def tax_on_array(self, income_cents) -> np.ndarray:
+        """Vectorized ``tax_on``: ``searchsorted`` is ``bisect`` over an array.
+
+        ``exact`` is at most the income × TAX_RATE_SCALE, so incomes above
+        ``_ARRAY_SAFE_CENTS`` would overflow int64; those few go through
+        ``tax_on`` on Python ints instead.
+        """
+        income = np.maximum(np.asarray(income_cents, dtype=np.int64), 0)
+        large = income > _ARRAY_SAFE_CENTS
+        safe = np.where(large, 0, income)
+        # Brackets starting above every safe income are never selected here.
+        count = bisect_right(self.bounds, _ARRAY_SAFE_CENTS)
+        bounds = np.asarray(self.bounds[:count], dtype=np.int64)
+        index = np.searchsorted(bounds, safe, side="right") - 1
+        exact = (
+            np.asarray(self.base[:count], dtype=np.int64)[index]
+            + (safe - bounds[index]) * np.asarray(self.rates[:count], dtype=np.int64)[index]
+        )
+        tax = np.asarray(round_half_even_div(exact, TAX_RATE_SCALE))
+        if large.any():
+            tax[large] = [self.tax_on(int(value)) for value in income[large]]
+        return tax
+
+    def withholding_array(self, ytd_gross_cents, gross_cents) -> np.ndarray:
+        """Vectorized ``withholding`` for a whole run."""
+        ytd = np.asarray(ytd_gross_cents, dtype=np.int64)
+        after = ytd + np.asarray(gross_cents, dtype=np.int64)
+        return self.tax_on_array(after) - self.tax_on_array(ytd)
+
+
+# Largest lower bound TaxBracket.lower_bound (Numeric(14, 2)) can hold.
+MAX_LOWER_BOUND = Decimal("999999999999.99")
+
+
+def parse_brackets(raw: Iterable[Dict]) -> List[Tuple[Decimal, Decimal]]:
+    """Validate ``[{"lower_bound": ..., "rate": ...}]``; raise ``ValueError`` if unusable."""
+    try:
+        parsed = [(Decimal(str(item["lower_bound"])), Decimal(str(item["rate"]))) for item in raw]
+    except (KeyError, TypeError, ArithmeticError) as exc:
+        raise ValueError("Each bracket needs a numeric lower_bound and rate") from exc
+    # NaN would raise on comparison and Infinity cannot be converted to cents;
+    # both are rejected before anything compares them.
+    if any(not bound.is_finite() or not rate.is_finite() for bound, rate in parsed):
+        raise ValueError("Each bracket needs a numeric lower_bound and rate")
+    brackets = sorted(parsed)
+    if brackets and brackets[-1][0] > MAX_LOWER_BOUND:
+        raise ValueError(f"Bracket lower bounds must not exceed {MAX_LOWER_BOUND}")
+    if not brackets or brackets[0][0] != 0:
+        raise ValueError("The first bracket must start at 0")
+    if len({bound for bound, _ in brackets}) != len(brackets):
+        raise ValueError("Bracket lower bounds must be unique")
+    if any(not 0 <= rate <= 1 for _, rate in brackets):
+        raise ValueError("Bracket rates must be between 0 and 1")
+    return brackets
+
+
+def compile_schedule(
+    schedule_id: int, name: str, effective_from: date, brackets: Sequence[Tuple]
+) -> CompiledSchedule:
+    """Build the lookup arrays from ``(lower_bound, rate)`` pairs sorted by bound."""
+    bounds = [to_cents(bound) for bound, _ in brackets]
+    rates = [int(Decimal(str(rate)) * TAX_RATE_SCALE) for _, rate in brackets]
+    base = [0]
+    for index in range(1, len(bounds)):
+        base.append(base[-1] + (bounds[index] - bounds[index - 1]) * rates[index - 1])
+    return CompiledSchedule(
+        id=schedule_id,
+        name=name,
+        effective_from=effective_from,
+        bounds=tuple(bounds),
+        rates=tuple(rates),
+        base=tuple(base),
+    )
+
+
+# Schedule versions are immutable, so compiled schedules never go stale.
+_compiled: Dict[int, CompiledSchedule] = {}
+
+
+def load_schedule(session, name: str, on: date) -> CompiledSchedule | None:
+    """Return the version of schedule ``name`` in force on ``on``, compiled."""
+    schedule_id = session.scalar(
+        select(TaxSchedule.id)
+        .where(TaxSchedule.name == name, TaxSchedule.effective_from <= on)
+        .order_by(TaxSchedule.effective_from.desc())
+        .limit(1)
+    )
+    if schedule_id is None:
+        return None
+    if schedule_id not in _compiled:
+        schedule = session.scalar(
+            select(TaxSchedule)
+            .options(selectinload(TaxSchedule.brackets))
+            .where(TaxSchedule.id == schedule_id)
+        )
+        _compiled[schedule_id] = compile_schedule(
+            schedule.id,
+            schedule.name,
+            schedule.effective_from,
+            [(bracket.lower_bound, bracket.rate) for bracket in schedule.brackets],
+        )
+    return _compiled[schedule_id]
+
+
+def ytd_gross(
+    session, tax_year: int, employee_ids: Iterable[int] | None = None
+) -> Dict[int, int]:
+    """Year-to-date gross pay in cents by employee, read from the accumulators."""
+    stmt = select(YtdAccumulator.employee_id, YtdAccumulator.gross_cents).where(
+        YtdAccumulator.tax_year == tax_year
+    )
+    if employee_ids is not None:
+        stmt = stmt.where(YtdAccumulator.employee_id.in_(list(employee_ids)))
+    return dict(session.execute(stmt).all())
+
+
+def compute_pay_progressive(
+    hours, hourly_rate, schedule: CompiledSchedule, ytd_gross_cents, deductions=0
+) -> PayBreakdown:
+    """``compute_pay`` with tax withheld from ``schedule`` instead of a flat rate."""
+    pay = compute_pay(hours, hourly_rate, 0, deductions)
+    tax = schedule.withholding_array(ytd_gross_cents, pay.gross_cents)
+    return PayBreakdown(
+        gross_cents=pay.gross_cents,
+        tax_cents=tax,
+        deduction_cents=pay.deduction_cents,
+        net_cents=pay.gross_cents - tax - pay.deduction_cents,
+    )
+
+
+def compute_single_progressive(
+    hours: float,
+    hourly_rate: float,
+    schedule: CompiledSchedule,
+    ytd_gross_cents: int,
+    deductions: float = 0,
+) -> Dict[str, Decimal]:
+    """One employee's pay under ``schedule``, as ``Decimal`` column values."""
+    result = compute_pay_progressive(
+        np.atleast_1d(hours), np.atleast_1d(hourly_rate), schedule, ytd_gross_cents, deductions
+    )
+    return {
+        "gross_pay": cents_to_decimal(result.gross_cents[0]),
+        "tax_amount": cents_to_decimal(result.tax_cents[0]),
+        "other_deductions": cents_to_decimal(result.deduction_cents[0]),
+        "net_pay": cents_to_decimal(result.net_cents[0]),
+    }
@@ -0,0 +1,141 @@
+"""Per-table version counters and conditional GET support.
+
+Every flush that writes to a tracked table bumps that table's row in
+``table_versions``; bulk statements call ``bump`` themselves. GET endpoints
+wrapped with ``conditional`` derive an ``ETag`` and ``Last-Modified`` from the
+versions of the tables they read, and answer ``304 Not Modified`` from a
+single small query when the client already has the current representation.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Iterable, Tuple
+
+from sqlalchemy import event, select, update
+from sqlalchemy.engine import Connection
+
+from . import database
+from .database import SessionLocal
+from .models import (
+    Department,
+    Employee,
+    PayrollPeriod,
+    PayrollRecord,
+    PeriodArchive,
+    TableVersion,
+)
+
+TRACKED_TABLES = tuple(
+    model.__tablename__
+    for model in (Department, Employee, PayrollPeriod, PayrollRecord, PeriodArchive)
+)
+
+
+def bump(connection: Connection, tables: Iterable[str]) -> None:
+    """Increment the version of every table in ``tables``."""
+    tables = sorted(set(tables))
+    if tables:
+        connection.execute(
+            update(TableVersion)
+            .where(TableVersion.table_name.in_(tables))
+            .values(version=TableVersion.version + 1, updated_at=datetime.utcnow())
+        )
+
+
+@event.listens_for(SessionLocal.session_factory, "after_flush")
+def _bump_flushed_tables(session, _flush_context) -> None:
+    written = [*session.new, *session.deleted]
+    written += [obj for obj in session.dirty if session.is_modified(obj)]
+    bump(
+        session.connection(),
+        (obj.__tablename__ for obj in written if obj.__tablename__ in TRACKED_TABLES),
+    )
+
+
+def versions_statement(tables: Tuple[str, ...]):
+    return (
+        select(TableVersion.table_name, TableVersion.version, TableVersion.updated_at)
+        .where(TableVersion.table_name.in_(tables))
+        .order_by(TableVersion.table_name)
+    )
+
+
+def validator_from_rows(rows) -> Tuple[str, datetime | None]:
+    """Turn ``versions_statement`` rows into a validator and last write time."""
+    validator = ";".join(f"{name}={version}" for name, version, _ in rows)
+    last_modified = max((updated for _, _, updated in rows), default=None)
+    if last_modified is not None and last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return validator, last_modified
+
+
+def read_versions(tables: Tuple[str, ...]) -> Tuple[str, datetime | None]:
+    """Return a validator string and last write time for ``tables``.
+
+    The versions are also left on ``flask.g.table_versions`` for views that
+    cache data derived from a table (see ``backend.archive``).
+    """
+    # Imported here so that bulk writers (the importer) do not load Flask.
+    from flask import g, has_request_context  # pylint: disable=import-outside-toplevel
+
+    with database.read_bind().connect() as connection:
+        rows = connection.execute(versions_statement(tables)).all()
+    if has_request_context():
+        g.table_versions = {name: version for name, version, _ in rows}
+    return validator_from_rows(rows)
+
+
+def etag_for(validator: str, full_path: str) -> str:
+    return hashlib.sha1(f"{validator}|{full_path}".encode()).hexdigest()[:20]
+
+
+def is_not_modified(
+    etag: str, last_modified: datetime | None, if_none_match, if_modified_since
+) -> bool:
+    """Apply If-None-Match, falling back to If-Modified-Since when absent.
+
+    Entity tags are compared weakly, so the weak tag of a compressed
+    response (``backend.responses``) matches too.
+    """
+    if if_none_match.contains_weak(etag):
+        return True
+    return (
+        not if_none_match
+        and last_modified is not None
+        and if_modified_since is not None
+        and last_modified.replace(microsecond=0) <= if_modified_since
+    )
+
+
+def conditional(*tables: str):
+    """Serve a GET view with ETag/Last-Modified validators derived from ``tables``."""
+
+    from flask import make_response, request  # pylint: disable=import-outside-toplevel
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            validator, last_modified = read_versions(tables)
+            etag = etag_for(validator, request.full_path)
+
+            if is_not_modified(
+                etag, last_modified, request.if_none_match, request.if_modified_since
+            ):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,108 @@
+"""Run queued background jobs (see ``backend.jobs``).
+
+Usage::
+
+    python -m backend.worker               # WORKER_THREADS threads until SIGINT/SIGTERM
+    python -m backend.worker --threads 4
+    python -m backend.worker --burst       # exit once no job is due
+
+Each thread claims and runs one job at a time; start more processes, on the
+same machine or not, to run more jobs at once. On SIGINT or SIGTERM the
+worker stops claiming and exits after the jobs it is running have finished.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from backend import database, jobs
+from backend.config import settings
+from backend.migrations import check_schema, migrate
+
+log = logging.getLogger("backend.worker")
+
+
+class Worker:
+    """A pool of threads that claim and run jobs until stopped."""
+
+    def __init__(self, threads: int, poll_seconds: float):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.threads = threads
+        self.poll_seconds = poll_seconds
+        self._stopping = threading.Event()
+        self._running: set = set()
+        self._lock = threading.Lock()
+
+    def stop(self, *_args) -> None:
+        self._stopping.set()
+
+    def _loop(self, burst: bool) -> None:
+        failures = 0
+        while not self._stopping.is_set():
+            try:
+                job_id = self._claim_and_run()
+            except Exception:  # pylint: disable=broad-except
+                # A database error (e.g. a lock timeout) must not end the thread;
+                # a job left RUNNING is requeued once its lease expires.
+                failures += 1
+                log.exception("Worker loop failed, retrying")
+                self._stopping.wait(jobs.backoff_seconds(failures))
+                continue
+            failures = 0
+            if job_id is None:
+                if burst:
+                    return
+                self._stopping.wait(self.poll_seconds)
+
+    def _claim_and_run(self) -> int | None:
+        """Run the next due job, if any, and return its id."""
+        job_id = jobs.claim(self.worker_id)
+        if job_id is None:
+            return None
+        with self._lock:
+            self._running.add(job_id)
+        try:
+            jobs.run(job_id, self.worker_id)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+        return job_id
+
+    def _heartbeat(self) -> None:
+        while not self._stopping.wait(settings.job_lease_seconds / 3):
+            with self._lock:
+                running = list(self._running)
+            try:
+                jobs.heartbeat(self.worker_id, running)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Heartbeat failed")
+
+    def run(self, burst: bool = False) -> None:
+        threading.Thread(target=self._heartbeat, daemon=True).start()
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            for future in [pool.submit(self._loop, burst) for _ in range(self.threads)]:
+                future.result()
+        self._stopping.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run queued background jobs.")
+    parser.add_argument("--threads", type=int, default=settings.worker_threads)
+    parser.add_argument("--poll", type=float, default=settings.worker_poll_seconds)
+    parser.add_argument("--burst", action="store_true", help="exit once no job is due")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    if settings.auto_migrate:
+        migrate(database.engine)
+    else:
+        check_schema(database.engine)
+    worker = Worker(args.threads, args.poll)
+    signal.signal(signal.SIGINT, worker.stop)
+    signal.signal(signal.SIGTERM, worker.stop)
+    log.info("Worker %s running %s threads", worker.worker_id, args.threads)
+    worker.run(burst=args.burst)
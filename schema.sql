@@ -2,6 +2,16 @@
 CREATE DATABASE IF NOT EXISTS payroll_db CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 USE payroll_db;
 
+DROP TABLE IF EXISTS tombstones;
+DROP TABLE IF EXISTS table_versions;
+DROP TABLE IF EXISTS period_totals;
+DROP TABLE IF EXISTS period_department_rollups;
+DROP TABLE IF EXISTS department_totals;
+DROP TABLE IF EXISTS summary_counters;
+DROP TABLE IF EXISTS payslip_batches;
+DROP TABLE IF EXISTS upsert_batches;
+DROP TABLE IF EXISTS jobs;
+DROP TABLE IF EXISTS payroll_runs;
 DROP TABLE IF EXISTS payroll_records;
 DROP TABLE IF EXISTS payroll_periods;
 DROP TABLE IF EXISTS employees;
@@ -12,7 +22,8 @@ CREATE TABLE departments (
     name VARCHAR(100) NOT NULL UNIQUE,
     description VARCHAR(255),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    KEY ix_departments_updated_at (updated_at)
 );
 
 CREATE TABLE employees (
@@ -26,6 +37,10 @@ CREATE TABLE employees (
     employment_type ENUM('FULL_TIME','PART_TIME','CONTRACT') NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    KEY ix_employees_updated_at (updated_at),
+    FULLTEXT KEY ft_employees_search (first_name, last_name, email),
+    KEY ix_employees_last_name_id (last_name, id),
+    KEY ix_employees_department_last_name (department_id, last_name, id),
     CONSTRAINT fk_department FOREIGN KEY (department_id) REFERENCES departments(id)
 );
 
@@ -37,6 +52,8 @@ CREATE TABLE payroll_periods (
     status ENUM('OPEN','PROCESSED','PAID') DEFAULT 'OPEN',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    KEY ix_payroll_periods_updated_at (updated_at),
+    KEY ix_payroll_periods_start_date_id (start_date, id),
     CONSTRAINT ck_dates CHECK (end_date >= start_date)
 );
 
@@ -50,13 +67,199 @@ CREATE TABLE payroll_records (
     other_deductions DECIMAL(12,2) DEFAULT 0,
     net_pay DECIMAL(12,2) NOT NULL,
     notes TEXT,
+    hourly_rate DECIMAL(10,2),
+    tax_rate DECIMAL(7,6),
+    tax_schedule VARCHAR(100),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    KEY ix_payroll_records_updated_at (updated_at),
     UNIQUE KEY uq_employee_period (employee_id, payroll_period_id),
+    KEY ix_payroll_records_created_id (created_at, id),
+    KEY ix_payroll_records_period_created (payroll_period_id, created_at, id),
+    KEY ix_payroll_records_employee_created (employee_id, created_at, id),
     CONSTRAINT fk_employee FOREIGN KEY (employee_id) REFERENCES employees(id),
     CONSTRAINT fk_period FOREIGN KEY (payroll_period_id) REFERENCES payroll_periods(id)
 );
 
+CREATE TABLE payroll_runs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    payroll_period_id INT NOT NULL,
+    status ENUM('RUNNING','COMPLETED','FAILED') NOT NULL DEFAULT 'RUNNING',
+    records_created INT NOT NULL DEFAULT 0,
+    records_skipped INT NOT NULL DEFAULT 0,
+    total_gross DECIMAL(14,2) NOT NULL DEFAULT 0,
+    total_tax DECIMAL(14,2) NOT NULL DEFAULT 0,
+    total_deductions DECIMAL(14,2) NOT NULL DEFAULT 0,
+    total_net DECIMAL(14,2) NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT fk_run_period FOREIGN KEY (payroll_period_id) REFERENCES payroll_periods(id)
+);
+
+CREATE TABLE upsert_batches (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    idempotency_key VARCHAR(128) UNIQUE,
+    request_hash VARCHAR(64) NOT NULL,
+    payroll_period_id INT NOT NULL,
+    status ENUM('RUNNING','COMPLETED','FAILED') NOT NULL DEFAULT 'RUNNING',
+    records_inserted INT NOT NULL DEFAULT 0,
+    records_updated INT NOT NULL DEFAULT 0,
+    records_unchanged INT NOT NULL DEFAULT 0,
+    errors TEXT,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT fk_upsert_period FOREIGN KEY (payroll_period_id) REFERENCES payroll_periods(id)
+);
+
+CREATE TABLE payslip_batches (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    payroll_period_id INT NOT NULL,
+    status ENUM('RUNNING','COMPLETED','FAILED') NOT NULL DEFAULT 'RUNNING',
+    format ENUM('html','pdf','both') NOT NULL DEFAULT 'both',
+    output ENUM('zip','directory') NOT NULL DEFAULT 'zip',
+    total INT NOT NULL DEFAULT 0,
+    rendered INT NOT NULL DEFAULT 0,
+    path VARCHAR(255),
+    error TEXT,
+    job_id INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT fk_payslip_period FOREIGN KEY (payroll_period_id) REFERENCES payroll_periods(id)
+);
+
+-- Background job queue, run by `python -m backend.worker`
+CREATE TABLE jobs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    payload TEXT NOT NULL,
+    status ENUM('QUEUED','RUNNING','COMPLETED','FAILED','CANCELLED') NOT NULL DEFAULT 'QUEUED',
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(64),
+    locked_at TIMESTAMP NULL,
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    progress_done INT NOT NULL DEFAULT 0,
+    progress_total INT NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    KEY ix_jobs_status_run_after (status, run_after, id)
+);
+
+-- Counters maintained by backend/counters.py; rebuild with `python -m backend.reconcile --fix`
+CREATE TABLE summary_counters (
+    id INT PRIMARY KEY,
+    total_employees INT NOT NULL DEFAULT 0,
+    total_departments INT NOT NULL DEFAULT 0,
+    total_periods INT NOT NULL DEFAULT 0,
+    total_records INT NOT NULL DEFAULT 0,
+    gross_cents BIGINT NOT NULL DEFAULT 0,
+    tax_cents BIGINT NOT NULL DEFAULT 0,
+    deduction_cents BIGINT NOT NULL DEFAULT 0,
+    net_cents BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE department_totals (
+    department_id INT PRIMARY KEY,
+    employee_count INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE period_totals (
+    payroll_period_id INT PRIMARY KEY,
+    record_count INT NOT NULL DEFAULT 0,
+    gross_cents BIGINT NOT NULL DEFAULT 0,
+    tax_cents BIGINT NOT NULL DEFAULT 0,
+    deduction_cents BIGINT NOT NULL DEFAULT 0,
+    net_cents BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE period_department_rollups (
+    payroll_period_id INT NOT NULL,
+    department_id INT NOT NULL,
+    record_count INT NOT NULL DEFAULT 0,
+    gross_cents BIGINT NOT NULL DEFAULT 0,
+    tax_cents BIGINT NOT NULL DEFAULT 0,
+    deduction_cents BIGINT NOT NULL DEFAULT 0,
+    net_cents BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (payroll_period_id, department_id),
+    CONSTRAINT fk_rollup_period FOREIGN KEY (payroll_period_id) REFERENCES payroll_periods(id) ON DELETE CASCADE
+);
+
+CREATE TABLE period_archives (
+    payroll_period_id INT PRIMARY KEY,
+    path VARCHAR(255) NOT NULL,
+    record_count INT NOT NULL DEFAULT 0,
+    gross_cents BIGINT NOT NULL DEFAULT 0,
+    tax_cents BIGINT NOT NULL DEFAULT 0,
+    deduction_cents BIGINT NOT NULL DEFAULT 0,
+    net_cents BIGINT NOT NULL DEFAULT 0,
+    min_created_at TIMESTAMP NULL,
+    max_created_at TIMESTAMP NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_archive_period FOREIGN KEY (payroll_period_id) REFERENCES payroll_periods(id)
+);
+
+CREATE TABLE ytd_accumulators (
+    employee_id INT NOT NULL,
+    tax_year INT NOT NULL,
+    record_count INT NOT NULL DEFAULT 0,
+    gross_cents BIGINT NOT NULL DEFAULT 0,
+    tax_cents BIGINT NOT NULL DEFAULT 0,
+    net_cents BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (employee_id, tax_year),
+    KEY ix_ytd_accumulators_year_employee (tax_year, employee_id)
+);
+
+CREATE TABLE tax_schedules (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    effective_from DATE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT uq_tax_schedule_version UNIQUE (name, effective_from)
+);
+
+CREATE TABLE tax_brackets (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    schedule_id INT NOT NULL,
+    lower_bound DECIMAL(14,2) NOT NULL,
+    rate DECIMAL(7,6) NOT NULL,
+    CONSTRAINT uq_tax_bracket_bound UNIQUE (schedule_id, lower_bound),
+    CONSTRAINT ck_tax_bracket_rate CHECK (rate >= 0 AND rate <= 1),
+    CONSTRAINT fk_tax_bracket_schedule FOREIGN KEY (schedule_id) REFERENCES tax_schedules(id) ON DELETE CASCADE
+);
+
+CREATE TABLE table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO table_versions (table_name, version)
+VALUES ('departments', 0), ('employees', 0), ('payroll_periods', 0), ('payroll_records', 0),
+       ('period_archives', 0);
+
+-- Number of the last migration in backend/migrations.py this schema matches.
+CREATE TABLE schema_version (
+    id INT PRIMARY KEY,
+    version INT NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO schema_version (id, version) VALUES (1, 7);
+
+CREATE TABLE tombstones (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    table_name VARCHAR(64) NOT NULL,
+    row_id INT NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY ix_tombstones_deleted_at (deleted_at)
+);
+
 -- Sample data
 INSERT INTO departments (name, description)
 VALUES ('Finance', 'Budgeting and reporting'),
@@ -71,7 +274,19 @@ VALUES ('Ava', 'Lopez', 'ava.lopez@example.com', 420, 3, '2022-03-14', 'FULL_TIM
 INSERT INTO payroll_periods (label, start_date, end_date, status)
 VALUES ('Week 48 - 2025', '2025-11-24', '2025-11-30', 'PROCESSED');
 
-INSERT INTO payroll_records (employee_id, payroll_period_id, hours_worked, gross_pay, tax_amount, other_deductions, net_pay, notes)
-VALUES (1, 1, 40, 16800, 3360, 500, 12940, 'Includes gadget allowance'),
-       (2, 1, 38, 14440, 2888, 300, 11252, 'Standard payout');
+INSERT INTO payroll_records (employee_id, payroll_period_id, hours_worked, gross_pay, tax_amount, other_deductions, net_pay, notes, tax_rate)
+VALUES (1, 1, 40, 16800, 3360, 500, 12940, 'Includes gadget allowance', 0.2),
+       (2, 1, 38, 14440, 2888, 300, 11252, 'Standard payout', 0.2);
+
+INSERT INTO summary_counters (id, total_employees, total_departments, total_periods, total_records, gross_cents, tax_cents, deduction_cents, net_cents)
+VALUES (1, 3, 3, 1, 2, 3124000, 624800, 80000, 2419200);
+
+INSERT INTO department_totals (department_id, employee_count)
+VALUES (1, 1), (2, 1), (3, 1);
+
+INSERT INTO period_totals (payroll_period_id, record_count, gross_cents, tax_cents, deduction_cents, net_cents)
+VALUES (1, 2, 3124000, 624800, 80000, 2419200);
 
+INSERT INTO period_department_rollups (payroll_period_id, department_id, record_count, gross_cents, tax_cents, deduction_cents, net_cents)
+VALUES (1, 1, 1, 1444000, 288800, 30000, 1125200),
+       (1, 3, 1, 1680000, 336000, 50000, 1294000);
@@ -0,0 +1,26 @@
+"""Fixtures shared by the test modules."""
+
+from __future__ import annotations
+
+import pytest
+
+from backend import create_app, database, tax
+from backend.benchmarks._harness import use_temporary_database
+from backend.directory import directory
+
+
+@pytest.fixture(scope="module")
+def temporary_database():
+    """A fresh SQLite file behind the shared engine for one test module."""
+    url = use_temporary_database()
+    # Process-wide caches are keyed by row id, which a new database reuses.
+    tax._compiled.clear()  # pylint: disable=protected-access
+    directory.clear()
+    yield url
+    database.SessionLocal.remove()
+    database.engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def client(temporary_database):  # pylint: disable=redefined-outer-name,unused-argument
+    return create_app().test_client()
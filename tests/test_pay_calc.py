@@ -0,0 +1,128 @@
+"""Integer-cents pay kernel against a ``Decimal`` reference."""
+
+from __future__ import annotations
+
+from decimal import ROUND_HALF_EVEN, Decimal
+
+import numpy as np
+import pytest
+
+from backend.pay_calc import (
+    HOURS_SCALE,
+    check_fixed,
+    compute_pay,
+    compute_single,
+    round_half_even_div,
+    to_fixed,
+)
+from backend.payroll_runs import parse_entries
+
+
+def cents(value: Decimal) -> int:
+    return int(value.quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+
+@pytest.mark.parametrize(
+    ("numerator", "expected"),
+    [(14, 1), (15, 2), (25, 2), (26, 3), (-5, 0), (-15, -2), (-16, -2), (0, 0)],
+)
+def test_round_half_even_div(numerator, expected):
+    assert round_half_even_div(np.array([numerator]), 10).tolist() == [expected]
+
+
+def test_matches_decimal_reference():
+    rng = np.random.default_rng(2)
+    hours_centi = rng.integers(0, 8_000, size=5_000)
+    rate_cents = rng.integers(1, 50_000, size=5_000)
+    deduction_cents = 1_234
+    tax_rate = "0.123457"
+
+    pay = compute_pay(hours_centi / 100, rate_cents / 100, float(tax_rate), deduction_cents / 100)
+
+    gross = [cents(Decimal(int(h)) * int(r) / 100) for h, r in zip(hours_centi, rate_cents)]
+    tax = [cents(g * Decimal(tax_rate)) for g in gross]
+    assert pay.gross_cents.tolist() == gross
+    assert pay.tax_cents.tolist() == tax
+    assert pay.deduction_cents.tolist() == [deduction_cents] * len(gross)
+    assert pay.net_cents.tolist() == [g - t - deduction_cents for g, t in zip(gross, tax)]
+
+
+@pytest.mark.parametrize(
+    ("hours", "rate", "gross_cents"),
+    [
+        (0.5, 0.01, 0),  # 0.5 cents rounds to even
+        (1.5, 0.01, 2),  # 1.5 cents rounds to even
+        (2.5, 0.01, 2),
+        (1.15, 100, 11_500),  # 1.15 * 100 is 114.99999999999999 in binary floating point
+        (0.29, 0.1, 3),  # 2.9 cents
+    ],
+)
+def test_gross_rounds_half_even_without_float_drift(hours, rate, gross_cents):
+    assert compute_pay([hours], [rate], 0).gross_cents.tolist() == [gross_cents]
+
+
+def test_tax_rounds_half_even():
+    # 12.5% of 1.00 and 13.5% of 1.00 are half a cent.
+    pay = compute_pay([1, 1], [1, 1], [0.125, 0.135])
+    assert pay.tax_cents.tolist() == [12, 14]
+
+
+def test_compute_single_returns_two_place_decimals():
+    assert compute_single(40, 25.5, 0.12, 10) == {
+        "gross_pay": Decimal("1020.00"),
+        "tax_amount": Decimal("122.40"),
+        "other_deductions": Decimal("10.00"),
+        "net_pay": Decimal("887.60"),
+    }
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_rejects_non_finite_figures(value):
+    with pytest.raises(ValueError, match="finite"):
+        to_fixed([1, value], HOURS_SCALE)
+    with pytest.raises(ValueError, match="finite"):
+        check_fixed(value, HOURS_SCALE)
+    with pytest.raises(ValueError, match="finite"):
+        compute_pay([value], [10], 0.1)
+    with pytest.raises(ValueError, match="finite"):
+        compute_pay([40], [10], 0.1, value)
+
+
+def test_rejects_figures_outside_int64():
+    with pytest.raises(ValueError, match="too large"):
+        to_fixed([1e30], HOURS_SCALE)
+    with pytest.raises(ValueError, match="too large"):
+        check_fixed(-1e17, HOURS_SCALE)
+    assert to_fixed([9e16], HOURS_SCALE).tolist() == [9_000_000_000_000_000_000]
+
+
+@pytest.mark.parametrize(
+    ("hours", "rate", "tax_rate", "deductions"),
+    [
+        (1e15, 1e6, 0, 0),  # hours × rate wraps
+        (1e7, 1e6, 0.5, 0),  # gross fits, gross × tax rate in millionths wraps
+        (1e8, 1e6, 0, -9.22e16),  # gross - deductions wraps
+    ],
+)
+def test_rejects_results_outside_int64(hours, rate, tax_rate, deductions):
+    with pytest.raises(ValueError, match="too large"):
+        compute_pay([hours], [rate], tax_rate, deductions)
+
+
+def test_parse_entries_rejects_unusable_figures():
+    entries, errors = parse_entries(
+        [
+            {"employee_id": 1, "hours_worked": 40},
+            {"employee_id": 2, "hours_worked": "nan"},
+            {"employee_id": 3, "hours_worked": 1e30},
+            {"employee_id": 4, "hours_worked": 40, "hourly_rate": "inf"},
+            {"employee_id": 5, "hours_worked": 40, "other_deductions": "-inf"},
+        ]
+    )
+    assert [entry.employee_id for entry in entries] == [1]
+    assert [(error["index"], error["employee_id"]) for error in errors] == [
+        (1, 2),
+        (2, 3),
+        (3, 4),
+        (4, 5),
+    ]
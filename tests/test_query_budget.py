@@ -0,0 +1,33 @@
+"""List endpoints stay within the SQL statement budgets of ``query_budget``."""
+
+from __future__ import annotations
+
+import pytest
+
+from backend.benchmarks._harness import count_queries, seed_employees
+from backend.benchmarks.query_budget import BUDGETS
+
+
+@pytest.fixture(scope="module", name="seeded_client")
+def fixture_seeded_client(client):
+    seed_employees(300)
+    response = client.post(
+        "/api/payroll-runs",
+        json={
+            "period_label": "Budget period",
+            "period_start": "2025-01-01",
+            "period_end": "2025-01-07",
+            "tax_rate": 0.12,
+            "default_hours": 40,
+        },
+    )
+    assert response.status_code == 201, response.get_json()
+    return client
+
+
+@pytest.mark.parametrize(("url", "budget"), BUDGETS.items())
+def test_list_endpoint_within_budget(seeded_client, url, budget):
+    with count_queries() as statements:
+        response = seeded_client.get(url)
+    assert response.status_code == 200, response.get_json()
+    assert len(statements) <= budget, statements
@@ -0,0 +1,119 @@
+"""Progressive withholding: bracket validation and exact cents at the bounds."""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import ROUND_HALF_EVEN, Decimal
+
+import numpy as np
+import pytest
+
+from backend.tax import compile_schedule, parse_brackets
+
+BRACKETS = [
+    {"lower_bound": 0, "rate": "0.10"},
+    {"lower_bound": "10000.00", "rate": "0.25"},
+    {"lower_bound": "40000.00", "rate": "0.50"},
+]
+
+
+@pytest.fixture(name="schedule")
+def fixture_schedule():
+    return compile_schedule(1, "test", date(2025, 1, 1), parse_brackets(BRACKETS))
+
+
+def reference_tax(income_cents: int) -> int:
+    """Tax on ``income_cents`` bracket by bracket in ``Decimal``, rounded half-even."""
+    income = Decimal(income_cents) / 100
+    brackets = parse_brackets(BRACKETS)
+    tax = Decimal(0)
+    for index, (lower, rate) in enumerate(brackets):
+        upper = brackets[index + 1][0] if index + 1 < len(brackets) else income
+        if income > lower:
+            tax += (min(income, upper) - lower) * rate
+    return int((tax * 100).quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+
+@pytest.mark.parametrize(
+    ("income_cents", "expected"),
+    [
+        (0, 0),
+        (1, 0),
+        (999_999, 100_000),  # 99_999.9 cents
+        (1_000_000, 100_000),
+        (1_000_001, 100_000),  # 100_000.25
+        (1_000_002, 100_000),  # 100_000.5 rounds to even
+        (1_000_006, 100_002),  # 100_001.5 rounds to even
+        (3_999_999, 850_000),  # 849_999.75
+        (4_000_000, 850_000),
+        (4_000_001, 850_000),  # 850_000.5 rounds to even
+        (4_000_003, 850_002),  # 850_001.5 rounds to even
+    ],
+)
+def test_tax_on_is_exact_at_and_around_bounds(schedule, income_cents, expected):
+    assert schedule.tax_on(income_cents) == expected
+    assert reference_tax(income_cents) == expected
+    assert schedule.tax_on_array([income_cents]).tolist() == [expected]
+
+
+def test_array_path_does_not_overflow_past_int64_intermediates():
+    # cents × TAX_RATE_SCALE leaves int64 above about 9.2e12 cents.
+    brackets = parse_brackets(
+        [{"lower_bound": 0, "rate": "0.5"}, {"lower_bound": "1e11", "rate": "0.5"}]
+    )
+    schedule = compile_schedule(2, "wide", date(2025, 1, 1), brackets)
+    incomes = [2 * 10**13, 9_223_372_036_854, 9_223_372_036_855, 101, 10**17]
+    expected = [schedule.tax_on(cents) for cents in incomes]
+    assert expected[0] == 10**13
+    assert schedule.tax_on_array(incomes).tolist() == expected
+    assert schedule.withholding_array([10**13], [10**13]).tolist() == [5 * 10**12]
+
+
+def test_negative_income_owes_nothing(schedule):
+    assert schedule.tax_on(-500) == 0
+    assert schedule.tax_on_array([-500]).tolist() == [0]
+
+
+def test_array_matches_scalar_and_reference(schedule):
+    rng = np.random.default_rng(7)
+    incomes = rng.integers(0, 10_000_000, size=2_000).tolist()
+    incomes += [max(bound + delta, 0) for bound in schedule.bounds for delta in (-1, 0, 1)]
+    assert schedule.tax_on_array(incomes).tolist() == [schedule.tax_on(cents) for cents in incomes]
+    assert [schedule.tax_on(cents) for cents in incomes] == [reference_tax(c) for c in incomes]
+
+
+def test_withholding_over_a_year_adds_up_to_the_tax_on_the_total(schedule):
+    payments = [333_333, 333_334, 999_999, 1, 2_500_001, 1_000_000]
+    ytd, withheld = 0, 0
+    for gross in payments:
+        withheld += schedule.withholding(ytd, gross)
+        ytd += gross
+    assert withheld == schedule.tax_on(ytd)
+    ytd_before = np.cumsum([0] + payments[:-1])
+    assert schedule.withholding_array(ytd_before, payments).sum() == schedule.tax_on(ytd)
+
+
+def test_parse_brackets_sorts_by_lower_bound():
+    brackets = parse_brackets(list(reversed(BRACKETS)))
+    assert [bound for bound, _ in brackets] == [Decimal(0), Decimal(10000), Decimal(40000)]
+
+
+@pytest.mark.parametrize(
+    ("raw", "message"),
+    [
+        ([], "must start at 0"),
+        ([{"lower_bound": 100, "rate": 0.1}], "must start at 0"),
+        ([{"lower_bound": 0, "rate": 0.1}, {"lower_bound": 0, "rate": 0.2}], "unique"),
+        ([{"lower_bound": 0, "rate": 1.5}], "between 0 and 1"),
+        ([{"lower_bound": 0, "rate": -0.1}], "between 0 and 1"),
+        ([{"lower_bound": 0}], "numeric lower_bound and rate"),
+        ([{"lower_bound": "abc", "rate": 0.1}], "numeric lower_bound and rate"),
+        ([{"lower_bound": "NaN", "rate": 0.1}], "numeric lower_bound and rate"),
+        ([{"lower_bound": 0, "rate": "NaN"}], "numeric lower_bound and rate"),
+        ([{"lower_bound": 0, "rate": 0.1}, {"lower_bound": "Infinity", "rate": 0.2}], "numeric"),
+        ([{"lower_bound": 0, "rate": 0.1}, {"lower_bound": 1e20, "rate": 0.2}], "must not exceed"),
+    ],
+)
+def test_parse_brackets_rejects(raw, message):
+    with pytest.raises(ValueError, match=message):
+        parse_brackets(raw)